@@ -0,0 +1,22 @@
+"""
+Benchmarks for EvalHub's hot paths.
+
+Each module is run from the src/ directory, e.g.
+
+    python -m benchmarks.sqlite_submit
+
+and sets up Django itself against a scratch database, so benchmarks never
+touch db.sqlite3.
+"""
+
+import os
+
+
+def setup_django(**env):
+    """Point Django at the given environment overrides and set it up."""
+    os.environ.setdefault("DJANGO_SETTINGS_MODULE", "evalhub.settings.local")
+    os.environ.update({key: str(value) for key, value in env.items()})
+
+    import django
+
+    django.setup()
@@ -0,0 +1,248 @@
+"""
+Concurrent-connection capacity of the ASGI and WSGI deployments.
+
+Starts gunicorn from gunicorn.conf.py against a scratch database, once on
+uvicorn workers (evalhub.asgi) and once on sync workers (evalhub.wsgi). For
+each number of held connections it opens that many live-response streams,
+as instructors' dashboard tabs would, reconnecting like EventSource whenever
+the server ends one. Meanwhile it hammers the student survey page from a
+pool of clients.
+
+    python -m benchmarks.asgi_concurrency --workers 2 --streams 0,4,64
+"""
+
+import argparse
+import http.client
+import os
+import socket
+import statistics
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from pathlib import Path
+
+from benchmarks import setup_django
+
+MODES = ("asgi", "wsgi")
+QUESTION_COUNT = 10
+SRC_DIR = Path(__file__).resolve().parent.parent
+
+
+def seed():
+    from django.core.management import call_command
+    from django.test import Client
+
+    from accounts.models import User
+    from surveys.models import Question, Survey
+
+    call_command("migrate", verbosity=0)
+    owner = User.objects.create(email="bench@example.com")
+    survey = Survey.objects.create(owner=owner, name="Benchmark")
+    for i in range(QUESTION_COUNT):
+        Question.objects.create(
+            survey=survey,
+            text=f"Question {i}",
+            question_type="rating",
+            options=[1, 2, 3, 4, 5],
+        )
+    client = Client()
+    client.force_login(owner)
+    return survey.id, client.cookies["sessionid"].value
+
+
+def free_port():
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def start_server(mode, workers, env):
+    port = free_port()
+    server = subprocess.Popen(
+        [
+            sys.executable,
+            "-m",
+            "gunicorn",
+            "--config",
+            "gunicorn.conf.py",
+            "--bind",
+            f"127.0.0.1:{port}",
+            "--workers",
+            str(workers),
+        ],
+        cwd=SRC_DIR,
+        env={**os.environ, **env, "EVALHUB_SERVER": mode},
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL,
+    )
+    deadline = time.monotonic() + 30
+    while time.monotonic() < deadline:
+        try:
+            socket.create_connection(("127.0.0.1", port), timeout=1).close()
+            return server, port
+        except OSError:
+            time.sleep(0.2)
+    server.kill()
+    raise RuntimeError(f"gunicorn ({mode}) did not start")
+
+
+def hold_stream(port, path, session_id, stop, reconnects):
+    """Follow one event stream until told to stop, as EventSource would.
+
+    When the server ends the stream (after each poll, under WSGI) it waits
+    for the last retry: interval and reconnects with Last-Event-ID.
+    """
+    retry = 3.0
+    last_event_id = None
+    while not stop.is_set():
+        headers = {"Cookie": f"sessionid={session_id}"}
+        if last_event_id is not None:
+            headers["Last-Event-ID"] = last_event_id
+        # Well over the poll interval: each poll sends at least a keepalive,
+        # and a socket file can't be read again once a read has timed out
+        connection = http.client.HTTPConnection("127.0.0.1", port, timeout=10)
+        try:
+            connection.request("GET", path, headers=headers)
+            response = connection.getresponse()
+            while not stop.is_set():
+                line = response.fp.readline()
+                if not line:
+                    break
+                field, _, value = line.decode().rstrip("\n").partition(": ")
+                if field == "retry":
+                    retry = int(value) / 1000
+                elif field == "id":
+                    last_event_id = value
+        except OSError:
+            pass
+        finally:
+            connection.close()
+        if not stop.wait(retry):
+            reconnects.append(1)
+
+
+def load_page(port, path, seconds, timeout, latencies, errors):
+    deadline = time.monotonic() + seconds
+    while time.monotonic() < deadline:
+        started = time.perf_counter()
+        connection = http.client.HTTPConnection("127.0.0.1", port, timeout=timeout)
+        try:
+            connection.request("GET", path)
+            response = connection.getresponse()
+            response.read()
+            if response.status == 200:
+                latencies.append(time.perf_counter() - started)
+            else:
+                errors.append(response.status)
+        except OSError as error:
+            errors.append(type(error).__name__)
+        finally:
+            connection.close()
+
+
+def run_level(port, survey_id, session_id, streams, clients, seconds, timeout):
+    stop = threading.Event()
+    stream_path = f"/instructor/survey/{survey_id}/responses/stream/"
+    reconnects = []
+    holders = [
+        threading.Thread(
+            target=hold_stream,
+            args=(port, stream_path, session_id, stop, reconnects),
+        )
+        for _ in range(streams)
+    ]
+    for holder in holders:
+        holder.start()
+    # Let the streams take their connections before measuring
+    time.sleep(1)
+
+    latencies, errors = [], []
+    page_path = f"/student/survey/{survey_id}/"
+    loaders = [
+        threading.Thread(
+            target=load_page,
+            args=(port, page_path, seconds, timeout, latencies, errors),
+        )
+        for _ in range(clients)
+    ]
+    for loader in loaders:
+        loader.start()
+    for loader in loaders:
+        loader.join()
+    stop.set()
+    for holder in holders:
+        holder.join()
+
+    if len(latencies) > 1:
+        cut_points = statistics.quantiles(latencies, n=100)
+        p50, p95 = cut_points[49] * 1000, cut_points[94] * 1000
+    else:
+        p50 = p95 = float("nan")
+    return {
+        "streams": streams,
+        "per_second": round(len(latencies) / seconds, 1),
+        "p50_ms": round(p50, 1),
+        "p95_ms": round(p95, 1),
+        "errors": len(errors),
+        "reconnects": len(reconnects),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[1])
+    parser.add_argument("--workers", type=int, default=2)
+    parser.add_argument(
+        "--streams",
+        default="0,4,64",
+        help="comma-separated numbers of event streams to hold open",
+    )
+    parser.add_argument("--clients", type=int, default=8)
+    parser.add_argument("--seconds", type=float, default=10)
+    parser.add_argument("--timeout", type=float, default=5)
+    args = parser.parse_args()
+    levels = [int(level) for level in args.streams.split(",")]
+
+    with tempfile.TemporaryDirectory() as scratch:
+        env = {
+            "DJANGO_DB_PATH": str(Path(scratch) / "bench.sqlite3"),
+            "DJANGO_SETTINGS_MODULE": "evalhub.settings.local",
+            # Streams must outlive a measurement, and should poll cheaply
+            "DJANGO_RESPONSES_STREAM_MAX_DURATION": str(args.seconds * 10),
+            "DJANGO_RESPONSES_STREAM_POLL_INTERVAL": "1",
+        }
+        setup_django(**env)
+        survey_id, session_id = seed()
+
+        print(
+            f"{'mode':<6}{'streams':>8}{'pages/s':>10}{'p50 ms':>9}"
+            f"{'p95 ms':>9}{'errors':>8}{'reconnects':>12}"
+        )
+        for mode in MODES:
+            server, port = start_server(mode, args.workers, env)
+            try:
+                # First renders compile templates and stylesheets per worker
+                load_page(port, f"/student/survey/{survey_id}/", 2, 30, [], [])
+                for streams in levels:
+                    result = run_level(
+                        port,
+                        survey_id,
+                        session_id,
+                        streams,
+                        args.clients,
+                        args.seconds,
+                        args.timeout,
+                    )
+                    print(
+                        f"{mode:<6}{result['streams']:>8}{result['per_second']:>10}"
+                        f"{result['p50_ms']:>9}{result['p95_ms']:>9}"
+                        f"{result['errors']:>8}{result['reconnects']:>12}"
+                    )
+            finally:
+                server.terminate()
+                server.wait()
+
+
+if __name__ == "__main__":
+    main()
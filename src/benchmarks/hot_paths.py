@@ -0,0 +1,301 @@
+"""
+Micro-benchmarks for the hot paths, checked against a stored baseline.
+
+Times each case at several dataset sizes (submissions per survey) against a
+scratch database, counts the queries it makes, and compares both with
+benchmarks/hot_paths_baseline.json. Exits non-zero if a case got slower
+than the threshold allows or makes more queries than before.
+
+    python -m benchmarks.hot_paths                    # check
+    python -m benchmarks.hot_paths --save-baseline    # accept current numbers
+
+Timings depend on the machine, so save the baseline where the check runs;
+--queries-only checks just the query counts, which hold anywhere.
+"""
+
+import argparse
+import json
+import random
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+from benchmarks import setup_django
+
+BASELINE_PATH = Path(__file__).resolve().parent / "hot_paths_baseline.json"
+QUESTION_TYPES = ("text", "multiple_choice", "rating", "checkbox", "yes_no")
+OPTIONS = {
+    "multiple_choice": ["Lecture", "Lab", "Reading", "Other"],
+    "rating": ["1", "2", "3", "4", "5"],
+    "checkbox": ["Python", "Django", "SQL", "HTML", "CSS"],
+    "yes_no": ["Yes", "No"],
+}
+QUESTION_COUNT = 10
+# Each timing is the best of this many runs of enough calls to fill MIN_RUN
+REPEATS = 5
+MIN_RUN = 0.2
+
+
+def seed(sizes):
+    """Create a survey per size with that many submissions; return {size: id}."""
+    from django.core.management import call_command
+
+    from accounts.models import User
+    from surveys.forms import SurveyAnswerForm
+    from surveys.ingest import write_submissions
+    from surveys.models import Question, Survey
+
+    call_command("migrate", verbosity=0)
+    owner = User.objects.create(email="bench@example.com")
+    rng = random.Random(0)
+    surveys = {}
+    for size in sizes:
+        survey = Survey.objects.create(owner=owner, name=f"{size} submissions")
+        for i in range(QUESTION_COUNT):
+            question_type = QUESTION_TYPES[i % len(QUESTION_TYPES)]
+            Question.objects.create(
+                survey=survey,
+                text=f"Question {i}",
+                question_type=question_type,
+                options=OPTIONS.get(question_type),
+            )
+        # A handful of distinct answer sets, repeated up to size
+        payloads = []
+        for _ in range(20):
+            form = SurveyAnswerForm(survey=survey, data=answer_data(survey, rng))
+            form.is_valid()
+            payloads.append(form.submission_payload())
+        for start in range(0, size, 500):
+            write_submissions(
+                [
+                    payloads[i % len(payloads)]
+                    for i in range(start, min(size, start + 500))
+                ]
+            )
+        surveys[size] = survey.id
+    return surveys
+
+
+def answer_data(survey, rng):
+    data = {}
+    for question in survey.question_set.all():
+        name = f"response_{question.id}"
+        if question.question_type == "text":
+            data[name] = rng.choice(["Good pace", "Too fast", "More examples"])
+        elif question.question_type == "checkbox":
+            data[name] = rng.sample(OPTIONS["checkbox"], rng.randint(1, 3))
+        else:
+            data[name] = rng.choice(OPTIONS[question.question_type])
+    return data
+
+
+def cases(survey):
+    """Return {name: zero-argument callable} for one survey."""
+    from django.contrib.auth.models import AnonymousUser
+    from django.core.cache import cache
+    from django.db import transaction
+    from django.template.loader import render_to_string
+    from django.test import Client, RequestFactory
+    from django.urls import reverse
+
+    from surveys.forms import SurveyAnswerForm
+    from surveys.schema import get_survey_schema
+
+    data = answer_data(survey, random.Random(1))
+    client = Client()
+    client.force_login(survey.owner)
+    request = RequestFactory().get(reverse("students:take_survey", args=[survey.id]))
+    request.user = AnonymousUser()
+
+    def form_init():
+        SurveyAnswerForm(survey=survey, data=data)
+
+    def form_save():
+        # Roll back, so the dataset is the same size for every call
+        with transaction.atomic():
+            form = SurveyAnswerForm(survey=survey, data=data)
+            form.is_valid()
+            form.save()
+            transaction.set_rollback(True)
+
+    def responses_list():
+        client.get(reverse("instructors:responses_list", args=[survey.id]))
+
+    def export_responses():
+        response = client.get(reverse("instructors:export_responses", args=[survey.id]))
+        b"".join(response.streaming_content)
+
+    def generate_qr_code():
+        # Uncached, so a slower render shows up
+        cache.clear()
+        client.get(reverse("instructors:generate_qr_code", args=[survey.id]))
+
+    def student_survey_template():
+        survey_body = render_to_string(
+            "partials/survey_form.html",
+            {"schema": get_survey_schema(survey), "csrf_token": "token"},
+        )
+        render_to_string(
+            "student_survey.html",
+            {"survey": survey, "survey_body": survey_body},
+            request,
+        )
+
+    return {
+        "SurveyAnswerForm.__init__": form_init,
+        "SurveyAnswerForm.save": form_save,
+        "responses_list": responses_list,
+        "export_responses": export_responses,
+        "generate_qr_code": generate_qr_code,
+        "student_survey.html": student_survey_template,
+    }
+
+
+class QueryCounter:
+    """Counts queries on every connection, including async views' threads.
+
+    CaptureQueriesContext only sees the current thread's connection, and
+    the test client clears its log at the start of each request.
+    """
+
+    def __init__(self):
+        self.count = 0
+
+    def __call__(self, execute, sql, params, many, context):
+        self.count += 1
+        return execute(sql, params, many, context)
+
+    def install(self, sender=None, connection=None, **kwargs):
+        if self not in connection.execute_wrappers:
+            connection.execute_wrappers.append(self)
+
+
+def measure(fn, query_counter):
+    """Return (best seconds per call, queries per call) for fn."""
+    # The first call compiles templates and fills caches
+    fn()
+    before = query_counter.count
+    fn()
+    queries = query_counter.count - before
+
+    calls, started = 0, time.perf_counter()
+    while time.perf_counter() - started < MIN_RUN:
+        fn()
+        calls += 1
+    best = float("inf")
+    for _ in range(REPEATS):
+        started = time.perf_counter()
+        for _ in range(calls):
+            fn()
+        best = min(best, (time.perf_counter() - started) / calls)
+    return best, queries
+
+
+def run(sizes, only):
+    from django.db import connection
+    from django.db.backends.signals import connection_created
+    from django.test import override_settings
+
+    from surveys.models import Survey
+
+    query_counter = QueryCounter()
+    query_counter.install(connection=connection)
+    connection_created.connect(query_counter.install)
+    results = {}
+    # DEBUG keeps every query in memory, which skews long runs; without it
+    # the test client's host has to be allowed explicitly
+    with override_settings(DEBUG=False, ALLOWED_HOSTS=["testserver"]):
+        for size, survey_id in seed(sizes).items():
+            survey = Survey.objects.select_related("owner").get(id=survey_id)
+            for name, fn in cases(survey).items():
+                if only and name not in only:
+                    continue
+                seconds, queries = measure(fn, query_counter)
+                results[f"{name}[{size}]"] = {
+                    "ms": round(seconds * 1000, 3),
+                    "queries": queries,
+                }
+    return results
+
+
+def compare(results, baseline, threshold, min_delta_ms, queries_only):
+    """Print each case against the baseline and return the regressed names."""
+    regressions = []
+    print(f"{'case':<36}{'ms':>10}{'base ms':>10}{'change':>9}{'queries':>9}")
+    for key, result in results.items():
+        base = baseline.get(key)
+        if base is None:
+            print(
+                f"{key:<36}{result['ms']:>10}{'new':>10}{'':>9}{result['queries']:>9}"
+            )
+            continue
+        change = result["ms"] / base["ms"] - 1 if base["ms"] else 0
+        slower = (
+            not queries_only
+            and change > threshold
+            and result["ms"] - base["ms"] > min_delta_ms
+        )
+        more_queries = result["queries"] > base["queries"]
+        flag = "  REGRESSED" if slower or more_queries else ""
+        print(
+            f"{key:<36}{result['ms']:>10}{base['ms']:>10}{change:>+9.0%}"
+            f"{result['queries']:>5} ({base['queries']}){flag}"
+        )
+        if flag:
+            regressions.append(key)
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[1])
+    parser.add_argument(
+        "--sizes",
+        default="10,1000,10000",
+        help="comma-separated submissions per survey",
+    )
+    parser.add_argument(
+        "--case", action="append", dest="only", help="run only this case; repeatable"
+    )
+    parser.add_argument("--baseline", type=Path, default=BASELINE_PATH)
+    parser.add_argument("--save-baseline", action="store_true")
+    parser.add_argument(
+        "--threshold",
+        type=float,
+        default=0.25,
+        help="allowed slowdown as a fraction of the baseline time",
+    )
+    parser.add_argument(
+        "--min-delta-ms",
+        type=float,
+        default=0.1,
+        help="ignore slowdowns smaller than this, which are noise",
+    )
+    parser.add_argument("--queries-only", action="store_true")
+    args = parser.parse_args()
+    sizes = [int(size) for size in args.sizes.split(",")]
+
+    with tempfile.TemporaryDirectory() as scratch:
+        setup_django(DJANGO_DB_PATH=Path(scratch) / "bench.sqlite3")
+        results = run(sizes, args.only)
+
+    if args.save_baseline:
+        baseline = (
+            json.loads(args.baseline.read_text()) if args.baseline.exists() else {}
+        )
+        baseline.update(results)
+        args.baseline.write_text(json.dumps(baseline, indent=2, sort_keys=True) + "\n")
+        print(f"Saved {len(results)} results to {args.baseline}")
+        return
+
+    baseline = json.loads(args.baseline.read_text()) if args.baseline.exists() else {}
+    regressions = compare(
+        results, baseline, args.threshold, args.min_delta_ms, args.queries_only
+    )
+    if regressions:
+        print(f"\n{len(regressions)} regressed: {', '.join(regressions)}")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
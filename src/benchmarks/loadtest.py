@@ -0,0 +1,238 @@
+"""
+Load test of the live-class burst on the student survey page.
+
+Seeds a scratch database with an instructor (through the functional_tests
+create_user helper) and one survey per scenario, starts gunicorn from
+gunicorn.conf.py, and has a crowd of simulated students each load the survey
+and submit it as fast as they can, as a lecture theatre does after the QR
+code goes up. Every scenario runs on each worker model.
+
+    python -m benchmarks.loadtest --students 50 --questions 5,20 \\
+        --types rating,multiple_choice,text --modes asgi,wsgi
+
+Reports p50/p95/p99 latency for the page load (GET) and the submission
+(POST), the error rate and completed submissions per second.
+"""
+
+import argparse
+import http.client
+import random
+import re
+import statistics
+import tempfile
+import threading
+import time
+from pathlib import Path
+from urllib.parse import urlencode
+
+from benchmarks import setup_django
+from benchmarks.asgi_concurrency import MODES, start_server
+
+QUESTION_TYPES = ("text", "multiple_choice", "rating", "checkbox", "yes_no")
+OPTIONS = {
+    "multiple_choice": ["Lecture", "Lab", "Reading", "Other"],
+    "rating": ["1", "2", "3", "4", "5"],
+    "checkbox": ["Python", "Django", "SQL", "HTML", "CSS"],
+    "yes_no": ["Yes", "No"],
+}
+OWNER_EMAIL = "loadtest@example.com"
+
+CSRF_INPUT = re.compile(rb'name="csrfmiddlewaretoken" value="([^"]+)"')
+CSRF_COOKIE = re.compile(r"csrftoken=([^;]+)")
+
+
+def seed(scenarios):
+    """Create the instructor and a survey per (question count, types) scenario.
+
+    Returns {scenario: (survey_id, [(question_id, question_type), ...])}.
+    """
+    from django.core.management import call_command
+
+    from accounts.models import User
+    from functional_tests.management.commands.create_user import create_user
+    from surveys.models import Question, Survey
+
+    call_command("migrate", verbosity=0)
+    create_user(OWNER_EMAIL, "password")
+    owner = User.objects.get(email=OWNER_EMAIL)
+
+    surveys = {}
+    for question_count, types in scenarios:
+        survey = Survey.objects.create(
+            owner=owner, name=f"{question_count} x {'/'.join(types)}"
+        )
+        questions = []
+        for i in range(question_count):
+            question_type = types[i % len(types)]
+            question = Question.objects.create(
+                survey=survey,
+                text=f"Question {i}",
+                question_type=question_type,
+                options=OPTIONS.get(question_type),
+            )
+            questions.append((question.id, question_type))
+        surveys[question_count, types] = survey.id, questions
+    return surveys
+
+
+def answer_fields(questions, rng):
+    """POST fields answering each question the way a student might."""
+    fields = []
+    for question_id, question_type in questions:
+        name = f"response_{question_id}"
+        if question_type == "text":
+            fields.append((name, rng.choice(["Good pace", "Too fast", ""])))
+        elif question_type == "checkbox":
+            for option in rng.sample(OPTIONS["checkbox"], rng.randint(0, 3)):
+                fields.append((name, option))
+        else:
+            fields.append((name, rng.choice(OPTIONS[question_type])))
+        if question_type != "text" and rng.random() < 0.2:
+            fields.append((f"comment_{question_id}", "More examples please"))
+    return fields
+
+
+def student(port, survey_id, questions, deadline, student_id, results):
+    """Load and submit the survey repeatedly until the deadline."""
+    # Seeded per student, so runs submit the same answers
+    rng = random.Random(student_id)
+    path = f"/student/survey/{survey_id}/"
+    while time.monotonic() < deadline:
+        connection = http.client.HTTPConnection("127.0.0.1", port, timeout=30)
+        try:
+            started = time.perf_counter()
+            connection.request("GET", path)
+            response = connection.getresponse()
+            page = response.read()
+            token = CSRF_INPUT.search(page)
+            cookie = CSRF_COOKIE.search(response.getheader("Set-Cookie") or "")
+            if response.status != 200 or not token or not cookie:
+                results["errors"].append(f"GET {response.status}")
+                continue
+            results["get"].append(time.perf_counter() - started)
+
+            body = urlencode(
+                [("csrfmiddlewaretoken", token[1].decode())]
+                + answer_fields(questions, rng)
+            )
+            started = time.perf_counter()
+            connection.request(
+                "POST",
+                path,
+                body=body,
+                headers={
+                    "Content-Type": "application/x-www-form-urlencoded",
+                    "Cookie": f"csrftoken={cookie[1]}",
+                    # The survey form posts through htmx
+                    "HX-Request": "true",
+                },
+            )
+            response = connection.getresponse()
+            confirmation = response.read()
+            if response.status != 200 or b"successfully received" not in confirmation:
+                results["errors"].append(f"POST {response.status}")
+                continue
+            results["post"].append(time.perf_counter() - started)
+        except OSError as error:
+            results["errors"].append(type(error).__name__)
+        finally:
+            connection.close()
+
+
+def percentiles_ms(latencies):
+    if len(latencies) < 2:
+        return [float("nan")] * 3
+    cut_points = statistics.quantiles(latencies, n=100)
+    return [round(cut_points[p - 1] * 1000, 1) for p in (50, 95, 99)]
+
+
+def run_scenario(port, survey_id, questions, students, seconds):
+    results = {"get": [], "post": [], "errors": []}
+    deadline = time.monotonic() + seconds
+    threads = [
+        threading.Thread(
+            target=student,
+            args=(port, survey_id, questions, deadline, student_id, results),
+        )
+        for student_id in range(students)
+    ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    attempts = len(results["post"]) + len(results["errors"])
+    return {
+        "get_ms": percentiles_ms(results["get"]),
+        "post_ms": percentiles_ms(results["post"]),
+        "error_rate": round(len(results["errors"]) / attempts, 3) if attempts else 0,
+        "per_second": round(len(results["post"]) / seconds, 1),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[1])
+    parser.add_argument("--students", type=int, default=50)
+    parser.add_argument("--seconds", type=float, default=10)
+    parser.add_argument("--workers", type=int, default=2)
+    parser.add_argument(
+        "--questions",
+        default="5,20",
+        help="comma-separated question counts, one scenario each",
+    )
+    parser.add_argument(
+        "--types",
+        action="append",
+        help="comma-separated question types to cycle through; repeat for more "
+        "scenarios (default: all five types)",
+    )
+    parser.add_argument("--modes", default=",".join(MODES))
+    args = parser.parse_args()
+
+    type_sets = [tuple(types.split(",")) for types in args.types or []]
+    type_sets = type_sets or [QUESTION_TYPES]
+    for types in type_sets:
+        unknown = set(types) - set(QUESTION_TYPES)
+        if unknown:
+            parser.error(f"unknown question types: {', '.join(sorted(unknown))}")
+    scenarios = [
+        (int(count), types)
+        for count in args.questions.split(",")
+        for types in type_sets
+    ]
+
+    with tempfile.TemporaryDirectory() as scratch:
+        env = {
+            "DJANGO_DB_PATH": str(Path(scratch) / "loadtest.sqlite3"),
+            "DJANGO_SETTINGS_MODULE": "evalhub.settings.local",
+        }
+        setup_django(**env)
+        surveys = seed(scenarios)
+
+        print(
+            f"{'mode':<6}{'questions':>10}  {'types':<40}"
+            f"{'GET p50/p95/p99 ms':>22}{'POST p50/p95/p99 ms':>23}"
+            f"{'errors':>8}{'subs/s':>8}"
+        )
+        for mode in args.modes.split(","):
+            server, port = start_server(mode, args.workers, env)
+            try:
+                for (question_count, types), (survey_id, questions) in surveys.items():
+                    # First renders compile templates and stylesheets per worker
+                    run_scenario(port, survey_id, questions, args.workers * 2, 2)
+                    result = run_scenario(
+                        port, survey_id, questions, args.students, args.seconds
+                    )
+                    print(
+                        f"{mode:<6}{question_count:>10}  {','.join(types):<40}"
+                        f"{'/'.join(map(str, result['get_ms'])):>22}"
+                        f"{'/'.join(map(str, result['post_ms'])):>23}"
+                        f"{result['error_rate']:>8.1%}{result['per_second']:>8}"
+                    )
+            finally:
+                server.terminate()
+                server.wait()
+
+
+if __name__ == "__main__":
+    main()
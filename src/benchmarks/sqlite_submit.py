@@ -0,0 +1,140 @@
+"""
+Concurrent submit throughput on SQLite, before and after the tuning profile.
+
+Runs the same burst of SurveyAnswerForm submissions from several processes
+against a scratch database twice: once with SQLite's defaults and a new
+connection per submit (how production used to behave), and once with
+settings.SQLITE_PRAGMAS and persistent connections.
+
+    python -m benchmarks.sqlite_submit --processes 8 --seconds 10
+"""
+
+import argparse
+import json
+import multiprocessing
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+from benchmarks import setup_django
+
+PROFILES = {
+    "default": {"DJANGO_SQLITE_TUNING": 0, "DJANGO_CONN_MAX_AGE": 0},
+    "tuned": {"DJANGO_SQLITE_TUNING": 1, "DJANGO_CONN_MAX_AGE": 600},
+}
+QUESTION_COUNT = 10
+
+
+def seed(questions):
+    from django.core.management import call_command
+
+    from accounts.models import User
+    from surveys.models import Question, Survey
+
+    call_command("migrate", verbosity=0)
+    owner = User.objects.create(email="bench@example.com")
+    survey = Survey.objects.create(owner=owner, name="Benchmark")
+    for i in range(questions):
+        Question.objects.create(
+            survey=survey,
+            text=f"Question {i}",
+            question_type="rating",
+            options=[1, 2, 3, 4, 5],
+        )
+    return survey.id
+
+
+def submit_loop(survey_id, seconds, reuse_connection):
+    from django.db import OperationalError, connection
+
+    from surveys.forms import SurveyAnswerForm
+    from surveys.models import Survey
+
+    survey = Survey.objects.get(id=survey_id)
+    data = {f"response_{question.id}": "4" for question in survey.question_set.all()}
+    done = errors = 0
+    deadline = time.monotonic() + seconds
+    while time.monotonic() < deadline:
+        try:
+            form = SurveyAnswerForm(survey=survey, data=data)
+            form.is_valid()
+            form.save()
+            done += 1
+        except OperationalError:  # "database is locked"
+            errors += 1
+        if not reuse_connection:
+            connection.close()
+    return done, errors
+
+
+def _worker(args):
+    env, survey_id, seconds = args
+    setup_django(**env)
+    return submit_loop(survey_id, seconds, reuse_connection=env["DJANGO_CONN_MAX_AGE"])
+
+
+def run_profile(name, processes, seconds):
+    """Run one profile in this process and return its result as a dict."""
+    with tempfile.TemporaryDirectory() as scratch:
+        env = {**PROFILES[name], "DJANGO_DB_PATH": Path(scratch) / "bench.sqlite3"}
+        setup_django(**env)
+        survey_id = seed(QUESTION_COUNT)
+
+        # Spawned workers import Django fresh with this profile's settings
+        context = multiprocessing.get_context("spawn")
+        with context.Pool(processes) as pool:
+            results = pool.map(_worker, [(env, survey_id, seconds)] * processes)
+
+    submitted = sum(done for done, _ in results)
+    return {
+        "profile": name,
+        "processes": processes,
+        "seconds": seconds,
+        "submissions": submitted,
+        "locked_errors": sum(errors for _, errors in results),
+        "per_second": round(submitted / seconds, 1),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[1])
+    parser.add_argument("--processes", type=int, default=8)
+    parser.add_argument("--seconds", type=float, default=10)
+    parser.add_argument("--profile", choices=PROFILES, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.profile:
+        print(json.dumps(run_profile(args.profile, args.processes, args.seconds)))
+        return
+
+    # Settings are fixed once Django is set up, so each profile gets its own
+    # interpreter
+    results = []
+    for name in PROFILES:
+        output = subprocess.check_output(
+            [
+                sys.executable,
+                "-m",
+                "benchmarks.sqlite_submit",
+                "--profile",
+                name,
+                "--processes",
+                str(args.processes),
+                "--seconds",
+                str(args.seconds),
+            ]
+        )
+        results.append(json.loads(output.splitlines()[-1]))
+
+    print(f"{'profile':<10}{'submits/s':>12}{'submits':>10}{'locked':>9}")
+    for result in results:
+        print(
+            f"{result['profile']:<10}{result['per_second']:>12}"
+            f"{result['submissions']:>10}{result['locked_errors']:>9}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,23 @@
+from django.apps import AppConfig
+
+
+class EvalhubConfig(AppConfig):
+    default_auto_field = "django.db.models.BigAutoField"
+    name = "evalhub"
+
+    def ready(self):
+        from django.conf import settings
+        from django.db.backends.signals import connection_created
+
+        from evalhub.db import apply_sqlite_pragmas
+        from evalhub.metrics import install_db_lock_metrics
+        from evalhub.slow_queries import install_slow_query_log
+        from evalhub.timing import install_query_timer
+
+        connection_created.connect(apply_sqlite_pragmas)
+        if settings.METRICS_ENABLED:
+            connection_created.connect(install_db_lock_metrics)
+        if settings.REQUEST_TIMING_ENABLED:
+            connection_created.connect(install_query_timer)
+        if settings.SLOW_QUERY_THRESHOLD_MS > 0:
+            connection_created.connect(install_slow_query_log)
@@ -0,0 +1,26 @@
+from urllib.parse import urlsplit
+
+from django.conf import settings
+from django.core.management import CommandError
+from django.core.management.base import BaseCommand
+
+from evalhub.profiling import profile_token
+
+
+class Command(BaseCommand):
+    help = "Print a link that profiles requests to a URL, for anyone who opens it"
+
+    def add_arguments(self, parser):
+        parser.add_argument("url", help="Path, with or without a query string")
+
+    def handle(self, *args, **options):
+        if not settings.PROFILING_ENABLED:
+            raise CommandError("Profiling is off; set DJANGO_PROFILING=1")
+        url = urlsplit(options["url"])
+        if not url.path.startswith("/"):
+            raise CommandError("Give the URL's path, starting with /")
+
+        query = f"{url.query}&" if url.query else ""
+        hours = settings.PROFILING_TOKEN_MAX_AGE // 3600
+        self.stdout.write(f"{url.path}?{query}profile={profile_token(url.path)}")
+        self.stdout.write(f"Valid for {hours} hours")
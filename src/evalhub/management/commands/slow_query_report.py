@@ -0,0 +1,95 @@
+import glob
+import json
+
+from django.conf import settings
+from django.core.management import CommandError
+from django.core.management.base import BaseCommand
+
+SORT_KEYS = {
+    "total": lambda group: group["total_ms"],
+    "count": lambda group: group["count"],
+    "max": lambda group: group["slowest"]["duration_ms"],
+}
+
+
+class Command(BaseCommand):
+    help = "Rank the queries in the slow query log by the time they cost"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--file",
+            help="Log to read, with its rotated copies (default: "
+            "settings.SLOW_QUERY_LOG_FILE)",
+        )
+        parser.add_argument("--top", type=int, default=20)
+        parser.add_argument(
+            "--view",
+            help="Only queries from views whose name starts with this, "
+            "e.g. instructors:",
+        )
+        parser.add_argument("--sort", choices=SORT_KEYS, default="total")
+
+    def handle(self, *args, **options):
+        path = options["file"] or settings.SLOW_QUERY_LOG_FILE
+        # Rotated copies are path.1 (newest) to path.N
+        paths = [path, *sorted(glob.glob(f"{glob.escape(path)}.[0-9]*"))]
+
+        groups = {}
+        skipped = 0
+        for entry in self.read_entries(paths):
+            if entry is None:
+                skipped += 1
+                continue
+            view = entry.get("view") or ""
+            if options["view"] and not view.startswith(options["view"]):
+                continue
+            group = groups.setdefault(
+                entry["fingerprint"],
+                {"count": 0, "total_ms": 0.0, "views": set(), "slowest": entry},
+            )
+            group["count"] += 1
+            group["total_ms"] += entry["duration_ms"]
+            group["views"].add(view or "(no request)")
+            if entry["duration_ms"] > group["slowest"]["duration_ms"]:
+                group["slowest"] = entry
+
+        if not groups:
+            self.stdout.write("No slow queries logged")
+        ranked = sorted(
+            groups.items(),
+            key=lambda item: SORT_KEYS[options["sort"]](item[1]),
+            reverse=True,
+        )
+        for rank, (fingerprint, group) in enumerate(ranked[: options["top"]], start=1):
+            slowest = group["slowest"]
+            self.stdout.write(
+                f"{rank}. {fingerprint}  {group['count']} queries, "
+                f"{group['total_ms']:.0f} ms total, "
+                f"{group['total_ms'] / group['count']:.0f} ms mean, "
+                f"{slowest['duration_ms']:.0f} ms max"
+            )
+            self.stdout.write(f"   views: {', '.join(sorted(group['views']))}")
+            if slowest["stack"]:
+                self.stdout.write(f"   from:  {slowest['stack'][0]}")
+            self.stdout.write(f"   sql:   {slowest['sql'][:300]}")
+            for line in slowest["plan"]:
+                self.stdout.write(f"   plan:  {line}")
+        if skipped:
+            self.stderr.write(f"Skipped {skipped} lines that were not log entries")
+
+    def read_entries(self, paths):
+        found = False
+        for path in paths:
+            try:
+                log = open(path)
+            except FileNotFoundError:
+                continue
+            found = True
+            with log:
+                for line in log:
+                    try:
+                        yield json.loads(line)
+                    except ValueError:
+                        yield None
+        if not found:
+            raise CommandError(f"No slow query log at {paths[0]}")
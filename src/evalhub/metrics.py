@@ -0,0 +1,83 @@
+"""
+Prometheus metrics, served at /metrics.
+
+Under gunicorn each worker is a separate process, so gunicorn.conf.py points
+PROMETHEUS_MULTIPROC_DIR at a directory the workers write their values to,
+and the metrics view adds them up across workers.
+"""
+
+import os
+from time import perf_counter
+
+from django.db import OperationalError
+from prometheus_client import REGISTRY, CollectorRegistry, Counter, Histogram
+from prometheus_client import multiprocess
+
+REQUEST_LATENCY = Histogram(
+    "evalhub_request_duration_seconds",
+    "Time to produce a response, by URL name",
+    ["view", "method"],
+)
+SUBMISSIONS_INGESTED = Counter(
+    "evalhub_submissions_ingested",
+    "Survey submissions written to the database",
+)
+SUBMISSIONS_QUEUED = Counter(
+    "evalhub_submissions_queued",
+    "Survey submissions spooled for drain_submissions to write",
+)
+ANSWER_BATCH_SIZE = Histogram(
+    "evalhub_answer_insert_batch_size",
+    "Answers inserted per bulk insert",
+    buckets=(0, 1, 5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000, 10000),
+)
+CACHE_REQUESTS = Counter(
+    "evalhub_cache_requests",
+    "Cache lookups, by cached item and whether it was found",
+    ["cache", "result"],
+)
+DB_LOCK_WAIT = Histogram(
+    "evalhub_db_lock_wait_seconds",
+    "Time spent starting write transactions, waiting for SQLite's write lock",
+    buckets=(0.001, 0.005, 0.01, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5),
+)
+DB_LOCK_TIMEOUTS = Counter(
+    "evalhub_db_lock_timeouts",
+    "Queries that gave up waiting for a database lock",
+)
+
+
+def record_cache_lookup(cache_name, hit):
+    CACHE_REQUESTS.labels(cache_name, "hit" if hit else "miss").inc()
+
+
+def observe_db_locks(execute, sql, params, many, context):
+    """connection.execute_wrapper timing lock waits and counting lock timeouts.
+
+    With transaction_mode IMMEDIATE, SQLite takes the write lock on BEGIN, so
+    how long BEGIN takes is how long the transaction queued for the lock.
+    """
+    started = perf_counter() if sql.startswith("BEGIN") else None
+    try:
+        return execute(sql, params, many, context)
+    except OperationalError as error:
+        if "lock" in str(error):
+            DB_LOCK_TIMEOUTS.inc()
+        raise
+    finally:
+        if started is not None:
+            DB_LOCK_WAIT.observe(perf_counter() - started)
+
+
+def install_db_lock_metrics(sender, connection, **kwargs):
+    if observe_db_locks not in connection.execute_wrappers:
+        connection.execute_wrappers.append(observe_db_locks)
+
+
+def metrics_registry():
+    """The registry to export: every worker's values when there are several."""
+    if "PROMETHEUS_MULTIPROC_DIR" not in os.environ:
+        return REGISTRY
+    registry = CollectorRegistry()
+    multiprocess.MultiProcessCollector(registry)
+    return registry
@@ -0,0 +1,270 @@
+import logging
+import threading
+from time import perf_counter
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction, sync_to_async
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from django.urls import reverse
+
+from evalhub.metrics import REQUEST_LATENCY
+from evalhub.profiling import (
+    StackSampler,
+    check_profile_token,
+    new_profile_name,
+    write_profile,
+)
+from evalhub.slow_queries import current_request
+from evalhub.timing import RequestTimings, current_timings
+
+logger = logging.getLogger("evalhub.requests")
+
+KNOWN_METHODS = {"GET", "HEAD", "POST", "PUT", "PATCH", "DELETE", "OPTIONS"}
+
+
+class RequestTimingMiddleware:
+    """Report each request's query count and DB, template and view time.
+
+    The figures go out as a log line on the evalhub.requests logger and, for
+    staff or with DEBUG on, as a Server-Timing header, which browser dev
+    tools show against the request. Anyone else would learn too much about
+    the queries behind a page from it. Listed last in MIDDLEWARE, so view
+    time is URL resolution, the other middleware's view checks and the view
+    itself. Queries and rendering that happen while a streaming response is
+    being sent are not counted. Turned off entirely by
+    REQUEST_TIMING_ENABLED = False.
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        if not settings.REQUEST_TIMING_ENABLED:
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        timings = RequestTimings()
+        token = current_timings.set(timings)
+        started = perf_counter()
+        try:
+            response = self.get_response(request)
+        finally:
+            current_timings.reset(token)
+        view_time = perf_counter() - started
+        return self.report(request, response, timings, view_time, request.user)
+
+    async def __acall__(self, request):
+        timings = RequestTimings()
+        token = current_timings.set(timings)
+        started = perf_counter()
+        try:
+            response = await self.get_response(request)
+        finally:
+            current_timings.reset(token)
+        view_time = perf_counter() - started
+        return self.report(request, response, timings, view_time, await request.auser())
+
+    def report(self, request, response, timings, view_time, user):
+        db_ms = timings.db_time * 1000
+        template_ms = timings.template_time * 1000
+        view_ms = view_time * 1000
+        if settings.DEBUG or user.is_staff:
+            response["Server-Timing"] = (
+                f'db;dur={db_ms:.1f};desc="{timings.queries} queries", '
+                f"tpl;dur={template_ms:.1f}, view;dur={view_ms:.1f}"
+            )
+
+        match = request.resolver_match
+        view_name = match.view_name if match else None
+        logger.info(
+            "%s %s %s view=%s queries=%d db_ms=%.1f template_ms=%.1f view_ms=%.1f",
+            request.method,
+            request.path,
+            response.status_code,
+            view_name,
+            timings.queries,
+            db_ms,
+            template_ms,
+            view_ms,
+            extra={
+                "method": request.method,
+                "path": request.path,
+                "status": response.status_code,
+                "view_name": view_name,
+                "queries": timings.queries,
+                "db_ms": round(db_ms, 1),
+                "template_ms": round(template_ms, 1),
+                "view_ms": round(view_ms, 1),
+            },
+        )
+        return response
+
+
+class RequestMetricsMiddleware:
+    """Observe each request's latency in REQUEST_LATENCY, by URL name.
+
+    Listed first in MIDDLEWARE so the latency covers all the others. For a
+    streaming response it is the time until streaming starts. Turned off
+    by METRICS_ENABLED = False.
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        if not settings.METRICS_ENABLED:
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        started = perf_counter()
+        response = self.get_response(request)
+        self.observe(request, perf_counter() - started)
+        return response
+
+    async def __acall__(self, request):
+        started = perf_counter()
+        response = await self.get_response(request)
+        self.observe(request, perf_counter() - started)
+        return response
+
+    def observe(self, request, duration):
+        match = request.resolver_match
+        # Unmatched paths share one label, so scanners can't add new series
+        view_name = match.view_name if match else "unmatched"
+        method = request.method if request.method in KNOWN_METHODS else "other"
+        REQUEST_LATENCY.labels(view_name, method).observe(duration)
+
+
+class ProfilingMiddleware:
+    """Sample a request's stacks into a flame graph profile, on request.
+
+    A request is profiled when it has ?profile=1 from a staff user, or
+    ?profile=<token> with a token from `manage.py profile_link` for its path.
+    The profile is written to PROFILING_DIR in folded-stack format and named
+    in the X-Profile header; Link points at where staff can download it.
+    Streaming responses are profiled until they finish streaming.
+
+    Off unless PROFILING_ENABLED, and then it costs nothing at all.
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        if not settings.PROFILING_ENABLED:
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        token = request.GET.get("profile")
+        if token is None or not self.allowed(request, token, request.user):
+            return self.get_response(request)
+
+        sampler = StackSampler([threading.get_ident()], settings.PROFILING_INTERVAL)
+        sampler.start()
+        try:
+            response = self.get_response(request)
+        except BaseException:
+            sampler.stop()
+            raise
+        return self.finish(request, response, sampler)
+
+    async def __acall__(self, request):
+        token = request.GET.get("profile")
+        if token is None or not self.allowed(request, token, await request.auser()):
+            return await self.get_response(request)
+
+        # Sync code for this request (the ORM, templates) runs on one thread
+        # of its own, alongside the event loop
+        sync_thread = await sync_to_async(threading.get_ident)()
+        sampler = StackSampler(
+            [threading.get_ident(), sync_thread], settings.PROFILING_INTERVAL
+        )
+        sampler.start()
+        try:
+            response = await self.get_response(request)
+        except BaseException:
+            sampler.stop()
+            raise
+        return self.finish(request, response, sampler)
+
+    def allowed(self, request, token, user):
+        if token == "1":
+            return user.is_staff
+        return check_profile_token(request.path, token)
+
+    def finish(self, request, response, sampler):
+        name = new_profile_name(request)
+        response["X-Profile"] = name
+        response["Link"] = f'<{reverse("profile", args=[name])}>; rel="profile"'
+
+        def done():
+            sampler.stop()
+            write_profile(name, sampler)
+
+        if not response.streaming:
+            done()
+        elif response.is_async:
+            response.streaming_content = _aprofiled(response.streaming_content, done)
+        else:
+            response.streaming_content = _profiled(response.streaming_content, done)
+        return response
+
+
+class SlowQueryMiddleware:
+    """Make the request visible to the slow query log, to name its view."""
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        if settings.SLOW_QUERY_THRESHOLD_MS <= 0:
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        token = current_request.set(request)
+        try:
+            return self.get_response(request)
+        finally:
+            current_request.reset(token)
+
+    async def __acall__(self, request):
+        token = current_request.set(request)
+        try:
+            return await self.get_response(request)
+        finally:
+            current_request.reset(token)
+
+
+def _profiled(content, done):
+    try:
+        yield from content
+    finally:
+        done()
+
+
+async def _aprofiled(content, done):
+    try:
+        async for chunk in content:
+            yield chunk
+    finally:
+        done()
@@ -0,0 +1,87 @@
+import os
+import sys
+import threading
+import uuid
+from collections import Counter
+from datetime import datetime, timezone
+
+from django.conf import settings
+from django.core import signing
+
+_signer = signing.TimestampSigner(salt="evalhub.profiling")
+
+
+def profile_token(path):
+    """Return a ?profile= value that lets anyone profile requests to path."""
+    # The signed value starts with the path itself, which the request supplies
+    return _signer.sign(path)[len(path) + 1 :]
+
+
+def check_profile_token(path, token):
+    try:
+        _signer.unsign(f"{path}:{token}", max_age=settings.PROFILING_TOKEN_MAX_AGE)
+    except signing.BadSignature:
+        return False
+    return True
+
+
+class StackSampler:
+    """Samples the stacks of some threads from a background thread.
+
+    Samples are counted per distinct stack, which is the "folded" format
+    flamegraph.pl and speedscope read.
+    """
+
+    def __init__(self, thread_ids, interval):
+        self.thread_ids = set(thread_ids)
+        self.interval = interval
+        self.stacks = Counter()
+        self._stopped = threading.Event()
+        self._thread = threading.Thread(
+            target=self._run, name="evalhub-profiler", daemon=True
+        )
+
+    def start(self):
+        self._thread.start()
+
+    def stop(self):
+        self._stopped.set()
+        self._thread.join()
+
+    def _run(self):
+        while not self._stopped.wait(self.interval):
+            frames = sys._current_frames()
+            for thread_id in self.thread_ids:
+                frame = frames.get(thread_id)
+                # An event loop waiting on its selector is idle, not slow
+                if frame is not None and not frame.f_code.co_filename.endswith(
+                    "selectors.py"
+                ):
+                    self.stacks[fold_stack(frame)] += 1
+
+    def folded(self):
+        return "".join(f"{stack} {count}\n" for stack, count in self.stacks.items())
+
+
+def fold_stack(frame):
+    """Return frame's stack as "outermost;...;innermost" frame labels."""
+    labels = []
+    while frame is not None:
+        code = frame.f_code
+        filename = os.path.basename(code.co_filename)
+        labels.append(f"{code.co_qualname} ({filename}:{code.co_firstlineno})")
+        frame = frame.f_back
+    return ";".join(reversed(labels))
+
+
+def new_profile_name(request):
+    match = request.resolver_match
+    label = match.view_name.replace(":", "-") if match else "unmatched"
+    stamp = datetime.now(timezone.utc).strftime("%Y%m%dT%H%M%S")
+    return f"{stamp}-{label}-{uuid.uuid4().hex[:8]}.folded"
+
+
+def write_profile(name, sampler):
+    os.makedirs(settings.PROFILING_DIR, exist_ok=True)
+    with open(os.path.join(settings.PROFILING_DIR, name), "w") as profile:
+        profile.write(sampler.folded())
@@ -22,6 +22,7 @@ All architecture and design decisions and final implementations are my own work.
 from decouple import config
 from pathlib import Path
 import os
+import tempfile
 
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
 BASE_DIR = Path(__file__).resolve().parent.parent
@@ -35,7 +36,6 @@ if config("DJANGO_DEBUG_FALSE", default=False, cast=bool):
     DEBUG = False  # Debug mode off for production
     SECRET_KEY = config("DJANGO_SECRET_KEY")  # Secret key from environment variable
     ALLOWED_HOSTS = [config("DJANGO_ALLOWED_HOST")]  # List of allowed hosts
-    db_path = config("DJANGO_DB_PATH")  # Path to the database file
 
     # TODO: Re-enable these when HTTPS is configured
     # SESSION_COOKIE_SECURE = True
@@ -53,7 +53,6 @@ else:
     DEBUG = True  # Debug mode on for development
     SECRET_KEY = "insecure-key-for-dev"  # Insecure key for development only
     ALLOWED_HOSTS = []  # Allow all hosts in development
-    db_path = BASE_DIR / "db.sqlite3"  # Use SQLite database in development
 
 
 # Application definition
@@ -66,6 +65,7 @@ INSTALLED_APPS = [
     "django.contrib.messages",
     "django.contrib.staticfiles",
     "compressor",
+    "evalhub",
     "accounts",
     "instructors",
     "students",
@@ -74,6 +74,10 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    # First, so request latency includes the rest of the middleware
+    "evalhub.middleware.RequestMetricsMiddleware",
+    # Early, so slow queries from the other middleware name their request too
+    "evalhub.middleware.SlowQueryMiddleware",
     "django.middleware.security.SecurityMiddleware",
     "whitenoise.middleware.WhiteNoiseMiddleware",
     "django.contrib.sessions.middleware.SessionMiddleware",
@@ -82,13 +86,18 @@ MIDDLEWARE = [
     "django.contrib.auth.middleware.AuthenticationMiddleware",
     "django.contrib.messages.middleware.MessageMiddleware",
     "django.middleware.clickjacking.XFrameOptionsMiddleware",
+    # After authentication, which decides who may ask for a profile
+    "evalhub.middleware.ProfilingMiddleware",
+    # Last, so its view time is the view rather than the middleware above it
+    "evalhub.middleware.RequestTimingMiddleware",
 ]
 
 ROOT_URLCONF = "evalhub.urls"
 
 TEMPLATES = [
     {
-        "BACKEND": "django.template.backends.django.DjangoTemplates",
+        # DjangoTemplates, plus render time for the request timing middleware
+        "BACKEND": "evalhub.timing.TimedDjangoTemplates",
         "DIRS": [BASE_DIR.parent / "templates"],
         "APP_DIRS": True,
         "OPTIONS": {
@@ -107,12 +116,130 @@ WSGI_APPLICATION = "evalhub.wsgi.application"
 # Database
 # https://docs.djangoproject.com/en/5.2/ref/settings/#databases
 
-DATABASES = {
-    "default": {
-        "ENGINE": "django.db.backends.sqlite3",
-        "NAME": db_path,
+DB_ENGINE = config("DJANGO_DB_ENGINE", default="sqlite")
+
+# gunicorn.conf.py serves evalhub.asgi unless EVALHUB_SERVER=wsgi. Under ASGI
+# each request's sync code runs on a thread of its own, so a persistent
+# connection is never reused or closed; Django's docs say to turn them off.
+# The cost is a new connection per request, plus the SQLITE_PRAGMAS applied
+# to it, in the default deployment; only WSGI keeps connections open. With
+# PostgreSQL, the connection pool gives ASGI that reuse back.
+ASGI_SERVER = config("EVALHUB_SERVER", default="asgi") != "wsgi"
+DEFAULT_CONN_MAX_AGE = 0 if ASGI_SERVER else 600
+
+if DB_ENGINE == "postgresql":
+    DATABASES = {
+        "default": {
+            "ENGINE": "django.db.backends.postgresql",
+            "NAME": config("DJANGO_DB_NAME", default="evalhub"),
+            "USER": config("DJANGO_DB_USER", default="evalhub"),
+            "PASSWORD": config("DJANGO_DB_PASSWORD", default=""),
+            "HOST": config("DJANGO_DB_HOST", default="localhost"),
+            "PORT": config("DJANGO_DB_PORT", default="5432"),
+            "CONN_HEALTH_CHECKS": True,
+            "OPTIONS": {
+                # Cancel runaway queries instead of letting them hold a worker
+                "options": "-c statement_timeout="
+                + config("DJANGO_DB_STATEMENT_TIMEOUT_MS", default="30000"),
+            },
+        }
     }
-}
+    if config("DJANGO_DB_POOL", default=True, cast=bool):
+        # psycopg's pool keeps connections open across requests; Django
+        # doesn't allow CONN_MAX_AGE alongside it
+        DATABASES["default"]["OPTIONS"]["pool"] = {
+            "min_size": config("DJANGO_DB_POOL_MIN_SIZE", default=2, cast=int),
+            "max_size": config("DJANGO_DB_POOL_MAX_SIZE", default=10, cast=int),
+            "timeout": config("DJANGO_DB_POOL_TIMEOUT", default=10, cast=int),
+        }
+    else:
+        DATABASES["default"]["CONN_MAX_AGE"] = config(
+            "DJANGO_CONN_MAX_AGE", default=DEFAULT_CONN_MAX_AGE, cast=int
+        )
+else:
+    if DEBUG:
+        # Use SQLite database in development
+        db_path = config("DJANGO_DB_PATH", default=BASE_DIR / "db.sqlite3")
+    else:
+        db_path = config("DJANGO_DB_PATH")  # Path to the database file
+    DATABASES = {
+        "default": {
+            "ENGINE": "django.db.backends.sqlite3",
+            "NAME": db_path,
+            # Under WSGI, keep connections open between requests instead of
+            # reconnecting
+            "CONN_MAX_AGE": config(
+                "DJANGO_CONN_MAX_AGE", default=DEFAULT_CONN_MAX_AGE, cast=int
+            ),
+            "CONN_HEALTH_CHECKS": True,
+            "OPTIONS": {},
+        }
+    }
+
+# SQLite performance profile, applied to each new connection by evalhub.db.
+# WAL lets readers carry on while a submission is being written, and
+# synchronous=NORMAL is still crash-safe in WAL mode.
+SQLITE_TUNING = DB_ENGINE == "sqlite" and config(
+    "DJANGO_SQLITE_TUNING", default=True, cast=bool
+)
+SQLITE_PRAGMAS = {}
+if SQLITE_TUNING:
+    SQLITE_PRAGMAS = {
+        "journal_mode": "WAL",
+        "synchronous": "NORMAL",
+        "busy_timeout": 5000,  # ms to wait for the write lock
+        "cache_size": -20000,  # negative means KiB, so ~20 MB
+        "mmap_size": 134217728,  # 128 MB
+        "temp_store": "MEMORY",
+    }
+    # Take the write lock when a transaction starts, so writers queue on
+    # busy_timeout instead of failing with "database is locked" on upgrade
+    DATABASES["default"]["OPTIONS"]["transaction_mode"] = "IMMEDIATE"
+
+# Write-behind submission ingestion: when set, take_survey spools validated
+# submissions here and `manage.py drain_submissions` writes them in batches
+SUBMISSION_QUEUE_DIR = config("DJANGO_SUBMISSION_QUEUE_DIR", default=None)
+
+# Live responses feed (server-sent events): how often each open stream checks
+# for new submissions, and how long before it closes and the browser reconnects
+RESPONSES_STREAM_POLL_INTERVAL = config(
+    "DJANGO_RESPONSES_STREAM_POLL_INTERVAL", default=2.0, cast=float
+)
+RESPONSES_STREAM_MAX_DURATION = config(
+    "DJANGO_RESPONSES_STREAM_MAX_DURATION", default=300.0, cast=float
+)
+
+# Per-request query count and DB, template and view time, logged to
+# evalhub.requests and sent to staff as a Server-Timing header
+REQUEST_TIMING_ENABLED = config("DJANGO_REQUEST_TIMING", default=True, cast=bool)
+
+# Prometheus metrics at /metrics. Scrapers must send METRICS_TOKEN as
+# "Authorization: Bearer <token>"; without a token they're only served when
+# DEBUG is on
+METRICS_ENABLED = config("DJANGO_METRICS", default=True, cast=bool)
+METRICS_TOKEN = config("DJANGO_METRICS_TOKEN", default=None)
+
+# Opt-in stack-sampling profiles of single requests (see ProfilingMiddleware),
+# saved as folded stacks for flame graphs
+PROFILING_ENABLED = config("DJANGO_PROFILING", default=False, cast=bool)
+PROFILING_DIR = config(
+    "DJANGO_PROFILING_DIR",
+    default=os.path.join(tempfile.gettempdir(), "evalhub-profiles"),
+)
+PROFILING_INTERVAL = config("DJANGO_PROFILING_INTERVAL", default=0.005, cast=float)
+# How long a `manage.py profile_link` link keeps working
+PROFILING_TOKEN_MAX_AGE = 60 * 60 * 24
+
+# Queries slower than this many ms are logged, with their query plan, view
+# and calling code, to a rotating file of JSON lines; `manage.py
+# slow_query_report` ranks them. 0 turns the log off.
+SLOW_QUERY_THRESHOLD_MS = config(
+    "DJANGO_SLOW_QUERY_THRESHOLD_MS", default=200.0, cast=float
+)
+SLOW_QUERY_LOG_FILE = config(
+    "DJANGO_SLOW_QUERY_LOG_FILE",
+    default=os.path.join(tempfile.gettempdir(), "evalhub-slow-queries.log"),
+)
 
 AUTH_USER_MODEL = "accounts.User"
 LOGIN_REDIRECT_URL = "/instructor/"
@@ -169,11 +296,33 @@ DEFAULT_AUTO_FIELD = "django.db.models.BigAutoField"
 LOGGING = {
     "version": 1,
     "disable_existing_loggers": False,
+    "formatters": {
+        "message": {"format": "%(message)s"},
+    },
     "handlers": {
         "console": {"class": "logging.StreamHandler"},
+        "slow_queries": {
+            "class": "logging.handlers.RotatingFileHandler",
+            "filename": SLOW_QUERY_LOG_FILE,
+            "maxBytes": 10 * 1024 * 1024,
+            "backupCount": 5,
+            # Not opened until there is something to write
+            "delay": True,
+            "formatter": "message",
+        },
     },
     "loggers": {
         "root": {"handlers": ["console"], "level": "INFO"},
+        # One line per request from RequestTimingMiddleware
+        "evalhub.requests": {
+            "level": config("DJANGO_REQUEST_LOG_LEVEL", default="INFO"),
+        },
+        # JSON lines from evalhub.slow_queries, kept apart from the console
+        "evalhub.slow_queries": {
+            "handlers": ["slow_queries"],
+            "level": "WARNING",
+            "propagate": False,
+        },
     },
 }
 
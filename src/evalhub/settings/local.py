@@ -4,3 +4,9 @@ DEBUG = True
 ALLOWED_HOSTS = ["localhost", "127.0.0.1"]
 
 # functional_tests is OK in local/staging
+
+# runserver already logs every request; the timings are in the Server-Timing
+# header. Set DJANGO_REQUEST_LOG_LEVEL=INFO to log them too.
+LOGGING["loggers"]["evalhub.requests"]["level"] = config(
+    "DJANGO_REQUEST_LOG_LEVEL", default="WARNING"
+)
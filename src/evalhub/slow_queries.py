@@ -0,0 +1,115 @@
+import hashlib
+import json
+import logging
+import re
+import sys
+from contextlib import nullcontext
+from contextvars import ContextVar
+from datetime import datetime, timezone
+from pathlib import Path
+from time import perf_counter
+
+from django.conf import settings
+from django.db import transaction
+
+logger = logging.getLogger("evalhub.slow_queries")
+
+# The request being handled, so a slow query can be traced to its view
+current_request = ContextVar("current_request", default=None)
+
+# Only frames from our own code go into a query's stack
+_SOURCE_DIR = str(Path(__file__).resolve().parent.parent)
+_EXPLAINABLE = ("SELECT", "WITH", "INSERT", "UPDATE", "DELETE")
+# "IN (%s, %s, %s)" should group with "IN (%s)"
+_PLACEHOLDER_LIST = re.compile(r"\(%s(?:, %s)*\)")
+
+
+def log_slow_queries(execute, sql, params, many, context):
+    """connection.execute_wrapper logging queries slower than the threshold.
+
+    Each is logged with its query plan, the view it ran for and the code
+    that ran it, as a JSON line on the evalhub.slow_queries logger.
+    """
+    started = perf_counter()
+    result = execute(sql, params, many, context)
+    duration_ms = (perf_counter() - started) * 1000
+    if duration_ms >= settings.SLOW_QUERY_THRESHOLD_MS:
+        stack = app_stack()
+        logger.warning(
+            json.dumps(
+                {
+                    "time": datetime.now(timezone.utc).isoformat(),
+                    "duration_ms": round(duration_ms, 1),
+                    "view": _view_name(),
+                    "sql": sql,
+                    "fingerprint": fingerprint(sql, stack),
+                    "stack": stack,
+                    "plan": [] if many else explain(context["connection"], sql, params),
+                }
+            )
+        )
+    return result
+
+
+def install_slow_query_log(sender, connection, **kwargs):
+    if log_slow_queries not in connection.execute_wrappers:
+        connection.execute_wrappers.append(log_slow_queries)
+
+
+def app_stack():
+    """Return "path:function:line" for our code's frames, innermost first."""
+    stack = []
+    # The innermost frames are the execute wrappers, up to Django's cursor
+    in_wrappers = True
+    frame = sys._getframe(1)
+    while frame is not None:
+        filename = frame.f_code.co_filename
+        ours = filename.startswith(_SOURCE_DIR)
+        in_wrappers = in_wrappers and ours
+        if ours and not in_wrappers:
+            path = filename[len(_SOURCE_DIR) + 1 :]
+            stack.append(f"{path}:{frame.f_code.co_name}:{frame.f_lineno}")
+        frame = frame.f_back
+    return stack
+
+
+def fingerprint(sql, stack):
+    """Identify a query by its shape and the functions that ran it.
+
+    Line numbers are left out, so the fingerprint survives unrelated edits.
+    """
+    shape = _PLACEHOLDER_LIST.sub("(%s, ...)", sql)
+    functions = [frame.rsplit(":", 1)[0] for frame in stack]
+    return hashlib.sha1("\n".join([shape, *functions]).encode()).hexdigest()[:12]
+
+
+def explain(connection, sql, params):
+    if not sql.lstrip().upper().startswith(_EXPLAINABLE):
+        return []
+    # Inside a transaction, a failed EXPLAIN would abort the caller's
+    # transaction on PostgreSQL, so it runs in a savepoint. Outside one there
+    # is nothing to protect, and atomic() would begin a transaction that
+    # takes SQLite's write lock.
+    if connection.in_atomic_block:
+        savepoint = transaction.atomic(using=connection.alias)
+    else:
+        savepoint = nullcontext()
+    # A raw cursor, so the EXPLAIN skips the execute wrappers
+    cursor = connection.create_cursor()
+    try:
+        with savepoint:
+            cursor.execute(f"{connection.ops.explain_query_prefix()} {sql}", params)
+            # SQLite's plan detail and PostgreSQL's lines are both the last column
+            return [str(row[-1]) for row in cursor.fetchall()]
+    except Exception as error:
+        return [f"EXPLAIN failed: {error}"]
+    finally:
+        cursor.close()
+
+
+def _view_name():
+    request = current_request.get()
+    if request is None:
+        return None
+    match = request.resolver_match
+    return match.view_name if match else request.path
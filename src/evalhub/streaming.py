@@ -0,0 +1,42 @@
+from asgiref.sync import sync_to_async
+from django.core.handlers.asgi import ASGIRequest
+
+# Chunks pulled from a sync iterator per trip to the sync thread
+ASYNC_STREAM_BATCH = 32
+
+
+def streaming_content(request, chunks):
+    """Return chunks in a form the server streams without buffering.
+
+    Under ASGI, StreamingHttpResponse reads a sync iterator into a list
+    before sending any of it, so it is handed an async iterator instead.
+    """
+    if isinstance(request, ASGIRequest):
+        return aiter_sync(chunks)
+    return chunks
+
+
+async def aiter_sync(chunks):
+    """Iterate a sync iterator on the sync thread, a batch at a time.
+
+    The iterator may use the ORM, so it always runs on the thread the rest
+    of the request's sync code runs on.
+    """
+    chunks = iter(chunks)
+    try:
+        while batch := await sync_to_async(_next_batch)(chunks):
+            for chunk in batch:
+                yield chunk
+    finally:
+        # Release what a generator holds when the client goes away early
+        if hasattr(chunks, "close"):
+            await sync_to_async(chunks.close)()
+
+
+def _next_batch(chunks):
+    batch = []
+    for chunk in chunks:
+        batch.append(chunk)
+        if len(batch) == ASYNC_STREAM_BATCH:
+            break
+    return batch
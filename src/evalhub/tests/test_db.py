@@ -0,0 +1,47 @@
+from unittest import mock, skipUnless
+
+from django.db import connection
+from django.test import SimpleTestCase, override_settings
+
+from evalhub.db import apply_sqlite_pragmas
+
+
+class ApplySqlitePragmasTest(SimpleTestCase):
+    databases = {"default"}
+
+    def set_cache_size(self, size):
+        with connection.cursor() as cursor:
+            cursor.execute(f"PRAGMA cache_size = {size}")
+
+    @skipUnless(connection.vendor == "sqlite", "SQLite only")
+    def test_pragmas_are_applied_to_new_connections(self):
+        with connection.cursor() as cursor:
+            cursor.execute("PRAGMA cache_size")
+            original = cursor.fetchone()[0]
+        # The in-memory test database shares its cache between connections,
+        # so a connection of its own wouldn't keep this from later tests
+        self.addCleanup(self.set_cache_size, original)
+
+        with override_settings(SQLITE_PRAGMAS={"cache_size": -1234}):
+            apply_sqlite_pragmas(sender=None, connection=connection)
+
+        with connection.cursor() as cursor:
+            cursor.execute("PRAGMA cache_size")
+            self.assertEqual(cursor.fetchone()[0], -1234)
+
+    def test_other_backends_are_left_alone(self):
+        other = mock.Mock(vendor="postgresql")
+
+        apply_sqlite_pragmas(sender=None, connection=other)
+
+        other.cursor.assert_not_called()
+
+    @skipUnless(connection.vendor == "sqlite", "SQLite only")
+    def test_default_profile_uses_wal_and_immediate_transactions(self):
+        from django.conf import settings
+
+        self.assertEqual(settings.SQLITE_PRAGMAS["journal_mode"], "WAL")
+        self.assertEqual(settings.SQLITE_PRAGMAS["synchronous"], "NORMAL")
+        self.assertEqual(
+            settings.DATABASES["default"]["OPTIONS"]["transaction_mode"], "IMMEDIATE"
+        )
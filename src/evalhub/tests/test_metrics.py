@@ -0,0 +1,158 @@
+import os
+import tempfile
+from unittest.mock import patch
+
+from django.core.cache import cache
+from django.db import OperationalError
+from django.test import SimpleTestCase, override_settings
+from django.urls import reverse
+from prometheus_client import REGISTRY
+
+from evalhub.metrics import observe_db_locks
+from instructors.qr import get_qr_code
+from surveys.ingest import write_submissions
+from surveys.models import Question
+from tests.base import AuthenticatedTestCase
+
+
+def sample(name, **labels):
+    return REGISTRY.get_sample_value(name, labels) or 0
+
+
+@override_settings(METRICS_TOKEN="secret")
+class MetricsViewTest(AuthenticatedTestCase):
+    def scrape(self):
+        return self.client.get("/metrics", headers={"Authorization": "Bearer secret"})
+
+    def test_request_latency_by_url_name(self):
+        labels = {"view": "instructors:dashboard", "method": "GET"}
+        before = sample("evalhub_request_duration_seconds_count", **labels)
+
+        self.client.get(reverse("instructors:dashboard"))
+        response = self.scrape()
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(
+            sample("evalhub_request_duration_seconds_count", **labels), before + 1
+        )
+        self.assertContains(
+            response,
+            'evalhub_request_duration_seconds_count{method="GET",'
+            'view="instructors:dashboard"}',
+        )
+
+    def test_unknown_paths_share_a_label(self):
+        before = sample(
+            "evalhub_request_duration_seconds_count", view="unmatched", method="GET"
+        )
+
+        self.client.get("/no-such-page/")
+
+        self.assertEqual(
+            sample(
+                "evalhub_request_duration_seconds_count", view="unmatched", method="GET"
+            ),
+            before + 1,
+        )
+
+    def test_token_is_required(self):
+        self.assertEqual(self.client.get("/metrics").status_code, 403)
+        self.assertEqual(
+            self.client.get(
+                "/metrics", headers={"Authorization": "Bearer wrong"}
+            ).status_code,
+            403,
+        )
+        self.assertEqual(self.scrape().status_code, 200)
+
+    @override_settings(METRICS_TOKEN=None)
+    def test_without_a_token_scrapes_are_rejected(self):
+        self.assertEqual(self.client.get("/metrics").status_code, 403)
+
+    @override_settings(METRICS_TOKEN=None, DEBUG=True)
+    def test_without_a_token_in_development(self):
+        self.assertEqual(self.client.get("/metrics").status_code, 200)
+
+    @override_settings(METRICS_ENABLED=False)
+    def test_disabled(self):
+        self.assertEqual(self.client.get("/metrics").status_code, 404)
+
+    def test_multiprocess_mode_reads_the_shared_directory(self):
+        with tempfile.TemporaryDirectory() as directory, patch.dict(
+            os.environ, {"PROMETHEUS_MULTIPROC_DIR": directory}
+        ):
+            response = self.scrape()
+
+        self.assertEqual(response.status_code, 200)
+        # This process isn't writing to the directory, so it has nothing
+        self.assertNotContains(response, "evalhub_request_duration_seconds")
+
+
+class IngestMetricsTest(AuthenticatedTestCase):
+    def test_submissions_and_answer_batch_size(self):
+        survey = self.create_survey()
+        question = Question.objects.create(survey=survey, text="Why?")
+        payload = {
+            "survey_id": survey.id,
+            "submitted_at": "2025-01-01T00:00:00+00:00",
+            "answers": [
+                {
+                    "question_id": question.id,
+                    "answer_text": "Because",
+                    "comment_text": "",
+                    "options": [],
+                }
+            ],
+        }
+        ingested = sample("evalhub_submissions_ingested_total")
+        batches = sample("evalhub_answer_insert_batch_size_count")
+        answers = sample("evalhub_answer_insert_batch_size_sum")
+
+        write_submissions([payload, payload])
+
+        self.assertEqual(sample("evalhub_submissions_ingested_total"), ingested + 2)
+        self.assertEqual(sample("evalhub_answer_insert_batch_size_count"), batches + 1)
+        self.assertEqual(sample("evalhub_answer_insert_batch_size_sum"), answers + 2)
+
+
+class CacheMetricsTest(SimpleTestCase):
+    def test_hits_and_misses(self):
+        cache.clear()
+        misses = sample("evalhub_cache_requests_total", cache="qr_code", result="miss")
+        hits = sample("evalhub_cache_requests_total", cache="qr_code", result="hit")
+
+        get_qr_code("https://example.com/")
+        get_qr_code("https://example.com/")
+
+        self.assertEqual(
+            sample("evalhub_cache_requests_total", cache="qr_code", result="miss"),
+            misses + 1,
+        )
+        self.assertEqual(
+            sample("evalhub_cache_requests_total", cache="qr_code", result="hit"),
+            hits + 1,
+        )
+
+
+class DbLockMetricsTest(SimpleTestCase):
+    def execute(self, sql, params, many, context):
+        pass
+
+    def test_transaction_starts_are_timed(self):
+        waits = sample("evalhub_db_lock_wait_seconds_count")
+
+        observe_db_locks(self.execute, "BEGIN IMMEDIATE", None, False, {})
+        observe_db_locks(self.execute, "SELECT 1", None, False, {})
+
+        self.assertEqual(sample("evalhub_db_lock_wait_seconds_count"), waits + 1)
+
+    def test_lock_timeouts_are_counted(self):
+        timeouts = sample("evalhub_db_lock_timeouts_total")
+
+        def locked(sql, params, many, context):
+            raise OperationalError("database is locked")
+
+        with self.assertRaises(OperationalError):
+            observe_db_locks(locked, "INSERT INTO x VALUES (1)", None, False, {})
+
+        self.assertEqual(sample("evalhub_db_lock_timeouts_total"), timeouts + 1)
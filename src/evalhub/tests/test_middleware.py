@@ -0,0 +1,89 @@
+import re
+
+from django.db import connection
+from django.test import override_settings
+from django.urls import reverse
+
+from evalhub.timing import current_timings
+from surveys.models import Question
+from tests.base import AuthenticatedTestCase
+
+SERVER_TIMING = re.compile(
+    r'^db;dur=[\d.]+;desc="(\d+) queries", tpl;dur=([\d.]+), view;dur=[\d.]+$'
+)
+
+
+class RequestTimingMiddlewareTest(AuthenticatedTestCase):
+    def setUp(self):
+        super().setUp()
+        self.survey = self.create_survey()
+        Question.objects.create(survey=self.survey, text="Anything else?")
+        self.user.is_staff = True
+        self.user.save()
+
+    def test_server_timing_header_on_a_sync_view(self):
+        response = self.client.get(
+            reverse("instructors:survey_detail", args=[self.survey.id])
+        )
+
+        match = SERVER_TIMING.match(response["Server-Timing"])
+        self.assertIsNotNone(match, response["Server-Timing"])
+        self.assertGreater(int(match[1]), 0)
+        self.assertGreater(float(match[2]), 0)
+
+    def test_queries_from_async_views_are_counted(self):
+        response = self.client.get(
+            reverse("students:take_survey", args=[self.survey.id])
+        )
+
+        match = SERVER_TIMING.match(response["Server-Timing"])
+        self.assertIsNotNone(match, response["Server-Timing"])
+        self.assertGreater(int(match[1]), 0)
+
+    def test_logs_a_line_per_request(self):
+        url = reverse("instructors:survey_detail", args=[self.survey.id])
+
+        with self.assertLogs("evalhub.requests", "INFO") as logs:
+            self.client.get(url)
+
+        [record] = logs.records
+        self.assertEqual(record.view_name, "instructors:survey_detail")
+        self.assertEqual(record.path, url)
+        self.assertEqual(record.status, 200)
+        self.assertGreater(record.queries, 0)
+        self.assertIn("view=instructors:survey_detail", record.getMessage())
+
+    def test_header_is_only_for_staff(self):
+        self.user.is_staff = False
+        self.user.save()
+        detail_url = reverse("instructors:survey_detail", args=[self.survey.id])
+
+        with self.assertLogs("evalhub.requests", "INFO") as logs:
+            response = self.client.get(detail_url)
+        self.assertNotIn("Server-Timing", response)
+        self.assertEqual(len(logs.records), 1)
+
+        self.client.logout()
+        response = self.client.get(
+            reverse("students:take_survey", args=[self.survey.id])
+        )
+        self.assertNotIn("Server-Timing", response)
+
+    @override_settings(REQUEST_TIMING_ENABLED=False)
+    def test_can_be_turned_off(self):
+        response = self.client.get(
+            reverse("instructors:survey_detail", args=[self.survey.id])
+        )
+
+        self.assertNotIn("Server-Timing", response)
+
+    def test_queries_outside_a_request_are_not_counted(self):
+        Question.objects.count()
+
+        self.assertIsNone(current_timings.get())
+        self.assertEqual(
+            [wrapper.__name__ for wrapper in connection.execute_wrappers].count(
+                "time_query"
+            ),
+            1,
+        )
@@ -0,0 +1,176 @@
+import re
+import shutil
+import sys
+import tempfile
+import threading
+import time
+from io import StringIO
+from pathlib import Path
+
+from django.core.management import CommandError, call_command
+from django.test import SimpleTestCase, override_settings
+from django.urls import reverse
+
+from evalhub.profiling import StackSampler, fold_stack, profile_token
+from surveys.models import Question
+from tests.base import AuthenticatedTestCase
+
+FOLDED_LINE = re.compile(r"^\S.* \d+$")
+
+
+class StackSamplerTest(SimpleTestCase):
+    def test_fold_stack_runs_outermost_to_innermost(self):
+        stack = fold_stack(sys._getframe())
+
+        innermost = stack.split(";")[-1]
+        self.assertRegex(
+            innermost,
+            r"^StackSamplerTest\.test_fold_stack_runs_outermost_to_innermost "
+            r"\(test_profiling\.py:\d+\)$",
+        )
+
+    def test_samples_the_given_thread(self):
+        sampler = StackSampler([threading.get_ident()], 0.001)
+
+        sampler.start()
+        deadline = time.monotonic() + 0.05
+        while time.monotonic() < deadline:
+            pass
+        sampler.stop()
+
+        self.assertTrue(sampler.stacks)
+        for line in sampler.folded().splitlines():
+            self.assertRegex(line, FOLDED_LINE)
+        self.assertIn("test_samples_the_given_thread", sampler.folded())
+
+
+class ProfilingMiddlewareTest(AuthenticatedTestCase):
+    def setUp(self):
+        super().setUp()
+        self.survey = self.create_survey()
+        Question.objects.create(survey=self.survey, text="Anything else?")
+        self.profile_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.profile_dir)
+        settings = override_settings(
+            PROFILING_ENABLED=True,
+            PROFILING_DIR=self.profile_dir,
+            PROFILING_INTERVAL=0.001,
+        )
+        settings.enable()
+        self.addCleanup(settings.disable)
+        self.detail_url = reverse("instructors:survey_detail", args=[self.survey.id])
+
+    def make_staff(self):
+        self.user.is_staff = True
+        self.user.save()
+
+    def assertProfiled(self, response):
+        name = response["X-Profile"]
+        self.assertEqual(
+            response["Link"], f'<{reverse("profile", args=[name])}>; rel="profile"'
+        )
+        profile = Path(self.profile_dir, name).read_text()
+        for line in profile.splitlines():
+            self.assertRegex(line, FOLDED_LINE)
+        return name
+
+    def test_staff_can_profile_a_request(self):
+        self.make_staff()
+
+        response = self.client.get(self.detail_url, {"profile": 1})
+
+        self.assertEqual(response.status_code, 200)
+        name = self.assertProfiled(response)
+        self.assertIn("instructors-survey_detail", name)
+
+    def test_other_users_cannot(self):
+        response = self.client.get(self.detail_url, {"profile": 1})
+
+        self.assertNotIn("X-Profile", response)
+
+    def test_requests_without_the_parameter_are_not_profiled(self):
+        self.make_staff()
+
+        response = self.client.get(self.detail_url)
+
+        self.assertNotIn("X-Profile", response)
+
+    def test_signed_token_for_an_async_view(self):
+        self.client.logout()
+        url = reverse("students:take_survey", args=[self.survey.id])
+
+        response = self.client.get(url, {"profile": profile_token(url)})
+
+        self.assertEqual(response.status_code, 200)
+        self.assertProfiled(response)
+
+    def test_token_only_works_for_its_own_path(self):
+        self.client.logout()
+        url = reverse("students:take_survey", args=[self.survey.id])
+
+        for token in [profile_token("/elsewhere/"), "1", "nonsense"]:
+            with self.subTest(token=token):
+                response = self.client.get(url, {"profile": token})
+                self.assertNotIn("X-Profile", response)
+
+    def test_streaming_response_is_profiled_until_it_finishes(self):
+        self.make_staff()
+
+        response = self.client.get(
+            reverse("instructors:export_responses", args=[self.survey.id]),
+            {"profile": 1},
+        )
+        name = response["X-Profile"]
+        self.assertFalse(Path(self.profile_dir, name).exists())
+        b"".join(response.streaming_content)
+
+        self.assertProfiled(response)
+
+    def test_staff_can_download_a_profile(self):
+        self.make_staff()
+        name = self.client.get(self.detail_url, {"profile": 1})["X-Profile"]
+
+        response = self.client.get(reverse("profile", args=[name]))
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(
+            b"".join(response.streaming_content),
+            Path(self.profile_dir, name).read_bytes(),
+        )
+
+    def test_download_needs_staff_and_a_real_profile(self):
+        self.assertEqual(
+            self.client.get(reverse("profile", args=["x.folded"])).status_code, 403
+        )
+        self.make_staff()
+        for name in ["missing.folded", "..%2Fsecret.folded", "notes.txt"]:
+            with self.subTest(name=name):
+                response = self.client.get(f"/profiles/{name}")
+                self.assertEqual(response.status_code, 404)
+
+    def test_profile_link_command(self):
+        out = StringIO()
+
+        call_command("profile_link", self.detail_url + "?page=2", stdout=out)
+
+        link = out.getvalue().splitlines()[0]
+        self.assertTrue(link.startswith(f"{self.detail_url}?page=2&profile="))
+        self.make_staff()
+        self.client.logout()
+        # Anyone with the link may profile, though the view still needs a login
+        response = self.client.get(link)
+        self.assertIn("X-Profile", response)
+
+
+class ProfilingDisabledTest(AuthenticatedTestCase):
+    def test_nothing_is_profiled_by_default(self):
+        self.user.is_staff = True
+        self.user.save()
+
+        response = self.client.get(reverse("instructors:dashboard"), {"profile": 1})
+
+        self.assertNotIn("X-Profile", response)
+
+    def test_profile_link_refuses(self):
+        with self.assertRaises(CommandError):
+            call_command("profile_link", "/", stdout=StringIO())
@@ -0,0 +1,151 @@
+import json
+import os
+import tempfile
+from io import StringIO
+from unittest import mock
+
+from django.core.management import CommandError, call_command
+from django.db import connection, transaction
+from django.test import SimpleTestCase, override_settings
+from django.urls import reverse
+
+from evalhub.slow_queries import fingerprint
+from surveys.models import Question
+from tests.base import AuthenticatedTestCase
+
+STACK = ["instructors/views.py:survey_detail:40", "evalhub/middleware.py:__call__:9"]
+
+
+class FingerprintTest(SimpleTestCase):
+    def test_ignores_the_length_of_in_lists(self):
+        self.assertEqual(
+            fingerprint('SELECT * FROM "q" WHERE "id" IN (%s)', STACK),
+            fingerprint('SELECT * FROM "q" WHERE "id" IN (%s, %s, %s)', STACK),
+        )
+
+    def test_ignores_line_numbers_but_not_functions(self):
+        sql = 'SELECT * FROM "q"'
+        moved = ["instructors/views.py:survey_detail:52", STACK[1]]
+        elsewhere = ["instructors/views.py:dashboard:40", STACK[1]]
+
+        self.assertEqual(fingerprint(sql, STACK), fingerprint(sql, moved))
+        self.assertNotEqual(fingerprint(sql, STACK), fingerprint(sql, elsewhere))
+        self.assertNotEqual(
+            fingerprint(sql, STACK), fingerprint('SELECT * FROM "s"', STACK)
+        )
+
+
+@override_settings(SLOW_QUERY_THRESHOLD_MS=0.0001)
+class SlowQueryLogTest(AuthenticatedTestCase):
+    def test_logs_plan_view_and_stack(self):
+        survey = self.create_survey()
+        Question.objects.create(survey=survey, text="Anything else?")
+
+        with self.assertLogs("evalhub.slow_queries", "WARNING") as logs:
+            self.client.get(reverse("instructors:survey_detail", args=[survey.id]))
+
+        entries = [json.loads(record.getMessage()) for record in logs.records]
+        from_view = [
+            entry
+            for entry in entries
+            if entry["stack"] and entry["stack"][0].startswith("instructors/views.py")
+        ]
+        self.assertTrue(from_view)
+        entry = from_view[0]
+        self.assertEqual(entry["view"], "instructors:survey_detail")
+        self.assertEqual(len(entry["fingerprint"]), 12)
+        self.assertTrue(entry["plan"])
+        self.assertIsInstance(entry["duration_ms"], float)
+
+    def test_queries_outside_requests_have_no_view(self):
+        with self.assertLogs("evalhub.slow_queries", "WARNING") as logs:
+            Question.objects.count()
+
+        entry = json.loads(logs.records[-1].getMessage())
+        self.assertIsNone(entry["view"])
+        self.assertIn("test_queries_outside_requests_have_no_view", entry["stack"][0])
+
+    def test_failed_explain_leaves_the_transaction_usable(self):
+        survey = self.create_survey()
+        bad_prefix = mock.patch.object(
+            connection.ops, "explain_query_prefix", return_value="EXPLAIN NOT SQL"
+        )
+
+        with bad_prefix, self.assertLogs("evalhub.slow_queries", "WARNING") as logs:
+            with transaction.atomic():
+                Question.objects.create(survey=survey, text="First")
+                Question.objects.create(survey=survey, text="Second")
+
+        entries = [json.loads(record.getMessage()) for record in logs.records]
+        inserts = [entry for entry in entries if entry["sql"].startswith("INSERT")]
+        self.assertEqual(len(inserts), 2)
+        for entry in inserts:
+            self.assertTrue(entry["plan"][0].startswith("EXPLAIN failed"))
+        texts = Question.objects.filter(survey=survey).values_list("text", flat=True)
+        self.assertEqual(list(texts.order_by("id")), ["First", "Second"])
+
+
+class SlowQueryReportCommandTest(SimpleTestCase):
+    def setUp(self):
+        log = tempfile.NamedTemporaryFile("w", suffix=".log", delete=False)
+        self.path = log.name
+        self.addCleanup(os.remove, self.path)
+        with log:
+            self.write(log, "a" * 12, "instructors:survey_detail", 300)
+            self.write(log, "a" * 12, "instructors:survey_detail", 500)
+            self.write(log, "b" * 12, "students:take_survey", 900)
+            log.write("not json\n")
+        # A rotated copy is read too
+        with open(f"{self.path}.1", "w") as rotated:
+            self.write(rotated, "a" * 12, "instructors:survey_detail", 400)
+        self.addCleanup(os.remove, f"{self.path}.1")
+
+    def write(self, log, fingerprint, view, duration_ms):
+        entry = {
+            "time": "2026-10-17T12:00:00+00:00",
+            "duration_ms": duration_ms,
+            "view": view,
+            "sql": f"SELECT {fingerprint}",
+            "fingerprint": fingerprint,
+            "stack": [f"{view.split(':')[0]}/views.py:view:1"],
+            "plan": ["SCAN q"],
+        }
+        log.write(json.dumps(entry) + "\n")
+
+    def report(self, *args):
+        out = StringIO()
+        call_command(
+            "slow_query_report",
+            "--file",
+            self.path,
+            *args,
+            stdout=out,
+            stderr=StringIO(),
+        )
+        return out.getvalue()
+
+    def test_ranks_by_total_time(self):
+        report = self.report()
+
+        first, second = [line for line in report.splitlines() if line[0].isdigit()]
+        self.assertEqual(
+            first, f"1. {'a' * 12}  3 queries, 1200 ms total, 400 ms mean, 500 ms max"
+        )
+        self.assertTrue(second.startswith(f"2. {'b' * 12}"))
+        self.assertIn("plan:  SCAN q", report)
+
+    def test_view_filter(self):
+        report = self.report("--view", "students:")
+
+        self.assertIn("b" * 12, report)
+        self.assertNotIn("a" * 12, report)
+
+    def test_sort_and_top(self):
+        report = self.report("--sort", "max", "--top", "1")
+
+        self.assertIn("b" * 12, report)
+        self.assertNotIn("a" * 12, report)
+
+    def test_missing_log(self):
+        with self.assertRaises(CommandError):
+            call_command("slow_query_report", "--file", f"{self.path}.missing")
@@ -0,0 +1,36 @@
+from unittest import mock
+
+from django.test import SimpleTestCase
+
+from evalhub.streaming import aiter_sync
+
+
+class AiterSyncTest(SimpleTestCase):
+    async def test_pulls_one_batch_at_a_time(self):
+        pulled = []
+
+        def chunks():
+            for i in range(5):
+                pulled.append(i)
+                yield i
+
+        with mock.patch("evalhub.streaming.ASYNC_STREAM_BATCH", 2):
+            stream = aiter_sync(chunks())
+            self.assertEqual(await anext(stream), 0)
+            self.assertEqual(pulled, [0, 1])
+            self.assertEqual([chunk async for chunk in stream], [1, 2, 3, 4])
+
+    async def test_closes_the_iterator_when_abandoned(self):
+        closed = []
+
+        def chunks():
+            try:
+                yield from range(100)
+            finally:
+                closed.append(True)
+
+        stream = aiter_sync(chunks())
+        await anext(stream)
+        await stream.aclose()
+
+        self.assertEqual(closed, [True])
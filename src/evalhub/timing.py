@@ -0,0 +1,67 @@
+from contextvars import ContextVar
+from time import perf_counter
+
+from django.template.backends.django import DjangoTemplates, Template
+
+# The RequestTimings of the request being handled, if timing is switched on.
+# sync_to_async copies the context, so queries an async view runs in a
+# worker thread are counted against the right request.
+current_timings = ContextVar("current_timings", default=None)
+
+
+class RequestTimings:
+    """What one request spent its time on, in seconds."""
+
+    def __init__(self):
+        self.queries = 0
+        self.db_time = 0.0
+        self.template_time = 0.0
+
+
+def time_query(execute, sql, params, many, context):
+    """connection.execute_wrapper that counts queries run during a request."""
+    timings = current_timings.get()
+    if timings is None:
+        return execute(sql, params, many, context)
+    started = perf_counter()
+    try:
+        return execute(sql, params, many, context)
+    finally:
+        timings.queries += 1
+        timings.db_time += perf_counter() - started
+
+
+def install_query_timer(sender, connection, **kwargs):
+    """Add time_query to every new connection, once.
+
+    Each thread has its own connection, so wrapping them as they are made
+    covers the threads async views run their queries in as well.
+    """
+    if time_query not in connection.execute_wrappers:
+        connection.execute_wrappers.append(time_query)
+
+
+class TimedDjangoTemplates(DjangoTemplates):
+    """The Django template backend, adding render time to the request's timings.
+
+    Only templates rendered through the backend (render(), render_to_string())
+    are timed; includes and parents are part of the template that pulls them in.
+    """
+
+    def from_string(self, template_code):
+        return TimedTemplate(self.engine.from_string(template_code), self)
+
+    def get_template(self, template_name):
+        return TimedTemplate(super().get_template(template_name).template, self)
+
+
+class TimedTemplate(Template):
+    def render(self, context=None, request=None):
+        timings = current_timings.get()
+        if timings is None:
+            return super().render(context, request)
+        started = perf_counter()
+        try:
+            return super().render(context, request)
+        finally:
+            timings.template_time += perf_counter() - started
@@ -18,6 +18,7 @@ Including another URLconf
 from django.contrib import admin
 from django.contrib.auth import views as auth_views
 from django.urls import include, path
+from evalhub import views as evalhub_views
 from surveys import views as survey_views
 
 urlpatterns = [
@@ -28,4 +29,6 @@ urlpatterns = [
     path("accounts/", include("accounts.urls")),
     path("instructor/", include("instructors.urls")),
     path("student/", include("students.urls")),
+    path("metrics", evalhub_views.metrics, name="metrics"),
+    path("profiles/<str:name>", evalhub_views.profile, name="profile"),
 ]
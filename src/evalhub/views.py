@@ -0,0 +1,39 @@
+import hmac
+import os
+import re
+
+from django.conf import settings
+from django.http import FileResponse, Http404, HttpResponse
+from prometheus_client import CONTENT_TYPE_LATEST, generate_latest
+
+from evalhub.metrics import metrics_registry
+
+
+def metrics(request):
+    if not settings.METRICS_ENABLED:
+        raise Http404
+    if not settings.METRICS_TOKEN:
+        # URL names and traffic volumes aren't public, so only in development
+        if not settings.DEBUG:
+            return HttpResponse("403 - Forbidden", status=403)
+    elif not hmac.compare_digest(
+        request.headers.get("Authorization", ""), f"Bearer {settings.METRICS_TOKEN}"
+    ):
+        return HttpResponse("403 - Forbidden", status=403)
+    return HttpResponse(
+        generate_latest(metrics_registry()), content_type=CONTENT_TYPE_LATEST
+    )
+
+
+def profile(request, name):
+    if not settings.PROFILING_ENABLED:
+        raise Http404
+    if not request.user.is_staff:
+        return HttpResponse("403 - Forbidden", status=403)
+    # Only names ProfilingMiddleware makes, so nothing outside the directory
+    if not re.fullmatch(r"[\w-]+\.folded", name):
+        raise Http404
+    path = os.path.join(settings.PROFILING_DIR, name)
+    if not os.path.exists(path):
+        raise Http404
+    return FileResponse(open(path, "rb"), content_type="text/plain; charset=utf-8")
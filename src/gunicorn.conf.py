@@ -0,0 +1,52 @@
+"""
+Gunicorn settings for the container, read from /src by default.
+
+EvalHub runs as an ASGI app on uvicorn workers, so the async views (the
+student survey page, the instructor lists and the live responses stream) can
+hold many connections per worker. Set EVALHUB_SERVER=wsgi to fall back to
+sync workers on evalhub.wsgi. That is faster per page while few dashboards
+are open (see benchmarks/asgi_concurrency), but the live responses stream
+degrades to a poll every RESPONSES_STREAM_POLL_INTERVAL, as an open stream
+would take up a whole worker.
+
+Settings read EVALHUB_SERVER too. Under the default ASGI server,
+DEFAULT_CONN_MAX_AGE is 0, so every request opens a new database
+connection and the persistent SQLite connections of the WSGI setup are
+given up.
+
+Workers record Prometheus metrics in PROMETHEUS_MULTIPROC_DIR (a fresh
+temporary directory unless it is set), so /metrics reports all of them.
+"""
+
+import glob
+import os
+import tempfile
+
+bind = os.environ.get("GUNICORN_BIND", ":8888")
+# Gunicorn reads WEB_CONCURRENCY for the worker count itself
+
+if os.environ.get("EVALHUB_SERVER", "asgi") == "wsgi":
+    wsgi_app = "evalhub.wsgi:application"
+else:
+    wsgi_app = "evalhub.asgi:application"
+    worker_class = "uvicorn_worker.UvicornWorker"
+
+
+def on_starting(server):
+    # Set before any worker starts, so they all inherit it
+    if "PROMETHEUS_MULTIPROC_DIR" in os.environ:
+        # Values left by a previous run would be added to this one's
+        for path in glob.glob(
+            os.path.join(os.environ["PROMETHEUS_MULTIPROC_DIR"], "*.db")
+        ):
+            os.remove(path)
+    else:
+        os.environ["PROMETHEUS_MULTIPROC_DIR"] = tempfile.mkdtemp(
+            prefix="evalhub-metrics-"
+        )
+
+
+def child_exit(server, worker):
+    from prometheus_client import multiprocess
+
+    multiprocess.mark_process_dead(worker.pid)
@@ -0,0 +1,95 @@
+import asyncio
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.db import connection
+from django.template.loader import render_to_string
+
+from surveys.models import Answer, Submission
+from surveys.tallies import atallies_for_questions
+
+# Submissions pushed per poll; a backlog drains over the following polls
+STREAM_BATCH_SIZE = 100
+
+
+def sse_event(event, data, event_id=None):
+    """Format one server-sent event; data may span several lines."""
+    lines = []
+    if event_id is not None:
+        lines.append(f"id: {event_id}")
+    lines.append(f"event: {event}")
+    lines += [f"data: {line}" for line in data.strip().splitlines() or [""]]
+    return "\n".join(lines) + "\n\n"
+
+
+async def response_events(survey, questions, after, single_poll=False):
+    """Yield server-sent events for submissions to survey with id above after.
+
+    Each poll is one index range query on submission ids, so an idle stream
+    costs next to nothing, and the DB connection is given back between
+    polls. When submissions arrive, their answers are pushed per question as
+    <li> fragments and the question's tally rows are re-sent. The stream
+    ends after RESPONSES_STREAM_MAX_DURATION, or after one poll with
+    single_poll, and the browser's EventSource reconnects, resuming from the
+    Last-Event-ID it was given.
+    """
+    loop = asyncio.get_running_loop()
+    deadline = loop.time() + (
+        0 if single_poll else settings.RESPONSES_STREAM_MAX_DURATION
+    )
+    question_ids = {question.id for question in questions}
+
+    yield f"retry: {int(settings.RESPONSES_STREAM_POLL_INTERVAL * 1000)}\n\n"
+    while True:
+        submission_ids = [
+            submission_id
+            async for submission_id in Submission.objects.filter(
+                survey=survey, id__gt=after
+            )
+            .order_by("id")
+            .values_list("id", flat=True)[:STREAM_BATCH_SIZE]
+        ]
+        if submission_ids:
+            after = submission_ids[-1]
+            answers_by_question = {}
+            async for answer in Answer.objects.filter(
+                survey=survey, submission_id__in=submission_ids
+            ).order_by("-submission_id", "-id"):
+                if answer.question_id in question_ids:
+                    answers_by_question.setdefault(answer.question_id, []).append(
+                        answer
+                    )
+            tallies = await atallies_for_questions(questions)
+
+            for question_id, answers in answers_by_question.items():
+                yield sse_event(
+                    f"answers-{question_id}",
+                    render_to_string("partials/answer_page.html", {"answers": answers}),
+                )
+                if question_id in tallies:
+                    yield sse_event(
+                        f"tallies-{question_id}",
+                        render_to_string(
+                            "partials/tally_rows.html",
+                            {"tallies": tallies[question_id]},
+                        ),
+                    )
+            yield sse_event("submissions", str(len(submission_ids)), event_id=after)
+            # Drain a backlog without waiting between batches
+            if len(submission_ids) == STREAM_BATCH_SIZE:
+                continue
+        else:
+            # A comment line keeps proxies from timing out an idle stream
+            yield ": keepalive\n\n"
+
+        # An open stream mostly sleeps; it shouldn't hold a pooled connection
+        await sync_to_async(release_connection)()
+        if loop.time() >= deadline:
+            return
+        await asyncio.sleep(settings.RESPONSES_STREAM_POLL_INTERVAL)
+
+
+def release_connection():
+    # Not inside a transaction, which closing would roll back
+    if not connection.in_atomic_block:
+        connection.close()
@@ -0,0 +1,73 @@
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+from django.core.management import CommandError
+from django.core.management.base import BaseCommand
+from django.urls import reverse
+
+from instructors.qr import QR_FORMATS
+from instructors.qr_batch import QR_BATCH_FORMATS, stream_qr_codes
+from surveys.models import Survey
+
+
+class Command(BaseCommand):
+    help = "Write QR codes for many surveys into one ZIP of images or PDF sheet"
+
+    def add_arguments(self, parser):
+        parser.add_argument("output", help="File to write the ZIP or PDF to")
+        parser.add_argument(
+            "--base-url",
+            required=True,
+            help="Site root the QR codes point at, e.g. https://evalhub.example.com",
+        )
+        parser.add_argument("--format", choices=QR_BATCH_FORMATS, default="zip")
+        parser.add_argument(
+            "--image",
+            choices=QR_FORMATS,
+            default="png",
+            help="Image format inside a ZIP",
+        )
+        parser.add_argument("--owner", help="Only surveys owned by this email")
+        parser.add_argument(
+            "--survey",
+            action="append",
+            type=int,
+            dest="survey_ids",
+            help="Survey id to include; repeat for several",
+        )
+        parser.add_argument(
+            "--workers",
+            type=int,
+            default=os.cpu_count(),
+            help="Processes rendering QR codes in parallel",
+        )
+
+    def handle(self, *args, **options):
+        surveys = Survey.objects.order_by("owner_id", "-created_at", "-id")
+        if options["owner"]:
+            surveys = surveys.filter(owner__email=options["owner"])
+        if options["survey_ids"]:
+            surveys = surveys.filter(id__in=options["survey_ids"])
+
+        base_url = options["base_url"].rstrip("/")
+        entries = [
+            (
+                survey.id,
+                survey.name,
+                base_url + reverse("students:take_survey", args=[survey.id]),
+            )
+            for survey in surveys.only("id", "name")
+        ]
+        if not entries:
+            raise CommandError("No surveys match")
+
+        workers = options["workers"]
+        with ProcessPoolExecutor(workers) as executor, open(
+            options["output"], "wb"
+        ) as output:
+            for chunk in stream_qr_codes(
+                entries, options["format"], options["image"], executor, workers
+            ):
+                output.write(chunk)
+
+        self.stdout.write(f"Wrote {len(entries)} QR codes to {options['output']}")
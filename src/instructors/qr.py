@@ -0,0 +1,63 @@
+import hashlib
+from io import BytesIO
+
+import qrcode
+import qrcode.image.svg
+from django.core.cache import cache
+
+from evalhub.metrics import record_cache_lookup
+
+QR_FORMATS = {"png": "image/png", "svg": "image/svg+xml"}
+# Bump when the rendering below changes, so old ETags and cache entries lapse
+QR_RENDER_VERSION = 1
+QR_CACHE_TIMEOUT = 60 * 60 * 24
+# Browsers may reuse an image for this long before revalidating with the ETag
+QR_MAX_AGE = 60 * 60
+
+
+def qr_digest(data, image_format):
+    """Return a hash that identifies the QR image for data in image_format.
+
+    The image depends on nothing else, so the digest doubles as a strong ETag
+    and can be worked out without rendering anything.
+    """
+    content = f"{QR_RENDER_VERSION}:{image_format}:{data}"
+    return hashlib.sha256(content.encode()).hexdigest()
+
+
+def make_qr(data):
+    qr = qrcode.QRCode(version=1, box_size=10, border=5)
+    qr.add_data(data)
+    qr.make(fit=True)
+    return qr
+
+
+def qr_bitmap(data):
+    """Return the QR code for data as a black and white Pillow image."""
+    return make_qr(data).make_image(fill_color="black", back_color="white").get_image()
+
+
+def render_qr_code(data, image_format="png"):
+    """Encode data as a QR code image and return its bytes."""
+    qr = make_qr(data)
+
+    if image_format == "svg":
+        # Vector output scales cleanly and never touches Pillow
+        return qr.make_image(image_factory=qrcode.image.svg.SvgPathImage).to_string()
+
+    img = qr.make_image(fill_color="black", back_color="white")
+    buffer = BytesIO()
+    img.save(buffer, format="PNG")
+    return buffer.getvalue()
+
+
+def get_qr_code(data, image_format="png"):
+    """Return (image bytes, digest) for data, rendering only on a cache miss."""
+    digest = qr_digest(data, image_format)
+    key = f"qr_code:{digest}"
+    image = cache.get(key)
+    record_cache_lookup("qr_code", image is not None)
+    if image is None:
+        image = render_qr_code(data, image_format)
+        cache.set(key, image, QR_CACHE_TIMEOUT)
+    return image, digest
@@ -0,0 +1,212 @@
+import zipfile
+import zlib
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+
+from django.utils.text import slugify
+
+from instructors.qr import qr_bitmap, render_qr_code
+
+QR_BATCH_FORMATS = {"zip": "application/zip", "pdf": "application/pdf"}
+QR_BATCH_WORKERS = 4
+# Renders allowed in flight per worker; this bounds how many images are held
+# in memory at once, however many surveys are in the batch
+RENDERS_PER_WORKER = 2
+
+
+def stream_qr_codes(
+    entries,
+    archive_format,
+    image_format="png",
+    executor=None,
+    workers=QR_BATCH_WORKERS,
+):
+    """Yield the bytes of a ZIP or PDF holding a QR code per survey.
+
+    entries is a list of (survey_id, name, url). Images are rendered by
+    executor, which has workers workers (a thread pool by default), and are
+    written into the archive in order as they finish. PDFs always embed
+    bitmaps, so image_format only applies to ZIPs.
+    """
+    if executor is None:
+        with ThreadPoolExecutor(workers) as executor:
+            yield from stream_qr_codes(
+                entries, archive_format, image_format, executor, workers
+            )
+        return
+
+    window = RENDERS_PER_WORKER * workers
+    if archive_format == "pdf":
+        pages = ordered_map(executor, render_pdf_page, entries, window)
+        yield from _stream_pdf(pages)
+    else:
+        files = ordered_map(
+            executor,
+            render_zip_entry,
+            [(*entry, image_format) for entry in entries],
+            window,
+        )
+        yield from _stream_zip(files)
+
+
+def ordered_map(executor, fn, argument_tuples, window):
+    """Like executor.map, but with at most window calls submitted at a time."""
+    pending = deque()
+    for arguments in argument_tuples:
+        pending.append(executor.submit(fn, *arguments))
+        if len(pending) >= window:
+            yield pending.popleft().result()
+    while pending:
+        yield pending.popleft().result()
+
+
+# Module-level so a process pool can pickle them
+def render_zip_entry(survey_id, name, url, image_format):
+    filename = f"{survey_id}-{slugify(name) or 'survey'}.{image_format}"
+    return filename, render_qr_code(url, image_format)
+
+
+def render_pdf_page(survey_id, name, url):
+    bitmap = qr_bitmap(url)
+    return name, bitmap.size, zlib.compress(bitmap.tobytes())
+
+
+class _Sink:
+    """Write-only file that hands back what was written since the last drain."""
+
+    def __init__(self):
+        self.chunks = []
+
+    def write(self, data):
+        self.chunks.append(bytes(data))
+        return len(data)
+
+    def flush(self):
+        pass
+
+    def drain(self):
+        data = b"".join(self.chunks)
+        self.chunks = []
+        return data
+
+
+def _stream_zip(files):
+    sink = _Sink()
+    # PNGs are already compressed; storing them keeps the archive cheap to build
+    with zipfile.ZipFile(sink, "w", compression=zipfile.ZIP_STORED) as archive:
+        for filename, image in files:
+            archive.writestr(filename, image)
+            yield sink.drain()
+    yield sink.drain()
+
+
+def _stream_pdf(pages):
+    writer = _PdfWriter()
+    yield writer.start()
+    for caption, size, pixels in pages:
+        yield writer.page(caption, size, pixels)
+    yield writer.finish()
+
+
+class _PdfWriter:
+    """Writes a PDF one captioned QR page at a time.
+
+    Pillow's multi-page PDF output needs every page up front, so this writes
+    the few object types a QR sheet needs directly. The page tree (object 2)
+    only lists its pages, so it goes at the end, once they are all known.
+    """
+
+    PAGE_WIDTH, PAGE_HEIGHT = 595, 842  # A4, in points
+    QR_SIDE = 360
+
+    def __init__(self):
+        self.offsets = {}
+        self.position = 0
+        self.page_ids = []
+        # 1 is the catalog, 2 the page tree and 3 the caption font
+        self.next_id = 4
+
+    def start(self):
+        return (
+            self._raw(b"%PDF-1.4\n%\xe2\xe3\xcf\xd3\n")
+            + self._object(1, b"<< /Type /Catalog /Pages 2 0 R >>")
+            + self._object(
+                3,
+                b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica"
+                b" /Encoding /WinAnsiEncoding >>",
+            )
+        )
+
+    def page(self, caption, size, pixels):
+        image_id, content_id, page_id = self._reserve(3)
+        width, height = size
+        x = (self.PAGE_WIDTH - self.QR_SIDE) // 2
+        y = (self.PAGE_HEIGHT - self.QR_SIDE) // 2
+        content = b"BT /F1 18 Tf %d %d Td %s Tj ET\n" % (
+            x,
+            y + self.QR_SIDE + 24,
+            _pdf_string(caption),
+        ) + b"q %d 0 0 %d %d %d cm /QR Do Q" % (self.QR_SIDE, self.QR_SIDE, x, y)
+        self.page_ids.append(page_id)
+        return (
+            self._object(
+                image_id,
+                b"<< /Type /XObject /Subtype /Image /Width %d /Height %d"
+                b" /ColorSpace /DeviceGray /BitsPerComponent 1"
+                b" /Filter /FlateDecode /Length %d >>\nstream\n"
+                % (width, height, len(pixels))
+                + pixels
+                + b"\nendstream",
+            )
+            + self._object(
+                content_id,
+                b"<< /Length %d >>\nstream\n" % len(content) + content + b"\nendstream",
+            )
+            + self._object(
+                page_id,
+                b"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 %d %d]"
+                b" /Resources << /Font << /F1 3 0 R >> /XObject << /QR %d 0 R >> >>"
+                b" /Contents %d 0 R >>"
+                % (self.PAGE_WIDTH, self.PAGE_HEIGHT, image_id, content_id),
+            )
+        )
+
+    def finish(self):
+        kids = b" ".join(b"%d 0 R" % page_id for page_id in self.page_ids)
+        chunk = self._object(
+            2, b"<< /Type /Pages /Kids [%s] /Count %d >>" % (kids, len(self.page_ids))
+        )
+        xref_position = self.position
+        # Every xref entry is exactly 20 bytes, including its line ending
+        xref = b"xref\n0 %d\n0000000000 65535 f \n" % self.next_id + b"".join(
+            b"%010d 00000 n \n" % self.offsets[object_id]
+            for object_id in range(1, self.next_id)
+        )
+        return (
+            chunk
+            + xref
+            + b"trailer\n<< /Size %d /Root 1 0 R >>\nstartxref\n%d\n%%%%EOF\n"
+            % (self.next_id, xref_position)
+        )
+
+    def _reserve(self, count):
+        ids = range(self.next_id, self.next_id + count)
+        self.next_id += count
+        return ids
+
+    def _object(self, object_id, body):
+        self.offsets[object_id] = self.position
+        return self._raw(b"%d 0 obj\n" % object_id + body + b"\nendobj\n")
+
+    def _raw(self, data):
+        self.position += len(data)
+        return data
+
+
+def _pdf_string(text):
+    # Helvetica's built-in encoding; anything outside it prints as "?"
+    encoded = text.encode("cp1252", errors="replace")
+    escaped = (
+        encoded.replace(b"\\", b"\\\\").replace(b"(", b"\\(").replace(b")", b"\\)")
+    )
+    return b"(" + escaped + b")"
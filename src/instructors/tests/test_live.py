@@ -0,0 +1,104 @@
+from unittest import mock
+
+from django.test import override_settings
+from django.urls import reverse
+
+from instructors.live import sse_event
+from surveys.forms import SurveyAnswerForm
+from surveys.models import Question
+from tests.base import AuthenticatedTestCase
+
+
+class SseEventTest(AuthenticatedTestCase):
+    def test_multiline_data_is_split_into_data_fields(self):
+        self.assertEqual(
+            sse_event("answers-1", "<li>\nYes\n</li>", event_id=7),
+            "id: 7\nevent: answers-1\ndata: <li>\ndata: Yes\ndata: </li>\n\n",
+        )
+
+
+@override_settings(RESPONSES_STREAM_POLL_INTERVAL=0, RESPONSES_STREAM_MAX_DURATION=0)
+class ResponsesStreamTest(AuthenticatedTestCase):
+    def setUp(self):
+        super().setUp()
+        self.survey = self.create_survey()
+        self.question = Question.objects.create(
+            survey=self.survey,
+            text="Would you recommend?",
+            question_type="yes_no",
+            options=["Yes", "No"],
+        )
+        self.url = reverse("instructors:responses_stream", args=[self.survey.id])
+        self.first = self.submit("Yes")
+        self.second = self.submit("No")
+        self.other_survey = self.create_survey(
+            owner=self.create_user("other@example.com"), name="Other"
+        )
+
+    def submit(self, answer):
+        form = SurveyAnswerForm(
+            survey=self.survey, data={f"response_{self.question.id}": answer}
+        )
+        self.assertTrue(form.is_valid())
+        return form.save()
+
+    async def stream(self, *args, **kwargs):
+        await self.async_client.aforce_login(self.user)
+        response = await self.async_client.get(*args, **kwargs)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response["Content-Type"], "text/event-stream")
+        chunks = [chunk async for chunk in response.streaming_content]
+        return b"".join(chunks).decode()
+
+    async def test_pushes_answers_and_tallies_after_the_cursor(self):
+        body = await self.stream(self.url, {"after": self.first.id})
+
+        answers_event = f"event: answers-{self.question.id}\n"
+        self.assertEqual(body.count(answers_event), 1)
+        answers = body.split(answers_event)[1].split("\n\n")[0]
+        self.assertIn("No", answers)
+        self.assertNotIn("Yes", answers)
+        self.assertIn(f"event: tallies-{self.question.id}", body)
+        self.assertIn(f"id: {self.second.id}\nevent: submissions\ndata: 1", body)
+
+    async def test_reconnect_resumes_from_last_event_id(self):
+        body = await self.stream(
+            self.url, {"after": 0}, headers={"Last-Event-ID": str(self.second.id)}
+        )
+
+        self.assertNotIn("event:", body)
+        self.assertIn(": keepalive", body)
+
+    async def test_without_a_cursor_only_new_submissions_are_sent(self):
+        body = await self.stream(self.url)
+
+        self.assertNotIn("event:", body)
+
+    async def test_stream_forbidden_for_other_users_survey(self):
+        await self.async_client.aforce_login(self.user)
+
+        response = await self.async_client.get(
+            reverse("instructors:responses_stream", args=[self.other_survey.id])
+        )
+
+        self.assertEqual(response.status_code, 403)
+
+    async def test_stream_requires_login(self):
+        response = await self.async_client.get(self.url)
+
+        self.assertEqual(response.status_code, 302)
+
+    async def test_connection_is_released_after_each_poll(self):
+        with mock.patch("instructors.live.release_connection") as release:
+            await self.stream(self.url)
+
+        release.assert_called_once_with()
+
+    @override_settings(RESPONSES_STREAM_MAX_DURATION=300)
+    def test_wsgi_request_gets_a_single_poll(self):
+        # The test client's requests are WSGI requests
+        response = self.client.get(self.url, {"after": self.first.id})
+
+        # Iterating the response is how a WSGI server reads an async stream
+        body = b"".join(response).decode()
+        self.assertIn(f"id: {self.second.id}\nevent: submissions", body)
@@ -0,0 +1,173 @@
+import re
+import shutil
+import tempfile
+import zipfile
+from io import BytesIO, StringIO
+from pathlib import Path
+
+from django.core.management import CommandError, call_command
+from django.test import SimpleTestCase
+from django.urls import reverse
+
+from instructors.qr_batch import stream_qr_codes
+from tests.base import AuthenticatedTestCase
+
+ENTRIES = [
+    (1, "Week 1 (intro)", "http://testserver/student/survey/1/"),
+    (2, "Café feedback", "http://testserver/student/survey/2/"),
+    (3, "", "http://testserver/student/survey/3/"),
+]
+
+
+def pdf_page_count(pdf):
+    return int(re.search(rb"/Type /Pages /Kids \[[^\]]*\] /Count (\d+)", pdf)[1])
+
+
+class StreamQrCodesTest(SimpleTestCase):
+    def test_zip_holds_an_image_per_survey_in_order(self):
+        archive = zipfile.ZipFile(BytesIO(b"".join(stream_qr_codes(ENTRIES, "zip"))))
+
+        self.assertEqual(
+            archive.namelist(),
+            ["1-week-1-intro.png", "2-cafe-feedback.png", "3-survey.png"],
+        )
+        for name in archive.namelist():
+            self.assertTrue(archive.read(name).startswith(b"\x89PNG"))
+
+    def test_zip_of_svgs(self):
+        archive = zipfile.ZipFile(
+            BytesIO(b"".join(stream_qr_codes(ENTRIES[:1], "zip", "svg")))
+        )
+
+        self.assertIn(b"<svg", archive.read("1-week-1-intro.svg"))
+
+    def test_output_is_streamed_in_pieces(self):
+        chunks = list(stream_qr_codes(ENTRIES, "zip", workers=1))
+
+        self.assertGreater(len(chunks), len(ENTRIES))
+
+    def test_pdf_has_a_captioned_page_per_survey(self):
+        pdf = b"".join(stream_qr_codes(ENTRIES, "pdf"))
+
+        self.assertTrue(pdf.startswith(b"%PDF-"))
+        self.assertTrue(pdf.endswith(b"%%EOF\n"))
+        self.assertEqual(pdf_page_count(pdf), 3)
+        self.assertIn(rb"(Week 1 \(intro\))", pdf)
+        self.assertIn("(Café feedback)".encode("cp1252"), pdf)
+
+    def test_pdf_cross_reference_points_at_each_object(self):
+        pdf = b"".join(stream_qr_codes(ENTRIES, "pdf"))
+
+        startxref = int(re.search(rb"startxref\n(\d+)\n", pdf)[1])
+        self.assertTrue(pdf[startxref:].startswith(b"xref\n"))
+        offsets = re.findall(rb"(\d{10}) 00000 n ", pdf[startxref:])
+        for object_id, offset in enumerate(offsets, start=1):
+            self.assertTrue(
+                pdf[int(offset) :].startswith(b"%d 0 obj\n" % object_id),
+                f"object {object_id}",
+            )
+
+    def test_no_surveys_gives_a_valid_empty_archive(self):
+        archive = zipfile.ZipFile(BytesIO(b"".join(stream_qr_codes([], "zip"))))
+
+        self.assertEqual(archive.namelist(), [])
+
+
+class InstructorQrCodesViewTest(AuthenticatedTestCase):
+    def setUp(self):
+        super().setUp()
+        self.first = self.create_survey(name="First")
+        self.second = self.create_survey(name="Second")
+        self.create_survey(owner=self.create_user("other@example.com"), name="Theirs")
+        self.url = reverse("instructors:qr_codes")
+
+    def get_archive(self, params=None):
+        response = self.client.get(self.url, params)
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response.streaming)
+        return zipfile.ZipFile(BytesIO(b"".join(response.streaming_content)))
+
+    def test_zip_covers_only_the_instructors_surveys(self):
+        archive = self.get_archive()
+
+        self.assertEqual(
+            archive.namelist(),
+            [f"{self.second.id}-second.png", f"{self.first.id}-first.png"],
+        )
+
+    def test_selected_surveys_only(self):
+        archive = self.get_archive({"survey": [self.first.id]})
+
+        self.assertEqual(archive.namelist(), [f"{self.first.id}-first.png"])
+
+    def test_pdf_download(self):
+        response = self.client.get(self.url, {"format": "pdf"})
+
+        self.assertEqual(response["Content-Type"], "application/pdf")
+        self.assertEqual(
+            response["Content-Disposition"],
+            'attachment; filename="survey_qr_codes.pdf"',
+        )
+        pdf = b"".join(response.streaming_content)
+        self.assertEqual(pdf_page_count(pdf), 2)
+        self.assertNotIn(b"(Theirs)", pdf)
+
+    async def test_zip_streams_asynchronously_under_asgi(self):
+        await self.async_client.aforce_login(self.user)
+
+        response = await self.async_client.get(self.url)
+
+        self.assertTrue(response.is_async)
+        content = b"".join([chunk async for chunk in response.streaming_content])
+        self.assertEqual(len(zipfile.ZipFile(BytesIO(content)).namelist()), 2)
+
+    def test_bad_parameters_are_rejected(self):
+        for params in [{"format": "tar"}, {"image": "gif"}, {"survey": "x"}]:
+            with self.subTest(params=params):
+                response = self.client.get(self.url, params)
+                self.assertEqual(response.status_code, 400)
+
+    def test_requires_login(self):
+        self.client.logout()
+
+        response = self.client.get(self.url)
+
+        self.assertEqual(response.status_code, 302)
+
+
+class ExportQrCodesCommandTest(AuthenticatedTestCase):
+    def setUp(self):
+        super().setUp()
+        self.survey = self.create_survey(name="Mine")
+        self.create_survey(owner=self.create_user("other@example.com"), name="Theirs")
+        scratch = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, scratch)
+        self.output = Path(scratch) / "codes"
+
+    def export(self, **options):
+        out = StringIO()
+        call_command(
+            "export_qr_codes",
+            str(self.output),
+            base_url="https://evalhub.example.com/",
+            workers=1,
+            stdout=out,
+            **options,
+        )
+        return out.getvalue()
+
+    def test_writes_a_zip_for_one_owner(self):
+        out = self.export(owner=self.user.email)
+
+        archive = zipfile.ZipFile(self.output)
+        self.assertEqual(archive.namelist(), [f"{self.survey.id}-mine.png"])
+        self.assertIn("Wrote 1 QR codes", out)
+
+    def test_writes_a_pdf_of_every_survey(self):
+        self.export(format="pdf")
+
+        self.assertEqual(pdf_page_count(self.output.read_bytes()), 2)
+
+    def test_no_matching_surveys_is_an_error(self):
+        with self.assertRaises(CommandError):
+            self.export(survey_ids=[0])
@@ -0,0 +1,120 @@
+import re
+from unittest import skipUnless
+
+from django.db import connection
+from django.test import SimpleTestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from surveys.listing import encode_survey_cursor
+from surveys.models import Answer, Question, QuestionTally, Submission
+from tests.base import AuthenticatedTestCase
+
+# "SCAN table" without an index is a full table scan in SQLite's plan output
+FULL_SCAN = re.compile(r"\bSCAN (\w+)\b(?! USING (?:COVERING )?INDEX)")
+
+
+class FullScanPatternTest(SimpleTestCase):
+    def test_matches_a_table_scan(self):
+        self.assertEqual(FULL_SCAN.search("SCAN surveys_answer")[1], "surveys_answer")
+
+    def test_ignores_index_scans(self):
+        for plan in [
+            "SCAN surveys_answer USING INDEX surveys_ans_survey_idx",
+            "SCAN surveys_answer USING COVERING INDEX surveys_ans_survey_idx",
+        ]:
+            with self.subTest(plan=plan):
+                self.assertIsNone(FULL_SCAN.search(plan))
+
+
+@skipUnless(connection.vendor == "sqlite", "EXPLAIN QUERY PLAN is SQLite syntax")
+class InstructorViewQueryPlanTest(AuthenticatedTestCase):
+    def setUp(self):
+        super().setUp()
+        for name in ["Older", "Newer"]:
+            survey = self.create_survey(name=name)
+        self.survey = survey
+        self.choice = choice = Question.objects.create(
+            survey=survey,
+            text="Would you recommend?",
+            question_type="yes_no",
+            options=["Yes", "No"],
+        )
+        text = Question.objects.create(survey=survey, text="Anything else?")
+        QuestionTally.objects.create(question=choice, option="Yes", count=2)
+        for _ in range(2):
+            submission = Submission.objects.create(survey=survey)
+            Answer.objects.create(
+                question=choice, answer_text="Yes", submission=submission
+            )
+            Answer.objects.create(
+                question=text, answer_text="Great", submission=submission
+            )
+
+    def full_scans(self, url, **headers):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(url, **headers)
+            # Streaming responses only run their queries when consumed
+            if response.streaming:
+                b"".join(response.streaming_content)
+        self.assertEqual(response.status_code, 200)
+
+        scans = []
+        with connection.cursor() as cursor:
+            for query in queries.captured_queries:
+                sql = query["sql"]
+                if not sql.lstrip().upper().startswith("SELECT"):
+                    continue
+                cursor.execute(f"EXPLAIN QUERY PLAN {sql}")
+                for row in cursor.fetchall():
+                    match = FULL_SCAN.search(row[-1])
+                    if match:
+                        scans.append(f"{match.group(0)} in: {sql}")
+        return scans
+
+    def assertNoFullScans(self, url, **headers):
+        scans = self.full_scans(url, **headers)
+        self.assertEqual(scans, [], "\n".join(scans))
+
+    def test_surveys_list(self):
+        self.assertNoFullScans(reverse("instructors:surveys_list"))
+
+    def test_surveys_list_search(self):
+        self.assertNoFullScans(reverse("instructors:surveys_list") + "?q=New")
+
+    def test_surveys_list_next_page(self):
+        cursor = encode_survey_cursor(self.survey)
+        self.assertNoFullScans(reverse("instructors:surveys_list") + f"?after={cursor}")
+
+    def test_survey_detail(self):
+        self.assertNoFullScans(
+            reverse("instructors:survey_detail", args=[self.survey.id])
+        )
+
+    def test_responses_list(self):
+        self.assertNoFullScans(
+            reverse("instructors:responses_list", args=[self.survey.id]),
+            HTTP_HX_REQUEST="true",
+        )
+
+    def test_responses_page(self):
+        first = Answer.objects.filter(question=self.choice).earliest("id")
+        self.assertNoFullScans(
+            reverse("instructors:responses_page", args=[self.survey.id, self.choice.id])
+            + f"?after={first.submission_id}-{first.id}"
+        )
+
+    def test_survey_summary(self):
+        self.assertNoFullScans(
+            reverse("instructors:survey_summary", args=[self.survey.id])
+        )
+
+    def test_export_responses(self):
+        self.assertNoFullScans(
+            reverse("instructors:export_responses", args=[self.survey.id])
+        )
+
+    def test_generate_qr_code(self):
+        self.assertNoFullScans(
+            reverse("instructors:generate_qr_code", args=[self.survey.id])
+        )
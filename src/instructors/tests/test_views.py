@@ -1,12 +1,18 @@
+from django.core.cache import cache
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
 from django.urls import reverse
 from django.utils import html
 
 import csv
 from io import StringIO
+from unittest.mock import patch
 
 from accounts.models import User
+from surveys.aggregation import ANSWER_PAGE_SIZE
+from surveys.listing import SURVEY_PAGE_SIZE
 from surveys.forms import EMPTY_QUESTION_ERROR
-from surveys.models import Answer, Question, Submission, Survey
+from surveys.models import Answer, Question, QuestionTally, Submission, Survey
 from tests.base import AuthenticatedTestCase
 
 
@@ -70,6 +76,74 @@ class InstructorSurveysListViewTest(AuthenticatedTestCase):
         self.assertContains(response, "<a", count=2)  # Two surveys = two links
 
 
+class InstructorSurveysListPaginationTest(AuthenticatedTestCase):
+    def survey_names(self, response):
+        return [
+            link.text_content().strip()
+            for link in self.parse_html(response).cssselect("a")
+        ]
+
+    def test_search_returns_only_matching_rows_for_htmx(self):
+        for name in ["Week 1", "Retro", "Week 2"]:
+            self.create_survey(name=name)
+
+        response = self.client.get(
+            reverse("instructors:surveys_list"),
+            {"q": "Week"},
+            HTTP_HX_REQUEST="true",
+            HTTP_HX_TARGET="survey-rows",
+        )
+
+        self.assertTemplateUsed(response, "partials/survey_rows.html")
+        self.assertTemplateNotUsed(response, "partials/surveys_list.html")
+        self.assertEqual(sorted(self.survey_names(response)), ["Week 1", "Week 2"])
+
+    def test_search_without_htmx_renders_the_dashboard(self):
+        self.create_survey(name="Week 1")
+        self.create_survey(name="Retro")
+
+        response = self.client.get(reverse("instructors:surveys_list"), {"q": "Ret"})
+
+        self.assertContains(response, "Retro")
+        self.assertNotContains(response, "Week 1")
+        self.assertContains(response, 'value="Ret"')
+
+    def test_load_more_walks_every_survey_once(self):
+        names = {f"Survey {i}" for i in range(SURVEY_PAGE_SIZE + 3)}
+        Survey.objects.bulk_create(Survey(owner=self.user, name=n) for n in names)
+
+        response = self.client.get(
+            reverse("instructors:surveys_list"), HTTP_HX_REQUEST="true"
+        )
+        seen = self.survey_names(response)
+        self.assertEqual(len(seen), SURVEY_PAGE_SIZE)
+
+        (load_more,) = self.parse_html(response).cssselect(".load-more")
+        response = self.client.get(load_more.get("hx-get"), HTTP_HX_REQUEST="true")
+        seen += self.survey_names(response)
+
+        self.assertEqual(sorted(seen), sorted(names))
+        self.assertNotContains(response, "load-more")
+
+    def test_rows_show_submission_counts(self):
+        survey = self.create_survey(name="Busy")
+        Submission.objects.create(survey=survey)
+        Submission.objects.create(survey=survey)
+
+        response = self.client.get(
+            reverse("instructors:surveys_list"), HTTP_HX_REQUEST="true"
+        )
+
+        self.assertContains(response, "2 responses")
+
+    def test_malformed_cursor_is_rejected(self):
+        response = self.client.get(
+            reverse("instructors:surveys_list"), {"after": "not-a-cursor"}
+        )
+
+        self.assertEqual(response.status_code, 400)
+
+
 class InstructorCreateSurveyViewTest(AuthenticatedTestCase):
     def test_create_survey_requires_login(self):
         self.client.logout()
@@ -512,6 +586,27 @@ class InstructorSurveyResponsesViewTest(AuthenticatedTestCase):
         self.assertContains(response, "5")
         self.assertContains(response, "Excellent course with great examples!")
 
+    def test_responses_show_option_tallies_for_choice_questions(self):
+        question = Question.objects.create(
+            survey=self.survey,
+            text="Would you recommend?",
+            question_type="yes_no",
+            options=["Yes", "No"],
+        )
+        QuestionTally.objects.create(question=question, option="Yes", count=7)
+
+        response = self.client.get(
+            reverse("instructors:responses_list", args=[self.survey.id]),
+            HTTP_HX_REQUEST="true",
+        )
+
+        parsed = self.parse_html(response)
+        rows = [
+            [cell.text_content().strip() for cell in row.cssselect("td")]
+            for row in parsed.cssselect(".tally-table tr")
+        ]
+        self.assertEqual(rows, [["Yes", "7"], ["No", "0"]])
+
     def test_404_response_contains_not_found(self):
         response = self.client.get(reverse("instructors:responses_list", args=[999]))
 
@@ -573,6 +668,163 @@ class InstructorSurveyResponsesViewTest(AuthenticatedTestCase):
         self.assertNotIn("<li>", ul_content, "Response list should be empty")
 
 
+class InstructorResponsesQueryCountTest(AuthenticatedTestCase):
+    def setUp(self):
+        super().setUp()
+        self.survey = self.create_survey()
+        self.questions = [
+            Question.objects.create(survey=self.survey, text=f"Question {i}")
+            for i in range(3)
+        ]
+
+    def add_submissions(self, count):
+        submissions = Submission.objects.bulk_create(
+            Submission(survey=self.survey) for _ in range(count)
+        )
+        Answer.objects.bulk_create(
+            Answer(
+                question=question,
+                answer_text="Answer",
+                submission=submission,
+                survey=self.survey,
+            )
+            for submission in submissions
+            for question in self.questions
+        )
+
+    def count_queries(self):
+        url = reverse("instructors:responses_list", args=[self.survey.id])
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(url, HTTP_HX_REQUEST="true")
+        self.assertEqual(response.status_code, 200)
+        return len(queries)
+
+    def test_query_count_holds_at_10k_submissions(self):
+        self.add_submissions(1)
+        baseline = self.count_queries()
+
+        self.add_submissions(10_000 - 1)
+        self.assertEqual(self.count_queries(), baseline)
+
+
+class InstructorResponsesPaginationTest(AuthenticatedTestCase):
+    def setUp(self):
+        super().setUp()
+        self.survey = self.create_survey()
+        self.question = Question.objects.create(survey=self.survey, text="Q1")
+        for i in range(ANSWER_PAGE_SIZE + 5):
+            Answer.objects.create(
+                question=self.question,
+                answer_text=f"Answer {i}",
+                submission=Submission.objects.create(survey=self.survey),
+            )
+
+    def answer_texts(self, response):
+        return [
+            item.text_content().strip()
+            for item in self.parse_html(response).cssselect("li:not(.load-more)")
+        ]
+
+    def load_more_url(self, response):
+        (load_more,) = self.parse_html(response).cssselect("li.load-more")
+        return load_more.get("hx-get")
+
+    def test_responses_list_shows_only_the_first_page(self):
+        response = self.client.get(
+            reverse("instructors:responses_list", args=[self.survey.id]),
+            HTTP_HX_REQUEST="true",
+        )
+
+        self.assertEqual(
+            self.answer_texts(response),
+            [f"Answer {i}" for i in range(ANSWER_PAGE_SIZE)],
+        )
+        self.assertIn(
+            reverse(
+                "instructors:responses_page", args=[self.survey.id, self.question.id]
+            ),
+            self.load_more_url(response),
+        )
+
+    def test_load_more_returns_the_next_page_without_a_further_link(self):
+        first_page = self.client.get(
+            reverse("instructors:responses_list", args=[self.survey.id]),
+            HTTP_HX_REQUEST="true",
+        )
+
+        response = self.client.get(self.load_more_url(first_page))
+
+        self.assertEqual(
+            self.answer_texts(response),
+            [f"Answer {i}" for i in range(ANSWER_PAGE_SIZE, ANSWER_PAGE_SIZE + 5)],
+        )
+        self.assertNotContains(response, "load-more")
+
+    def test_page_forbidden_for_other_users_survey(self):
+        other_survey = self.create_survey(
+            owner=self.create_user("other@example.com"), name="Other"
+        )
+        other_question = Question.objects.create(survey=other_survey, text="Q1")
+
+        response = self.client.get(
+            reverse(
+                "instructors:responses_page", args=[other_survey.id, other_question.id]
+            )
+        )
+
+        self.assertEqual(response.status_code, 403)
+
+    def test_page_404_for_question_from_another_survey(self):
+        other_question = Question.objects.create(
+            survey=self.create_survey(name="Other"), text="Elsewhere"
+        )
+
+        response = self.client.get(
+            reverse(
+                "instructors:responses_page", args=[self.survey.id, other_question.id]
+            )
+        )
+
+        self.assertEqual(response.status_code, 404)
+
+    def test_page_rejects_a_malformed_cursor(self):
+        response = self.client.get(
+            reverse(
+                "instructors:responses_page", args=[self.survey.id, self.question.id]
+            ),
+            {"after": "not-a-cursor"},
+        )
+
+        self.assertEqual(response.status_code, 400)
+
+
+class InstructorSurveySummaryViewTest(AuthenticatedTestCase):
+    def test_summary_returns_json_statistics(self):
+        survey = self.create_survey()
+        question = Question.objects.create(
+            survey=survey, text="Rate it", question_type="rating", options=[1, 2, 3]
+        )
+        QuestionTally.objects.create(question=question, option="2", count=4)
+
+        response = self.client.get(
+            reverse("instructors:survey_summary", args=[survey.id])
+        )
+
+        self.assertEqual(response["Content-Type"], "application/json")
+        (summary,) = response.json()["questions"]
+        self.assertEqual(summary["question_id"], question.id)
+        self.assertEqual(summary["median"], 2.0)
+
+    def test_summary_forbidden_for_other_users_survey(self):
+        other_survey = self.create_survey(owner=self.create_user("other@example.com"))
+
+        response = self.client.get(
+            reverse("instructors:survey_summary", args=[other_survey.id])
+        )
+
+        self.assertEqual(response.status_code, 403)
+
+
 class InstructorExportResponsesViewTest(AuthenticatedTestCase):
     def setUp(self):
         super().setUp()
@@ -606,7 +858,7 @@ class InstructorExportResponsesViewTest(AuthenticatedTestCase):
         response = self.client.get(
             reverse("instructors:export_responses", args=[self.survey.id])
         )
-        content = response.content.decode("utf-8")
+        content = b"".join(response.streaming_content).decode("utf-8")
         csv_reader = csv.reader(StringIO(content))
         header = next(csv_reader)
 
@@ -633,7 +885,7 @@ class InstructorExportResponsesViewTest(AuthenticatedTestCase):
         response = self.client.get(
             reverse("instructors:export_responses", args=[self.survey.id])
         )
-        content = response.content.decode("utf-8")
+        content = b"".join(response.streaming_content).decode("utf-8")
         csv_reader = csv.reader(StringIO(content))
         rows = list(csv_reader)
 
@@ -649,7 +901,7 @@ class InstructorExportResponsesViewTest(AuthenticatedTestCase):
         response = self.client.get(
             reverse("instructors:export_responses", args=[self.survey.id])
         )
-        content = response.content.decode("utf-8")
+        content = b"".join(response.streaming_content).decode("utf-8")
         csv_reader = csv.reader(StringIO(content))
         rows = list(csv_reader)
 
@@ -694,7 +946,7 @@ class InstructorExportResponsesViewTest(AuthenticatedTestCase):
             reverse("instructors:export_responses", args=[self.survey.id])
         )
 
-        content = response.content.decode("utf-8")
+        content = b"".join(response.streaming_content).decode("utf-8")
         csv_reader = csv.reader(StringIO(content))
         header = next(csv_reader)
         data_row = next(csv_reader)
@@ -752,7 +1004,7 @@ class InstructorExportResponsesViewTest(AuthenticatedTestCase):
             reverse("instructors:export_responses", args=[self.survey.id])
         )
 
-        content = response.content.decode("utf-8")
+        content = b"".join(response.streaming_content).decode("utf-8")
         csv_reader = csv.reader(StringIO(content))
         header = next(csv_reader)
         data_row = next(csv_reader)
@@ -781,6 +1033,139 @@ class InstructorExportResponsesViewTest(AuthenticatedTestCase):
         self.assertIn(f"survey_{self.survey.id}", content_disposition.lower())
         self.assertIn("_responses.csv", content_disposition.lower())
 
+    def test_export_streams_the_csv(self):
+        response = self.client.get(
+            reverse("instructors:export_responses", args=[self.survey.id])
+        )
+
+        self.assertTrue(response.streaming)
+
+    async def test_export_streams_asynchronously_under_asgi(self):
+        question = await Question.objects.acreate(survey=self.survey, text="Q")
+        submission = await Submission.objects.acreate(survey=self.survey)
+        await Answer.objects.acreate(
+            question=question,
+            answer_text="A",
+            submission=submission,
+            survey=self.survey,
+        )
+        await self.async_client.aforce_login(self.user)
+
+        response = await self.async_client.get(
+            reverse("instructors:export_responses", args=[self.survey.id])
+        )
+
+        # A sync iterator would be read whole before the first byte is sent
+        self.assertTrue(response.is_async)
+        content = b"".join([chunk async for chunk in response.streaming_content])
+        self.assertEqual(content.decode(), f"Submission ID,Q\r\n{submission.id},A\r\n")
+
+    def test_export_includes_submissions_without_answers(self):
+        Question.objects.create(survey=self.survey, text="Question 1")
+        submission = Submission.objects.create(survey=self.survey)
+
+        response = self.client.get(
+            reverse("instructors:export_responses", args=[self.survey.id])
+        )
+        content = b"".join(response.streaming_content).decode("utf-8")
+        rows = list(csv.reader(StringIO(content)))
+
+        self.assertEqual(rows[1], [str(submission.id), ""])
+
+    def test_export_query_count_does_not_depend_on_submissions(self):
+        questions = [
+            Question.objects.create(survey=self.survey, text=f"Question {i}")
+            for i in range(3)
+        ]
+        url = reverse("instructors:export_responses", args=[self.survey.id])
+
+        def export_query_count(submission_count):
+            submissions = Submission.objects.bulk_create(
+                Submission(survey=self.survey) for _ in range(submission_count)
+            )
+            Answer.objects.bulk_create(
+                Answer(
+                    question=question,
+                    answer_text="A",
+                    submission=submission,
+                    survey=self.survey,
+                )
+                for submission in submissions
+                for question in questions
+            )
+            with CaptureQueriesContext(connection) as queries:
+                response = self.client.get(url)
+                rows = list(
+                    csv.reader(
+                        StringIO(b"".join(response.streaming_content).decode("utf-8"))
+                    )
+                )
+            return len(queries), len(rows)
+
+        small_count, small_rows = export_query_count(2)
+        large_count, large_rows = export_query_count(5000)
+
+        self.assertEqual(small_rows, 1 + 2)
+        self.assertEqual(large_rows, 1 + 5002)
+        self.assertEqual(large_count, small_count)
+
+
+class InstructorQrCodeViewTest(AuthenticatedTestCase):
+    def setUp(self):
+        super().setUp()
+        cache.clear()
+        self.survey = self.create_survey()
+        self.url = reverse("instructors:generate_qr_code", args=[self.survey.id])
+
+    def test_qr_code_is_a_png_with_caching_headers(self):
+        response = self.client.get(self.url)
+
+        self.assertEqual(response["Content-Type"], "image/png")
+        self.assertTrue(response.content.startswith(b"\x89PNG"))
+        self.assertRegex(response["ETag"], r'^"[0-9a-f]{64}"$')
+        self.assertIn("private", response["Cache-Control"])
+        self.assertIn("max-age", response["Cache-Control"])
+
+    def test_matching_etag_gets_not_modified_without_rendering(self):
+        etag = self.client.get(self.url)["ETag"]
+
+        with patch("instructors.qr.render_qr_code") as render_qr_code:
+            response = self.client.get(self.url, HTTP_IF_NONE_MATCH=etag)
+
+        self.assertEqual(response.status_code, 304)
+        self.assertEqual(response["ETag"], etag)
+        render_qr_code.assert_not_called()
+
+    def test_repeat_requests_reuse_the_rendered_image(self):
+        first = self.client.get(self.url)
+
+        with patch("instructors.qr.render_qr_code") as render_qr_code:
+            second = self.client.get(self.url)
+
+        render_qr_code.assert_not_called()
+        self.assertEqual(first.content, second.content)
+
+    def test_svg_format(self):
+        response = self.client.get(self.url, {"format": "svg"})
+
+        self.assertEqual(response["Content-Type"], "image/svg+xml")
+        self.assertIn(b"<svg", response.content)
+        self.assertNotEqual(response["ETag"], self.client.get(self.url)["ETag"])
+
+    def test_unknown_format_is_rejected(self):
+        response = self.client.get(self.url, {"format": "gif"})
+
+        self.assertEqual(response.status_code, 400)
+
+    def test_qr_code_forbidden_for_other_users_survey(self):
+        other_survey = self.create_survey(owner=self.create_user("other@example.com"))
+
+        response = self.client.get(
+            reverse("instructors:generate_qr_code", args=[other_survey.id])
+        )
+
+        self.assertEqual(response.status_code, 403)
+
 
 class QuestionValidationErrorDisplayTest(AuthenticatedTestCase):
     def test_empty_question_shows_is_invalid_class(self):
@@ -11,12 +11,28 @@ urlpatterns = [
         views.responses_list,
         name="responses_list",
     ),
+    path(
+        "survey/<int:survey_id>/responses/stream/",
+        views.responses_stream,
+        name="responses_stream",
+    ),
+    path(
+        "survey/<int:survey_id>/responses/question/<int:question_id>/",
+        views.responses_page,
+        name="responses_page",
+    ),
+    path(
+        "survey/<int:survey_id>/summary/",
+        views.survey_summary,
+        name="survey_summary",
+    ),
     path(
         "survey/<int:survey_id>/",
         views.survey_detail,
         name="survey_detail",
     ),
     path("surveys/", views.surveys_list, name="surveys_list"),
+    path("surveys/qr/", views.qr_codes, name="qr_codes"),
     # Action URLs
     path(
         "survey/create/",
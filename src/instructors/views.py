@@ -7,17 +7,36 @@ This module was developed using AI tools (Claude, VS Code AI) for:
 All architecture and design decisions and final implementations are my own work.
 """
 
+from asgiref.sync import sync_to_async
 from django.contrib.auth.decorators import login_required
-from django.http import HttpResponse
-from django.shortcuts import get_object_or_404, redirect, render
+from django.core.handlers.asgi import ASGIRequest
+from django.http import HttpResponse, JsonResponse, StreamingHttpResponse
+from django.db.models import Max
+from django.shortcuts import aget_object_or_404, get_object_or_404, redirect, render
 from django.urls import reverse
+from django.utils.cache import get_conditional_response, patch_cache_control
+from django.utils.http import quote_etag
 
 import csv
-from io import BytesIO
-import qrcode
 
+from evalhub.streaming import streaming_content
+from instructors.live import response_events
+from instructors.qr import QR_FORMATS, QR_MAX_AGE, get_qr_code, qr_digest
+from instructors.qr_batch import QR_BATCH_FORMATS, stream_qr_codes
+from surveys.aggregation import (
+    afirst_answer_pages,
+    decode_answer_cursor,
+    iter_submission_rows,
+    question_answer_page,
+)
 from surveys.forms import QuestionForm
-from surveys.models import Survey
+from surveys.listing import asurvey_page, decode_survey_cursor
+from surveys.models import Question, Survey
+from surveys.summary import get_survey_summary
+from surveys.tallies import atallies_for_questions
+
+# Templates read request.user lazily, which can only be loaded synchronously
+arender = sync_to_async(render)
 
 
 @login_required
@@ -27,33 +46,107 @@ def dashboard(request):
 
 # Display views
 @login_required
-def responses_list(request, survey_id):
-    survey = get_object_or_404(Survey, id=survey_id)
+async def responses_list(request, survey_id):
+    survey = await aget_object_or_404(Survey, id=survey_id)
+    user = await request.auser()
 
     # Check ownership
-    if survey.owner != request.user:
+    if survey.owner_id != user.pk:
         return HttpResponse("403 - Forbidden", status=403)
 
-    # Group answers by question for easier display
-    questions_with_answers = []
-    for question in survey.question_set.all():
-        answers = []
-        for submission in survey.submissions.all():
-            for answer in submission.answers.filter(question=question):
-                answers.append(answer)
-        questions_with_answers.append({"question": question, "answers": answers})
+    # First page of answers per question; the rest load on demand
+    questions_with_answers = await afirst_answer_pages(survey)
+    tallies = await atallies_for_questions(
+        [item["question"] for item in questions_with_answers]
+    )
+    for item in questions_with_answers:
+        item["tallies"] = tallies.get(item["question"].id, [])
 
-    context = {"survey": survey, "questions_with_answers": questions_with_answers}
+    last_submission = await survey.submissions.aaggregate(last=Max("id"))
+    context = {
+        "survey": survey,
+        "questions_with_answers": questions_with_answers,
+        # The live feed picks up from here
+        "last_submission_id": last_submission["last"],
+    }
 
     if request.headers.get("HX-Request"):
-        return render(request, "partials/responses_list.html", context)
-    return render(
+        return await arender(request, "partials/responses_list.html", context)
+    return await arender(
         request,
         "dashboard.html",
         {"initial_view": "responses_list", **context},
     )
 
 
+@login_required
+async def responses_stream(request, survey_id):
+    survey = await aget_object_or_404(Survey, id=survey_id)
+    user = await request.auser()
+
+    if survey.owner_id != user.pk:
+        return HttpResponse("403 - Forbidden", status=403)
+
+    # A reconnecting EventSource resumes from the last id it was sent
+    cursor = request.headers.get("Last-Event-ID") or request.GET.get("after")
+    try:
+        after = int(cursor) if cursor else None
+    except ValueError:
+        return HttpResponse("400 - Bad Request", status=400)
+    if after is None:
+        after = (await survey.submissions.aaggregate(last=Max("id")))["last"] or 0
+
+    questions = [question async for question in survey.question_set.all()]
+    # A sync worker would be tied up for the whole stream, so under WSGI it
+    # ends after one poll and the browser reconnects after the retry interval
+    single_poll = not isinstance(request, ASGIRequest)
+    response = StreamingHttpResponse(
+        response_events(survey, questions, after, single_poll),
+        content_type="text/event-stream",
+    )
+    response["Cache-Control"] = "no-cache"
+    # Stop nginx-style proxies buffering the stream
+    response["X-Accel-Buffering"] = "no"
+    return response
+
+
+@login_required
+def responses_page(request, survey_id, question_id):
+    survey = get_object_or_404(Survey, id=survey_id)
+
+    if survey.owner != request.user:
+        return HttpResponse("403 - Forbidden", status=403)
+
+    question = get_object_or_404(Question, id=question_id, survey=survey)
+    cursor = request.GET.get("after")
+    try:
+        after = decode_answer_cursor(cursor) if cursor else None
+    except ValueError:
+        return HttpResponse("400 - Bad Request", status=400)
+
+    answers, next_cursor = question_answer_page(question, after=after)
+    return render(
+        request,
+        "partials/answer_page.html",
+        {
+            "survey": survey,
+            "question": question,
+            "answers": answers,
+            "next_cursor": next_cursor,
+        },
+    )
+
+
+@login_required
+def survey_summary(request, survey_id):
+    survey = get_object_or_404(Survey, id=survey_id)
+
+    if survey.owner != request.user:
+        return HttpResponse("403 - Forbidden", status=403)
+
+    return JsonResponse(get_survey_summary(survey))
+
+
 @login_required
 def survey_detail(request, survey_id):
     survey_id = request.resolver_match.kwargs.get("survey_id")
@@ -127,17 +220,30 @@ def survey_detail(request, survey_id):
 
 
 @login_required
-def surveys_list(request):
+async def surveys_list(request):
     if request.method == "GET":
-        surveys = Survey.objects.filter(owner=request.user).order_by("-created_at")
+        prefix = request.GET.get("q", "").strip()
+        cursor = request.GET.get("after")
+        try:
+            after = decode_survey_cursor(cursor) if cursor else None
+        except ValueError:
+            return HttpResponse("400 - Bad Request", status=400)
+
+        user = await request.auser()
+        surveys, next_cursor = await asurvey_page(user, after=after, prefix=prefix)
+        context = {"surveys": surveys, "next_cursor": next_cursor, "q": prefix}
+
+        # Search results and further pages replace or extend just the rows
+        if cursor or request.headers.get("HX-Target") == "survey-rows":
+            return await arender(request, "partials/survey_rows.html", context)
         # If htmx request, return the survey list partial
         if request.headers.get("HX-Request"):
-            return render(request, "partials/surveys_list.html", {"surveys": surveys})
+            return await arender(request, "partials/surveys_list.html", context)
         else:
-            return render(
+            return await arender(
                 request,
                 "dashboard.html",
-                {"initial_view": "surveys_list", "surveys": surveys},
+                {"initial_view": "surveys_list", **context},
             )
 
 
@@ -176,25 +282,36 @@ def export_responses(request, survey_id):
     if survey.owner != request.user:
         return HttpResponse("403 - Forbidden", status=403)
 
-    # Create the HttpResponse object with CSV header
-    response = HttpResponse(content_type="text/csv")
+    questions = list(survey.question_set.all())
+
+    # Stream rows as they are pivoted instead of building the file in memory
+    response = StreamingHttpResponse(
+        streaming_content(request, _csv_export_rows(survey, questions)),
+        content_type="text/csv",
+    )
     response["Content-Disposition"] = (
         f'attachment; filename="survey_{survey_id}_responses.csv"'
     )
+    return response
+
+
+class _Echo:
+    """File-like object that hands each written CSV line straight back."""
 
-    writer = csv.writer(response)
+    def write(self, value):
+        return value
+
+
+def _csv_export_rows(survey, questions):
+    writer = csv.writer(_Echo())
 
     # Write header row with submission ID and question texts
-    questions = survey.question_set.all()
-    header = ["Submission ID"] + [q.text for q in questions]
-    writer.writerow(header)
+    yield writer.writerow(["Submission ID"] + [q.text for q in questions])
 
     # Write data rows - one row per submission
-    for submission in survey.submissions.all():
-        row = [submission.id]
-        for question in questions:
-            # Find the answer for this question in this submission
-            answer = submission.answers.filter(question=question).first()
+    for submission_id, answers in iter_submission_rows(survey, questions):
+        row = [submission_id]
+        for answer in answers:
             if answer:
                 # Combine answer text with comment if present
                 cell_content = answer.answer_text
@@ -203,9 +320,7 @@ def export_responses(request, survey_id):
                 row.append(cell_content)
             else:
                 row.append("")
-        writer.writerow(row)
-
-    return response
+        yield writer.writerow(row)
 
 
 @login_required
@@ -216,22 +331,59 @@ def generate_qr_code(request, survey_id):
     if survey.owner != request.user:
         return HttpResponse("403 - Forbidden", status=403)
 
+    image_format = request.GET.get("format", "png")
+    if image_format not in QR_FORMATS:
+        return HttpResponse("400 - Bad Request", status=400)
+
     # Generate the full URL for the survey
     survey_url = request.build_absolute_uri(
         reverse("students:take_survey", args=[survey_id])
     )
 
-    # Create QR code
-    qr = qrcode.QRCode(version=1, box_size=10, border=5)
-    qr.add_data(survey_url)
-    qr.make(fit=True)
-
-    # Generate image
-    img = qr.make_image(fill_color="black", back_color="white")
+    # The image only depends on the URL, so a matching ETag needs no rendering
+    etag = quote_etag(qr_digest(survey_url, image_format))
+    response = get_conditional_response(request, etag=etag)
+    if response is None:
+        image, _ = get_qr_code(survey_url, image_format)
+        response = HttpResponse(image, content_type=QR_FORMATS[image_format])
+    response["ETag"] = etag
+    patch_cache_control(response, private=True, max_age=QR_MAX_AGE)
+    return response
 
-    # Save to BytesIO buffer
-    buffer = BytesIO()
-    img.save(buffer, format="PNG")
-    buffer.seek(0)
 
-    return HttpResponse(buffer.getvalue(), content_type="image/png")
+@login_required
+def qr_codes(request):
+    archive_format = request.GET.get("format", "zip")
+    image_format = request.GET.get("image", "png")
+    if archive_format not in QR_BATCH_FORMATS or image_format not in QR_FORMATS:
+        return HttpResponse("400 - Bad Request", status=400)
+
+    surveys = Survey.objects.filter(owner=request.user).order_by("-created_at", "-id")
+    # Defaults to every survey the instructor owns
+    if request.GET.getlist("survey"):
+        try:
+            survey_ids = [int(survey_id) for survey_id in request.GET.getlist("survey")]
+        except ValueError:
+            return HttpResponse("400 - Bad Request", status=400)
+        surveys = surveys.filter(id__in=survey_ids)
+
+    entries = [
+        (
+            survey.id,
+            survey.name,
+            request.build_absolute_uri(
+                reverse("students:take_survey", args=[survey.id])
+            ),
+        )
+        for survey in surveys.only("id", "name")
+    ]
+    response = StreamingHttpResponse(
+        streaming_content(
+            request, stream_qr_codes(entries, archive_format, image_format)
+        ),
+        content_type=QR_BATCH_FORMATS[archive_format],
+    )
+    response["Content-Disposition"] = (
+        f'attachment; filename="survey_qr_codes.{archive_format}"'
+    )
+    return response
@@ -1,6 +1,9 @@
-from django.test import TestCase
+from django.test import Client, TestCase
 from django.urls import reverse
+import lxml.html
+
 from accounts.models import User
+from students.views import CSRF_TOKEN_PLACEHOLDER
 from surveys.models import Survey, Question, Submission, Answer
 
 
@@ -203,3 +206,71 @@ class QuestionTypeRenderingTest(TestCase):
 
         # Multiple choice SHOULD have comment field
         self.assertContains(response, f'name="comment_{mc_q.id}"')
+
+
+class StudentSurveyPageCacheTest(TestCase):
+    def setUp(self):
+        self.instructor = User.objects.create_user(
+            email="instructor@example.com", password="testpass123"
+        )
+        self.survey = Survey.objects.create(owner=self.instructor, name="Test Survey")
+        self.question = Question.objects.create(
+            survey=self.survey,
+            text="Would you recommend?",
+            question_type="yes_no",
+            options=["Yes", "No"],
+        )
+        self.url = reverse("students:take_survey", args=[self.survey.id])
+
+    def test_warm_page_only_queries_the_survey(self):
+        self.client.get(self.url)
+
+        with self.assertNumQueries(1):
+            response = self.client.get(self.url)
+
+        self.assertContains(response, "Would you recommend?")
+        self.assertContains(response, 'value="Yes"')
+
+    def test_each_visitor_gets_their_own_csrf_token(self):
+        first = Client().get(self.url)
+        second = Client().get(self.url)
+
+        first_token = first.cookies["csrftoken"].value
+        second_token = second.cookies["csrftoken"].value
+        self.assertNotEqual(first_token, second_token)
+        for response in (first, second):
+            self.assertNotContains(response, CSRF_TOKEN_PLACEHOLDER)
+            self.assertContains(response, 'name="csrfmiddlewaretoken"')
+
+    def test_cached_page_accepts_a_post_with_csrf_checks(self):
+        client = Client(enforce_csrf_checks=True)
+        client.get(self.url)
+        response = client.get(self.url)
+        token = self.csrf_token_in(response)
+
+        response = client.post(
+            self.url,
+            {"csrfmiddlewaretoken": token, f"response_{self.question.id}": "Yes"},
+        )
+
+        self.assertContains(response, "Thank you")
+        self.assertEqual(Answer.objects.get().answer_text, "Yes")
+
+    def test_question_changes_show_up_immediately(self):
+        self.client.get(self.url)
+
+        Question.objects.create(survey=self.survey, text="Anything else?")
+
+        self.assertContains(self.client.get(self.url), "Anything else?")
+
+    def test_renaming_the_survey_shows_up_immediately(self):
+        self.client.get(self.url)
+
+        self.survey.name = "Renamed Survey"
+        self.survey.save()
+
+        self.assertContains(self.client.get(self.url), "Renamed Survey")
+
+    def csrf_token_in(self, response):
+        parsed = lxml.html.fromstring(response.content)
+        return parsed.cssselect('input[name="csrfmiddlewaretoken"]')[0].get("value")
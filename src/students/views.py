@@ -7,34 +7,81 @@ This module was developed using AI tools (Claude, VS Code AI) for:
 All architecture and design decisions and final implementations are my own work.
 """
 
-from django.shortcuts import get_object_or_404, render
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.core.cache import cache
+from django.middleware.csrf import get_token
+from django.shortcuts import aget_object_or_404, render
+from django.template.loader import render_to_string
+from django.utils.safestring import mark_safe
 
+from evalhub.metrics import SUBMISSIONS_QUEUED, record_cache_lookup
 from surveys.forms import (
     SurveyAnswerForm,
 )
+from surveys.ingest import get_submission_queue
 from surveys.models import Survey
+from surveys.schema import SCHEMA_CACHE_TIMEOUT, aget_survey_schema
 
+# Stands in for the per-visitor CSRF token inside the cached survey body
+CSRF_TOKEN_PLACEHOLDER = "csrf-token-placeholder"
 
-def take_survey(request, survey_id):
-    survey = get_object_or_404(Survey, id=survey_id)
+# Templates read request.user lazily, which can only be loaded synchronously
+arender = sync_to_async(render)
+
+
+async def take_survey(request, survey_id):
+    survey = await aget_object_or_404(Survey, id=survey_id)
 
     if request.method == "POST":
-        form = SurveyAnswerForm(survey=survey, data=request.POST)
-        if form.is_valid():
-            form.save()
+        # Validating and writing a submission stay synchronous
+        if await sync_to_async(_submit)(request, survey):
             if request.headers.get("HX-Request"):
-                return render(
+                return await arender(
                     request,
                     "partials/confirmation_message.html",
                     {"survey": survey, "submitted": True},
                 )
             # Render confirmation instead of redirecting
-            return render(
+            return await arender(
                 request,
                 "student_survey.html",
                 {"survey": survey, "submitted": True},
             )
+
+    return await arender(
+        request,
+        "student_survey.html",
+        {"survey": survey, "survey_body": await _survey_body(request, survey)},
+    )
+
+
+def _submit(request, survey):
+    form = SurveyAnswerForm(survey=survey, data=request.POST)
+    if not form.is_valid():
+        return False
+    if settings.SUBMISSION_QUEUE_DIR:
+        # Acknowledge now; drain_submissions writes it in a batch
+        get_submission_queue().put(form.submission_payload())
+        SUBMISSIONS_QUEUED.inc()
     else:
-        form = SurveyAnswerForm(survey=survey)
+        form.save()
+    return True
+
 
-    return render(request, "student_survey.html", {"survey": survey, "form": form})
+async def _survey_body(request, survey):
+    # The survey form is the same for every student, so render it once per
+    # schema version and only swap in this visitor's CSRF token
+    key = f"survey_body:{survey.id}:{survey.schema_version}"
+    body = await cache.aget(key)
+    record_cache_lookup("survey_body", body is not None)
+    if body is None:
+        body = render_to_string(
+            "partials/survey_form.html",
+            {
+                "schema": await aget_survey_schema(survey),
+                "csrf_token": CSRF_TOKEN_PLACEHOLDER,
+            },
+        )
+        await cache.aset(key, body, SCHEMA_CACHE_TIMEOUT)
+    return mark_safe(body.replace(CSRF_TOKEN_PLACEHOLDER, get_token(request)))
@@ -0,0 +1,108 @@
+from django.db.models import Q
+
+from surveys.models import Answer
+
+
+# Answers shown per question before the instructor asks for more
+ANSWER_PAGE_SIZE = 20
+
+
+def encode_answer_cursor(answer):
+    return f"{answer.submission_id}-{answer.id}"
+
+
+def decode_answer_cursor(cursor):
+    """Return the (submission_id, answer_id) a cursor points at.
+
+    Raises ValueError for anything encode_answer_cursor() could not have made.
+    """
+    submission_id, answer_id = (int(part) for part in cursor.split("-"))
+    return submission_id, answer_id
+
+
+def question_answer_page(question, after=None, page_size=ANSWER_PAGE_SIZE):
+    """Return (answers, next_cursor) for one page of a question's answers.
+
+    Answers come in submission order. Pages are keyed on (submission_id, id)
+    rather than an offset, so every page is one short index range scan however
+    deep into the responses it is. next_cursor is None on the last page.
+    """
+    answers = _answer_page_queryset(question, after)
+    return _split_answer_page(list(answers[: page_size + 1]), page_size)
+
+
+async def aquestion_answer_page(question, after=None, page_size=ANSWER_PAGE_SIZE):
+    answers = _answer_page_queryset(question, after)
+    page = [answer async for answer in answers[: page_size + 1]]
+    return _split_answer_page(page, page_size)
+
+
+def _answer_page_queryset(question, after):
+    answers = Answer.objects.filter(question=question).order_by("submission_id", "id")
+    if after is not None:
+        submission_id, answer_id = after
+        answers = answers.filter(
+            Q(submission_id__gt=submission_id)
+            | Q(submission_id=submission_id, id__gt=answer_id)
+        )
+    return answers
+
+
+def _split_answer_page(page, page_size):
+    if len(page) > page_size:
+        page = page[:page_size]
+        return page, encode_answer_cursor(page[-1])
+    return page, None
+
+
+async def afirst_answer_pages(survey, page_size=ANSWER_PAGE_SIZE):
+    """Return [{"question", "answers", "next_cursor"}] for every question.
+
+    Each question gets its first page only, so the work done is bounded by the
+    number of questions, not the number of submissions.
+    """
+    pages = []
+    async for question in survey.question_set.all():
+        answers, next_cursor = await aquestion_answer_page(
+            question, page_size=page_size
+        )
+        pages.append(
+            {"question": question, "answers": answers, "next_cursor": next_cursor}
+        )
+    return pages
+
+
+def iter_submission_rows(survey, questions, chunk_size=2000):
+    """Yield (submission_id, [answer or None per question]) in submission order.
+
+    Walks the survey's submissions and answers as two ordered, chunked streams
+    and merges them, so memory stays flat however many submissions there are.
+    Submissions without any answers still get a row.
+    """
+    columns = {question.id: index for index, question in enumerate(questions)}
+
+    submission_ids = (
+        survey.submissions.order_by("id")
+        .values_list("id", flat=True)
+        .iterator(chunk_size=chunk_size)
+    )
+    answers = (
+        Answer.objects.filter(survey=survey)
+        .order_by("submission_id", "question_id", "id")
+        .only("question_id", "submission_id", "answer_text", "comment_text")
+        .iterator(chunk_size=chunk_size)
+    )
+
+    answer = next(answers, None)
+    for submission_id in submission_ids:
+        row = [None] * len(questions)
+        # Answers are sorted the same way, so only the head of the stream
+        # can belong to this submission
+        while answer is not None and answer.submission_id <= submission_id:
+            column = columns.get(answer.question_id)
+            if answer.submission_id == submission_id and column is not None:
+                # Keep the first answer per question, as the export always has
+                if row[column] is None:
+                    row[column] = answer
+            answer = next(answers, None)
+        yield submission_id, row
@@ -1,7 +1,11 @@
 from django import forms
 from django.core.exceptions import ValidationError
+from django.utils import timezone
 
-from surveys.models import Answer, Question, Survey
+from surveys.ingest import write_submissions
+from surveys.models import Question, Survey
+from surveys.schema import get_survey_schema
+from surveys.tallies import selected_options
 
 DUPLICATE_QUESTION_ERROR = "You've already got this question in your survey"
 EMPTY_SURVEY_NAME_ERROR = "You can't have a survey without a name"
@@ -43,80 +47,83 @@ class SurveyAnswerForm(forms.Form):
     def __init__(self, survey, *args, **kwargs):
         super().__init__(*args, **kwargs)
         self.survey = survey
+        # Built from the cached schema, so a warm cache means no Question query
+        self.questions = get_survey_schema(survey)["questions"]
 
         # Dynamically add a field for each question
-        for question in survey.question_set.all():
-            field_name = f"response_{question.id}"
+        for question in self.questions:
+            field_name = question["field_name"]
+            label = question["text"]
+            choices = [(option, option) for option in question["options"]]
 
-            if question.question_type == "multiple_choice":
-                choices = [(option, option) for option in question.options]
+            if question["question_type"] == "multiple_choice":
                 self.fields[field_name] = forms.ChoiceField(
-                    label=question.text,
+                    label=label,
                     required=False,
                     widget=forms.RadioSelect,
                     choices=choices,
                 )
-            elif question.question_type == "rating":
-                choices = [(option, option) for option in question.options]
+            elif question["question_type"] == "rating":
                 self.fields[field_name] = forms.ChoiceField(
-                    label=question.text,
+                    label=label,
                     required=False,
                     widget=forms.RadioSelect,
                     choices=choices,
                 )
 
-            elif question.question_type == "checkbox":
-                choices = [(option, option) for option in question.options]
+            elif question["question_type"] == "checkbox":
                 self.fields[field_name] = forms.MultipleChoiceField(
-                    label=question.text,
+                    label=label,
                     required=False,
                     widget=forms.CheckboxSelectMultiple,
                     choices=choices,
                 )
-            elif question.question_type == "yes_no":
-                choices = [(option, option) for option in question.options]
+            elif question["question_type"] == "yes_no":
                 self.fields[field_name] = forms.ChoiceField(
-                    label=question.text,
+                    label=label,
                     required=False,
                     widget=forms.RadioSelect,
                     choices=choices,
                 )
 
             else:  # text question
-                self.fields[field_name] = forms.CharField(
-                    label=question.text, required=False
-                )
+                self.fields[field_name] = forms.CharField(label=label, required=False)
 
             # Add comment field for non-text question types
-            if question.question_type != "text":
-                comment_field_name = f"comment_{question.id}"
-                self.fields[comment_field_name] = forms.CharField(
+            if question["comment_field_name"]:
+                self.fields[question["comment_field_name"]] = forms.CharField(
                     label="Additional comments (optional)",
                     required=False,
                     widget=forms.Textarea(attrs={"rows": 2}),
                 )
 
-    def save(self):
-        from surveys.models import Submission
-
-        # Create a submission for this set of answers
-        submission = Submission.objects.create(survey=self.survey)
-
-        for question in self.survey.question_set.all():
-            field_name = f"response_{question.id}"
-            comment_field_name = f"comment_{question.id}"
-
-            answer_text = self.cleaned_data.get(field_name, "")
-            comment_text = self.cleaned_data.get(comment_field_name, "")
+    def submission_payload(self):
+        """Describe this submission as plain data that can be queued."""
+        answers = []
+        for question in self.questions:
+            value = self.cleaned_data.get(question["field_name"]) or ""
+            comment_text = ""
+            if question["comment_field_name"]:
+                comment_text = self.cleaned_data.get(question["comment_field_name"], "")
+
+            answers.append(
+                {
+                    "question_id": question["id"],
+                    # Checkbox selections are stored as the repr of the list
+                    "answer_text": value if isinstance(value, str) else str(value),
+                    "comment_text": comment_text,
+                    "options": selected_options(question["question_type"], value),
+                }
+            )
+        return {
+            "survey_id": self.survey.id,
+            "submitted_at": timezone.now().isoformat(),
+            "answers": answers,
+        }
 
-            # Only save if there's either an answer or a comment
-            if answer_text or comment_text:
-                Answer.objects.create(
-                    question=question,
-                    answer_text=answer_text,
-                    comment_text=comment_text,
-                    submission=submission,
-                )
+    def save(self):
+        (submission,) = write_submissions([self.submission_payload()])
+        return submission
 
 
 class SurveyEditForm(forms.ModelForm):
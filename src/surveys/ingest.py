@@ -0,0 +1,198 @@
+import json
+import logging
+import os
+import time
+import uuid
+from collections import Counter
+from pathlib import Path
+
+from django.conf import settings
+from django.db import DataError, IntegrityError, transaction
+from django.utils.dateparse import parse_datetime
+
+from evalhub.metrics import ANSWER_BATCH_SIZE, SUBMISSIONS_INGESTED
+from surveys.models import Answer, Question, Submission, Survey
+from surveys.tallies import increment_tallies
+
+logger = logging.getLogger("evalhub.ingest")
+
+# What a bad payload can make write_submissions raise. Anything else, like
+# the database going away, stops the drain with the batch left claimed.
+PAYLOAD_ERRORS = (IntegrityError, DataError, KeyError, TypeError, ValueError)
+
+
+def write_submissions(payloads):
+    """Insert submission payloads in a single transaction and return them.
+
+    Each payload is the dict built by SurveyAnswerForm.submission_payload().
+    """
+    with transaction.atomic():
+        submissions = Submission.objects.bulk_create(
+            Submission(
+                survey_id=payload["survey_id"],
+                created_at=parse_datetime(payload["submitted_at"]),
+            )
+            for payload in payloads
+        )
+
+        answers = []
+        tally_counts = Counter()
+        for submission, payload in zip(submissions, payloads):
+            for answer in payload["answers"]:
+                if answer["answer_text"] or answer["comment_text"]:
+                    answers.append(
+                        Answer(
+                            question_id=answer["question_id"],
+                            answer_text=answer["answer_text"],
+                            comment_text=answer["comment_text"],
+                            submission=submission,
+                            survey_id=submission.survey_id,
+                        )
+                    )
+                for option in answer["options"]:
+                    tally_counts[answer["question_id"], option] += 1
+
+        Answer.objects.bulk_create(answers)
+        increment_tallies(tally_counts)
+    SUBMISSIONS_INGESTED.inc(len(submissions))
+    ANSWER_BATCH_SIZE.observe(len(answers))
+    return submissions
+
+
+class SubmissionQueue:
+    """Durable spool of validated submissions waiting to be written.
+
+    Each submission is one JSON file, written to tmp/, fsynced and renamed
+    into new/. That makes put() safe from any number of web workers without a
+    database lock. A drain worker claims files by renaming them into cur/ and
+    deletes them once their batch has committed, or moves them into failed/
+    if they can't be written. Run only one drain worker per queue directory.
+    """
+
+    def __init__(self, path):
+        self.path = Path(path)
+        self.tmp_dir = self.path / "tmp"
+        self.new_dir = self.path / "new"
+        self.cur_dir = self.path / "cur"
+        self.failed_dir = self.path / "failed"
+        for directory in (self.tmp_dir, self.new_dir, self.cur_dir, self.failed_dir):
+            directory.mkdir(parents=True, exist_ok=True)
+
+    def put(self, payload):
+        # Names sort in arrival order, which drain preserves
+        name = f"{time.time_ns():020d}-{os.getpid()}-{uuid.uuid4().hex}.json"
+        tmp_path = self.tmp_dir / name
+        with open(tmp_path, "w") as spool_file:
+            json.dump(payload, spool_file)
+            spool_file.flush()
+            os.fsync(spool_file.fileno())
+        os.rename(tmp_path, self.new_dir / name)
+        self._fsync_dir(self.new_dir)
+
+    def claim(self, limit):
+        """Move up to limit pending submissions into cur/ and return them."""
+        claimed = []
+        for name in sorted(os.listdir(self.new_dir))[:limit]:
+            path = self.cur_dir / name
+            os.rename(self.new_dir / name, path)
+            try:
+                with open(path) as spool_file:
+                    claimed.append((path, json.load(spool_file)))
+            except ValueError:
+                logger.exception("Unreadable queued submission %s", name)
+                self.fail(path)
+        return claimed
+
+    def ack(self, paths):
+        for path in paths:
+            path.unlink()
+        self._fsync_dir(self.cur_dir)
+
+    def fail(self, path):
+        """Set a claimed submission aside in failed/, for someone to look at."""
+        os.rename(path, self.failed_dir / path.name)
+        self._fsync_dir(self.failed_dir)
+
+    def recover(self):
+        """Requeue submissions a previous worker claimed but never wrote."""
+        for name in os.listdir(self.cur_dir):
+            os.rename(self.cur_dir / name, self.new_dir / name)
+        self._fsync_dir(self.new_dir)
+
+    def pending(self):
+        return len(os.listdir(self.new_dir))
+
+    def _fsync_dir(self, directory):
+        fd = os.open(directory, os.O_RDONLY)
+        try:
+            os.fsync(fd)
+        finally:
+            os.close(fd)
+
+
+def get_submission_queue():
+    return SubmissionQueue(settings.SUBMISSION_QUEUE_DIR)
+
+
+def drain(queue, batch_size=500):
+    """Write queued submissions in batches until the queue is empty.
+
+    If a batch fails, its submissions are written one at a time, and any that
+    fail alone are moved to the queue's failed/ directory, so one bad
+    payload can't hold up the rest of the queue. Delivery is at least once:
+    a batch that committed but wasn't acknowledged before a crash is written
+    again on restart.
+
+    Returns how many submissions were written.
+    """
+    written = 0
+    while True:
+        batch = queue.claim(batch_size)
+        if not batch:
+            return written
+
+        try:
+            written += _write_batch(batch)
+        except PAYLOAD_ERRORS:
+            for path, payload in batch:
+                try:
+                    written += _write_batch([(path, payload)])
+                except PAYLOAD_ERRORS:
+                    logger.exception("Could not write queued submission %s", path.name)
+                    queue.fail(path)
+                else:
+                    queue.ack([path])
+        else:
+            queue.ack([path for path, _ in batch])
+
+
+def _write_batch(batch):
+    payloads = _drop_deleted([payload for _, payload in batch])
+    if payloads:
+        write_submissions(payloads)
+    return len(payloads)
+
+
+def _drop_deleted(payloads):
+    # Surveys or questions may have been deleted while submissions were queued
+    live_surveys = set(
+        Survey.objects.filter(
+            id__in={payload["survey_id"] for payload in payloads}
+        ).values_list("id", flat=True)
+    )
+    payloads = [payload for payload in payloads if payload["survey_id"] in live_surveys]
+    live_questions = set(
+        Question.objects.filter(survey_id__in=live_surveys).values_list("id", flat=True)
+    )
+    # Copies, so a batch that fails can be retried with the original payloads
+    return [
+        {
+            **payload,
+            "answers": [
+                answer
+                for answer in payload["answers"]
+                if answer["question_id"] in live_questions
+            ],
+        }
+        for payload in payloads
+    ]
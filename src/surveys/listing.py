@@ -0,0 +1,77 @@
+from datetime import datetime, timedelta, timezone
+
+from django.db.models import Count, IntegerField, OuterRef, Q, Subquery
+from django.db.models.functions import Coalesce
+
+from surveys.models import Submission, Survey
+
+# Surveys shown per page of an instructor's list
+SURVEY_PAGE_SIZE = 50
+
+_EPOCH = datetime(1970, 1, 1, tzinfo=timezone.utc)
+# Sorts after every character a name can contain, closing a prefix range
+_PREFIX_END = "\U0010ffff"
+
+
+def encode_survey_cursor(survey):
+    micros = (survey.created_at - _EPOCH) // timedelta(microseconds=1)
+    return f"{micros}-{survey.id}"
+
+
+def decode_survey_cursor(cursor):
+    """Return the (created_at, survey_id) a cursor points at.
+
+    Raises ValueError for anything encode_survey_cursor() could not have made.
+    """
+    micros, survey_id = (int(part) for part in cursor.split("-"))
+    return _EPOCH + timedelta(microseconds=micros), survey_id
+
+
+async def asurvey_page(owner, after=None, prefix="", page_size=SURVEY_PAGE_SIZE):
+    """Return (surveys, next_cursor) for one page of owner's surveys.
+
+    Surveys come newest first, keyed on (created_at, id) so a page deep into
+    the list costs the same as the first. prefix narrows to names starting
+    with it; it is case-sensitive so it can be a range on the (owner, name)
+    index. The range relies on names comparing by codepoint, which SQLite does
+    by default and migration 0022 sets up on PostgreSQL. Each survey carries
+    submission_count, counted by the same query for just the surveys on the
+    page.
+    """
+    surveys = _survey_page_queryset(owner, after, prefix)
+    page = [survey async for survey in surveys[: page_size + 1]]
+    return _split_survey_page(page, page_size)
+
+
+def _survey_page_queryset(owner, after, prefix):
+    submission_count = (
+        Submission.objects.filter(survey=OuterRef("pk"))
+        .order_by()
+        .values("survey")
+        .annotate(count=Count("*"))
+        .values("count")
+    )
+    surveys = (
+        Survey.objects.filter(owner=owner)
+        .annotate(
+            submission_count=Coalesce(
+                Subquery(submission_count, output_field=IntegerField()), 0
+            )
+        )
+        .order_by("-created_at", "-id")
+    )
+    if prefix:
+        surveys = surveys.filter(name__gte=prefix, name__lt=prefix + _PREFIX_END)
+    if after is not None:
+        created_at, survey_id = after
+        surveys = surveys.filter(
+            Q(created_at__lt=created_at) | Q(created_at=created_at, id__lt=survey_id)
+        )
+    return surveys
+
+
+def _split_survey_page(page, page_size):
+    if len(page) > page_size:
+        page = page[:page_size]
+        return page, encode_survey_cursor(page[-1])
+    return page, None
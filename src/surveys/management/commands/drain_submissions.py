@@ -0,0 +1,50 @@
+import signal
+import time
+
+from django.conf import settings
+from django.core.management import CommandError
+from django.core.management.base import BaseCommand
+
+from surveys.ingest import drain, get_submission_queue
+
+
+class Command(BaseCommand):
+    help = "Write spooled student submissions to the database in batches"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--batch-size", type=int, default=500)
+        parser.add_argument(
+            "--interval",
+            type=float,
+            default=0.5,
+            help="Seconds to wait between polls when the queue is empty",
+        )
+        parser.add_argument(
+            "--once",
+            action="store_true",
+            help="Drain what is queued now and exit",
+        )
+
+    def handle(self, *args, **options):
+        if not settings.SUBMISSION_QUEUE_DIR:
+            raise CommandError("DJANGO_SUBMISSION_QUEUE_DIR is not set")
+
+        queue = get_submission_queue()
+        # Anything left in cur/ was claimed by a worker that died mid-batch
+        queue.recover()
+
+        self._stopping = False
+        signal.signal(signal.SIGTERM, self._stop)
+        signal.signal(signal.SIGINT, self._stop)
+
+        written = drain(queue, options["batch_size"])
+        while not options["once"] and not self._stopping:
+            time.sleep(options["interval"])
+            written += drain(queue, options["batch_size"])
+
+        # Flush whatever arrived while shutting down before exiting
+        written += drain(queue, options["batch_size"])
+        self.stdout.write(f"Wrote {written} submissions")
+
+    def _stop(self, signum, frame):
+        self._stopping = True
@@ -0,0 +1,62 @@
+from django.core.management import CommandError
+from django.core.management.base import BaseCommand
+
+from surveys.models import Question, Survey
+from surveys.tallies import (
+    TALLIED_QUESTION_TYPES,
+    count_answers,
+    rebuild_tallies,
+    stored_tallies,
+)
+
+
+class Command(BaseCommand):
+    help = "Recount per-option tallies from Answer rows, or check they match"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--survey",
+            type=int,
+            action="append",
+            dest="survey_ids",
+            help="Only process this survey id (may be repeated)",
+        )
+        parser.add_argument(
+            "--check",
+            action="store_true",
+            help="Report tallies that disagree with the answers without fixing them",
+        )
+
+    def handle(self, *args, **options):
+        surveys = Survey.objects.order_by("id")
+        if options["survey_ids"]:
+            surveys = surveys.filter(id__in=options["survey_ids"])
+
+        mismatched = 0
+        for survey_id in surveys.values_list("id", flat=True).iterator():
+            questions = list(
+                Question.objects.filter(
+                    survey_id=survey_id, question_type__in=TALLIED_QUESTION_TYPES
+                )
+            )
+            if not questions:
+                continue
+
+            if options["check"]:
+                expected = count_answers(questions)
+                stored = stored_tallies(questions)
+                for key in sorted(expected.keys() | stored.keys()):
+                    if expected[key] != stored[key]:
+                        mismatched += 1
+                        question_id, option = key
+                        self.stdout.write(
+                            f"survey {survey_id} question {question_id} "
+                            f"option {option!r}: stored {stored[key]}, "
+                            f"answers {expected[key]}"
+                        )
+            else:
+                rebuild_tallies(questions)
+
+        if mismatched:
+            raise CommandError(f"{mismatched} tallies do not match their answers")
+        self.stdout.write("OK")
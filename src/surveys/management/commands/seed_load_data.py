@@ -0,0 +1,273 @@
+import argparse
+import math
+import random
+import time
+import uuid
+from collections import Counter
+from datetime import timedelta
+
+from django.contrib.auth.hashers import make_password
+from django.core.management import CommandError
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.utils import timezone
+
+from accounts.models import User
+from surveys.models import Answer, Question, QuestionTally, Submission, Survey
+
+OPTIONS = {
+    "multiple_choice": ["Lecture", "Lab", "Reading", "Tutorial", "Other"],
+    "rating": ["1", "2", "3", "4", "5"],
+    "checkbox": ["Python", "Django", "SQL", "HTML", "CSS", "Git"],
+    "yes_no": ["Yes", "No"],
+}
+TEXT_ANSWERS = [
+    "Good pace",
+    "Too fast",
+    "Too slow",
+    "More examples please",
+    "The live demo helped",
+    "Could not hear at the back",
+    "Slides were clear",
+]
+COMMENTS = ["", "", "", "Mostly", "Depends on the week", "Not sure"]
+
+
+def int_range(value):
+    """argparse type for "LOW:HIGH" (or a single number) as an inclusive range."""
+    try:
+        low, _, high = value.partition(":")
+        low, high = int(low), int(high or low)
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"expected LOW:HIGH, got {value!r}")
+    if not 0 <= low <= high:
+        raise argparse.ArgumentTypeError(f"expected 0 <= LOW <= HIGH, got {value!r}")
+    return low, high
+
+
+def type_weights(value):
+    """argparse type for "text=1,rating=2,..." over Question.QUESTION_TYPES."""
+    known = {name for name, _ in Question.QUESTION_TYPES}
+    weights = {}
+    for item in value.split(","):
+        name, _, weight = item.partition("=")
+        if name not in known:
+            raise argparse.ArgumentTypeError(f"unknown question type {name!r}")
+        try:
+            weights[name] = float(weight)
+        except ValueError:
+            raise argparse.ArgumentTypeError(f"bad weight for {name!r}")
+    return weights
+
+
+class Command(BaseCommand):
+    help = (
+        "Fill the database with synthetic instructors, surveys and answers "
+        "for benchmarking and profiling"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--instructors", type=int, default=100)
+        parser.add_argument(
+            "--surveys-per-instructor",
+            type=int_range,
+            default=(1, 5),
+            metavar="LOW:HIGH",
+        )
+        parser.add_argument(
+            "--questions", type=int_range, default=(5, 100), metavar="LOW:HIGH"
+        )
+        parser.add_argument(
+            "--submissions-median",
+            type=float,
+            default=20,
+            help="Median submissions per survey; sizes are log-normal, so a few "
+            "surveys get many times more",
+        )
+        parser.add_argument(
+            "--submissions-sigma",
+            type=float,
+            default=1.0,
+            help="Spread of the log-normal submission counts (0 makes them equal)",
+        )
+        parser.add_argument("--max-submissions", type=int, default=5000)
+        parser.add_argument(
+            "--type-weights",
+            type=type_weights,
+            default={name: 1 for name, _ in Question.QUESTION_TYPES},
+            metavar="TYPE=WEIGHT,...",
+            help="Relative frequency of each question type (default: equal)",
+        )
+        parser.add_argument(
+            "--answer-rate",
+            type=float,
+            default=0.9,
+            help="Chance a student answers any one question",
+        )
+        parser.add_argument(
+            "--days",
+            type=int,
+            default=90,
+            help="Spread submissions over this many days before now",
+        )
+        parser.add_argument("--seed", type=int, default=0)
+        parser.add_argument("--batch-size", type=int, default=5000)
+        parser.add_argument(
+            "--email-prefix",
+            default="load",
+            help="Instructors are <prefix>-<n>@example.com",
+        )
+        parser.add_argument("--password", default="password")
+
+    def handle(self, *args, **options):
+        prefix = options["email_prefix"]
+        if User.objects.filter(email__startswith=f"{prefix}-").exists():
+            raise CommandError(
+                f"Instructors named {prefix}-*@example.com already exist; "
+                "choose another --email-prefix"
+            )
+        weights = options["type_weights"]
+        if not any(weights.values()):
+            raise CommandError("--type-weights gives every question type weight 0")
+
+        self.rng = random.Random(options["seed"])
+        self.options = options
+        self.question_types = list(weights)
+        self.type_weights = list(weights.values())
+        self.now = timezone.now()
+        self.counts = Counter()
+        self.answers = []
+        started = time.monotonic()
+
+        # Hashing is deliberately slow, so every instructor shares one hash
+        password = make_password(options["password"])
+        users = User.objects.bulk_create(
+            User(email=f"{prefix}-{n}@example.com", password=password)
+            for n in range(options["instructors"])
+        )
+        for n, user in enumerate(users, start=1):
+            with transaction.atomic():
+                low, high = options["surveys_per_instructor"]
+                for _ in range(self.rng.randint(low, high)):
+                    self.create_survey(user)
+                self.flush_answers()
+            if n % 100 == 0:
+                self.stdout.write(
+                    f"{n} instructors, {self.counts['answers']} answers so far"
+                )
+
+        self.stdout.write(
+            f"Created {len(users)} instructors, {self.counts['surveys']} surveys, "
+            f"{self.counts['questions']} questions, "
+            f"{self.counts['submissions']} submissions and "
+            f"{self.counts['answers']} answers "
+            f"in {time.monotonic() - started:.1f}s"
+        )
+
+    def create_survey(self, owner):
+        rng = self.rng
+        number = self.counts["surveys"]
+        # bulk_create skips Survey.save(), whose unseeded uuid4() would make
+        # reruns differ
+        (survey,) = Survey.objects.bulk_create(
+            [
+                Survey(
+                    owner=owner,
+                    name=f"Lecture {number} feedback",
+                    schema_version=uuid.UUID(int=rng.getrandbits(128), version=4),
+                )
+            ]
+        )
+        self.counts["surveys"] += 1
+
+        question_types = rng.choices(
+            self.question_types,
+            self.type_weights,
+            k=rng.randint(*self.options["questions"]),
+        )
+        questions = Question.objects.bulk_create(
+            Question(
+                survey=survey,
+                text=f"Question {i + 1}",
+                question_type=question_type,
+                options=OPTIONS.get(question_type),
+            )
+            for i, question_type in enumerate(question_types)
+        )
+        self.counts["questions"] += len(questions)
+
+        submission_count = self.submission_count()
+        # Each survey's submissions arrive within one class hour
+        opened = self.now - timedelta(
+            seconds=rng.uniform(0, self.options["days"] * 86400)
+        )
+        submissions = Submission.objects.bulk_create(
+            (
+                Submission(
+                    survey=survey,
+                    created_at=opened + timedelta(seconds=rng.uniform(0, 3600)),
+                )
+                for _ in range(submission_count)
+            ),
+            batch_size=self.options["batch_size"],
+        )
+        self.counts["submissions"] += len(submissions)
+
+        tallies = Counter()
+        answer_rate = self.options["answer_rate"]
+        for submission in submissions:
+            for question in questions:
+                if rng.random() >= answer_rate:
+                    continue
+                answer_text, picked = self.answer(question.question_type)
+                for option in picked:
+                    tallies[question.id, option] += 1
+                comment = ""
+                if question.question_type != "text":
+                    comment = rng.choice(COMMENTS)
+                self.answers.append(
+                    Answer(
+                        question_id=question.id,
+                        submission_id=submission.id,
+                        survey_id=survey.id,
+                        answer_text=answer_text,
+                        comment_text=comment,
+                    )
+                )
+            if len(self.answers) >= self.options["batch_size"]:
+                self.flush_answers()
+
+        QuestionTally.objects.bulk_create(
+            QuestionTally(question_id=question_id, option=option, count=count)
+            for (question_id, option), count in tallies.items()
+        )
+
+    def submission_count(self):
+        median = self.options["submissions_median"]
+        if median <= 0:
+            return 0
+        count = self.rng.lognormvariate(
+            math.log(median), self.options["submissions_sigma"]
+        )
+        return min(round(count), self.options["max_submissions"])
+
+    def answer(self, question_type):
+        """Return (answer_text, options picked) as SurveyAnswerForm saves them."""
+        rng = self.rng
+        if question_type == "text":
+            return rng.choice(TEXT_ANSWERS), []
+        options = OPTIONS[question_type]
+        if question_type == "checkbox":
+            picked = rng.sample(options, rng.randint(1, 3))
+            return str(picked), picked
+        if question_type == "rating":
+            # Ratings lean positive, as they do in practice
+            picked = rng.choices(options, [1, 2, 4, 6, 4])[0]
+        else:
+            picked = rng.choice(options)
+        return picked, [picked]
+
+    def flush_answers(self):
+        Answer.objects.bulk_create(self.answers, batch_size=self.options["batch_size"])
+        self.counts["answers"] += len(self.answers)
+        self.answers = []
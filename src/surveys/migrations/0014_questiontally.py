@@ -0,0 +1,41 @@
+# Generated by Django 5.2.6 on 2026-10-17 19:54
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("surveys", "0013_survey_created_at"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="QuestionTally",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("option", models.CharField(max_length=200)),
+                ("count", models.PositiveIntegerField(default=0)),
+                (
+                    "question",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="tallies",
+                        to="surveys.question",
+                    ),
+                ),
+            ],
+            options={
+                "unique_together": {("question", "option")},
+            },
+        ),
+    ]
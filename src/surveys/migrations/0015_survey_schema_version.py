@@ -0,0 +1,19 @@
+# Generated by Django 5.2.6 on 2026-10-17 19:59
+
+import uuid
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("surveys", "0014_questiontally"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="survey",
+            name="schema_version",
+            field=models.UUIDField(default=uuid.uuid4, editable=False),
+        ),
+    ]
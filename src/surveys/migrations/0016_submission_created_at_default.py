@@ -0,0 +1,21 @@
+# Generated by Django 5.2.6 on 2026-10-17 20:03
+
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("surveys", "0015_survey_schema_version"),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name="submission",
+            name="created_at",
+            field=models.DateTimeField(
+                default=django.utils.timezone.now, editable=False
+            ),
+        ),
+    ]
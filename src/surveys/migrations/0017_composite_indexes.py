@@ -0,0 +1,39 @@
+# Generated by Django 5.2.6 on 2026-10-17 20:10
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("surveys", "0016_submission_created_at_default"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="answer",
+            index=models.Index(
+                fields=["submission", "question"], name="answer_submission_question_idx"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="answer",
+            index=models.Index(
+                fields=["question", "submission"], name="answer_question_submission_idx"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="submission",
+            index=models.Index(
+                fields=["survey", "created_at"], name="submission_survey_created_idx"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="survey",
+            index=models.Index(
+                fields=["owner", "-created_at"], name="survey_owner_created_idx"
+            ),
+        ),
+    ]
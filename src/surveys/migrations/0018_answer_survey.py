@@ -0,0 +1,25 @@
+# Generated by Django 5.2.6 on 2026-10-17 21:02
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("surveys", "0017_composite_indexes"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="answer",
+            name="survey",
+            field=models.ForeignKey(
+                db_index=False,
+                null=True,
+                on_delete=django.db.models.deletion.CASCADE,
+                related_name="answers",
+                to="surveys.survey",
+            ),
+        ),
+    ]
@@ -0,0 +1,25 @@
+from django.db import migrations
+from django.db.models import OuterRef, Subquery
+
+
+def backfill_answer_survey(apps, schema_editor):
+    Answer = apps.get_model("surveys", "Answer")
+    Submission = apps.get_model("surveys", "Submission")
+    Answer.objects.filter(survey__isnull=True).update(
+        survey_id=Subquery(
+            Submission.objects.filter(id=OuterRef("submission_id")).values("survey_id")[
+                :1
+            ]
+        )
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("surveys", "0018_answer_survey"),
+    ]
+
+    operations = [
+        migrations.RunPython(backfill_answer_survey, migrations.RunPython.noop),
+    ]
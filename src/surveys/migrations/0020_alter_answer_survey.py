@@ -0,0 +1,38 @@
+# Generated by Django 5.2.6 on 2026-10-17 21:04
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("surveys", "0019_backfill_answer_survey"),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name="answer",
+            name="survey",
+            field=models.ForeignKey(
+                db_index=False,
+                on_delete=django.db.models.deletion.CASCADE,
+                related_name="answers",
+                to="surveys.survey",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="answer",
+            index=models.Index(
+                fields=["survey", "submission", "question"],
+                name="answer_survey_submission_idx",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="answer",
+            index=models.Index(
+                fields=["survey", "question", "submission"],
+                name="answer_survey_question_idx",
+            ),
+        ),
+    ]
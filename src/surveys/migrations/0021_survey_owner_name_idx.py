@@ -0,0 +1,19 @@
+# Generated by Django 5.2.6 on 2026-10-17 21:40
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("surveys", "0020_alter_answer_survey"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="survey",
+            index=models.Index(fields=["owner", "name"], name="survey_owner_name_idx"),
+        ),
+    ]
@@ -0,0 +1,29 @@
+from django.db import migrations
+
+# surveys.listing searches names with a prefix range, which needs names
+# compared by codepoint as SQLite does. PostgreSQL compares by the
+# database's locale, so the column gets the "C" collation there; the
+# (owner, name) index is rebuilt with it.
+ALTER_COLLATION = 'ALTER TABLE %s ALTER COLUMN name TYPE varchar(200) COLLATE "%s"'
+
+
+def set_collation(collation):
+    def operation(apps, schema_editor):
+        if schema_editor.connection.vendor != "postgresql":
+            return
+        Survey = apps.get_model("surveys", "Survey")
+        table = schema_editor.quote_name(Survey._meta.db_table)
+        schema_editor.execute(ALTER_COLLATION % (table, collation))
+
+    return operation
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("surveys", "0021_survey_owner_name_idx"),
+    ]
+
+    operations = [
+        migrations.RunPython(set_collation("C"), set_collation("default")),
+    ]
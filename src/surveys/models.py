@@ -7,9 +7,12 @@ This module was developed using AI tools (Claude, VS Code AI) for:
 All architecture and design decisions and final implementations are my own work.
 """
 
+import uuid
+
 from django.db import models
 from django.conf import settings
 from django.urls import reverse
+from django.utils import timezone
 
 
 class Survey(models.Model):
@@ -20,9 +23,31 @@ class Survey(models.Model):
         on_delete=models.CASCADE,
         related_name="surveys",
     )
+    # Migration 0022 gives this column the "C" collation on PostgreSQL, so
+    # names compare by codepoint as on SQLite; migration state doesn't record
+    # it, so anything that rebuilds the column must set it again
     name = models.CharField(max_length=200, default="")
     text = models.TextField(default="")
     created_at = models.DateTimeField(auto_now_add=True)
+    # Changes whenever anything a student sees changes; keys cached schemas
+    schema_version = models.UUIDField(default=uuid.uuid4, editable=False)
+
+    class Meta:
+        indexes = [
+            # surveys_list: an owner's surveys, newest first
+            models.Index(
+                fields=["owner", "-created_at"], name="survey_owner_created_idx"
+            ),
+            # surveys_list name search: a prefix range within one owner
+            models.Index(fields=["owner", "name"], name="survey_owner_name_idx"),
+        ]
+
+    def save(self, *args, **kwargs):
+        self.schema_version = uuid.uuid4()
+        update_fields = kwargs.get("update_fields")
+        if update_fields is not None:
+            kwargs["update_fields"] = {*update_fields, "schema_version"}
+        super().save(*args, **kwargs)
 
 
 class Question(models.Model):
@@ -54,7 +79,15 @@ class Submission(models.Model):
     survey = models.ForeignKey(
         Survey, on_delete=models.CASCADE, related_name="submissions"
     )
-    created_at = models.DateTimeField(auto_now_add=True)
+    # Not auto_now_add so queued submissions keep the time they were sent
+    created_at = models.DateTimeField(default=timezone.now, editable=False)
+
+    class Meta:
+        indexes = [
+            models.Index(
+                fields=["survey", "created_at"], name="submission_survey_created_idx"
+            ),
+        ]
 
 
 class Answer(models.Model):
@@ -64,3 +97,48 @@ class Answer(models.Model):
     submission = models.ForeignKey(
         Submission, on_delete=models.CASCADE, related_name="answers"
     )
+    # Copied from the submission so per-survey scans stay on this table. The
+    # composite indexes below lead with it, so it needs no index of its own.
+    survey = models.ForeignKey(
+        Survey, on_delete=models.CASCADE, related_name="answers", db_index=False
+    )
+
+    class Meta:
+        indexes = [
+            # Pivoting a submission's answers into an export row
+            models.Index(
+                fields=["submission", "question"], name="answer_submission_question_idx"
+            ),
+            # Walking one question's answers
+            models.Index(
+                fields=["question", "submission"], name="answer_question_submission_idx"
+            ),
+            # Export rows for one survey
+            models.Index(
+                fields=["survey", "submission", "question"],
+                name="answer_survey_submission_idx",
+            ),
+            # Grouping one survey's answers by question
+            models.Index(
+                fields=["survey", "question", "submission"],
+                name="answer_survey_question_idx",
+            ),
+        ]
+
+    def save(self, *args, **kwargs):
+        # Callers that only have a submission_id must pass survey themselves
+        if self.survey_id is None and Answer.submission.is_cached(self):
+            self.survey_id = self.submission.survey_id
+        super().save(*args, **kwargs)
+
+
+# Running count of how often each option was picked for a choice question
+class QuestionTally(models.Model):
+    question = models.ForeignKey(
+        Question, on_delete=models.CASCADE, related_name="tallies"
+    )
+    option = models.CharField(max_length=200)
+    count = models.PositiveIntegerField(default=0)
+
+    class Meta:
+        unique_together = ("question", "option")
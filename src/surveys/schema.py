@@ -0,0 +1,66 @@
+from django.core.cache import cache
+
+from evalhub.metrics import record_cache_lookup
+
+# Versions never repeat, so stale entries only need to age out
+SCHEMA_CACHE_TIMEOUT = 60 * 60 * 24
+
+
+def schema_cache_key(survey):
+    return f"survey_schema:{survey.id}:{survey.schema_version}"
+
+
+def compile_survey_schema(survey):
+    """Describe everything SurveyAnswerForm needs to build a survey's fields."""
+    return _describe_survey(survey, survey.question_set.all())
+
+
+async def acompile_survey_schema(survey):
+    questions = [question async for question in survey.question_set.all()]
+    return _describe_survey(survey, questions)
+
+
+def _describe_survey(survey, questions):
+    described = []
+    for question in questions:
+        described.append(
+            {
+                "id": question.id,
+                "text": question.text,
+                "question_type": question.question_type,
+                "options": list(question.options or []),
+                "field_name": f"response_{question.id}",
+                "comment_field_name": (
+                    f"comment_{question.id}"
+                    if question.question_type != "text"
+                    else None
+                ),
+            }
+        )
+    return {
+        "survey_id": survey.id,
+        "version": str(survey.schema_version),
+        "name": survey.name,
+        "questions": described,
+    }
+
+
+def get_survey_schema(survey):
+    """Return the compiled schema for survey's current version, using the cache."""
+    key = schema_cache_key(survey)
+    schema = cache.get(key)
+    record_cache_lookup("survey_schema", schema is not None)
+    if schema is None:
+        schema = compile_survey_schema(survey)
+        cache.set(key, schema, SCHEMA_CACHE_TIMEOUT)
+    return schema
+
+
+async def aget_survey_schema(survey):
+    key = schema_cache_key(survey)
+    schema = await cache.aget(key)
+    record_cache_lookup("survey_schema", schema is not None)
+    if schema is None:
+        schema = await acompile_survey_schema(survey)
+        await cache.aset(key, schema, SCHEMA_CACHE_TIMEOUT)
+    return schema
@@ -0,0 +1,20 @@
+import uuid
+
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from surveys.models import Question, Survey
+
+
+@receiver(post_save, sender=Question)
+@receiver(post_delete, sender=Question)
+def bump_survey_schema_version(sender, instance, origin=None, **kwargs):
+    # Nothing will be served for a survey that is being deleted
+    if isinstance(origin, Survey):
+        return
+
+    version = uuid.uuid4()
+    Survey.objects.filter(pk=instance.survey_id).update(schema_version=version)
+    # Keep an already loaded survey in step so it doesn't use the old schema
+    if Question.survey.is_cached(instance):
+        instance.survey.schema_version = version
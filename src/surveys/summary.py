@@ -0,0 +1,128 @@
+import math
+from bisect import bisect_right
+from itertools import accumulate
+
+from django.core.cache import cache
+from django.db.models import Count, Max
+
+from evalhub.metrics import record_cache_lookup
+from surveys.models import Answer
+from surveys.tallies import TALLIED_QUESTION_TYPES, tallies_for_questions
+
+SUMMARY_CACHE_TIMEOUT = 60 * 60
+PERCENTILES = (10, 25, 50, 75, 90)
+
+
+def histogram_stats(histogram):
+    """Return summary statistics for a histogram of [(value, count), ...].
+
+    The histogram stands in for the full list of values, so the work is
+    proportional to the number of distinct values rather than the number of
+    answers. Percentiles interpolate linearly between the two nearest values,
+    like a spreadsheet's PERCENTILE, and std is the sample standard deviation.
+    """
+    histogram = sorted((value, count) for value, count in histogram if count)
+    n = sum(count for _, count in histogram)
+    if not n:
+        return {
+            "count": 0,
+            "mean": None,
+            "median": None,
+            "std": None,
+            "percentiles": {str(p): None for p in PERCENTILES},
+        }
+
+    values = [value for value, _ in histogram]
+    # ends[i] is one past the last position values[i] fills in sorted order
+    ends = list(accumulate(count for _, count in histogram))
+
+    def value_at(position):
+        return values[bisect_right(ends, position)]
+
+    def percentile(p):
+        rank = p / 100 * (n - 1)
+        low, high = math.floor(rank), math.ceil(rank)
+        low_value = value_at(low)
+        return low_value + (value_at(high) - low_value) * (rank - low)
+
+    mean = sum(value * count for value, count in histogram) / n
+    squares = sum(count * (value - mean) ** 2 for value, count in histogram)
+    return {
+        "count": n,
+        "mean": mean,
+        "median": percentile(50),
+        "std": math.sqrt(squares / (n - 1)) if n > 1 else None,
+        "percentiles": {str(p): percentile(p) for p in PERCENTILES},
+    }
+
+
+def _numeric_histogram(tallies):
+    histogram = []
+    for option, count in tallies:
+        try:
+            histogram.append((float(option), count))
+        except ValueError:
+            # Not a rating value; leave it to the option distribution
+            continue
+    return histogram
+
+
+def compile_survey_summary(survey):
+    """Return per-question statistics for survey's choice and rating questions.
+
+    Built from the stored option tallies plus one grouped count of answers,
+    so it costs the same at 100k answers as at ten.
+    """
+    questions = [
+        question
+        for question in survey.question_set.all()
+        if question.question_type in TALLIED_QUESTION_TYPES
+    ]
+    tallies = tallies_for_questions(questions)
+    responses = dict(
+        Answer.objects.filter(survey=survey, question__in=questions)
+        .exclude(answer_text="")
+        .values_list("question_id")
+        .annotate(n=Count("id"))
+        .order_by()
+    )
+
+    summaries = []
+    for question in questions:
+        answered = responses.get(question.id, 0)
+        summary = {
+            "question_id": question.id,
+            "text": question.text,
+            "question_type": question.question_type,
+            "responses": answered,
+            "distribution": [
+                {
+                    "option": option,
+                    "count": count,
+                    # Checkbox shares are of respondents, so they can sum past 1
+                    "share": count / answered if answered else 0.0,
+                }
+                for option, count in tallies[question.id]
+            ],
+        }
+        if question.question_type == "rating":
+            summary.update(histogram_stats(_numeric_histogram(tallies[question.id])))
+        summaries.append(summary)
+
+    return {"survey_id": survey.id, "questions": summaries}
+
+
+def summary_cache_key(survey, last_submission_id):
+    return f"survey_summary:{survey.id}:{survey.schema_version}:{last_submission_id}"
+
+
+def get_survey_summary(survey):
+    """Return compile_survey_summary(survey), cached until the next submission."""
+    last_submission_id = survey.submissions.aggregate(last=Max("id"))["last"]
+    key = summary_cache_key(survey, last_submission_id)
+    summary = cache.get(key)
+    record_cache_lookup("survey_summary", summary is not None)
+    if summary is None:
+        summary = compile_survey_summary(survey)
+        cache.set(key, summary, SUMMARY_CACHE_TIMEOUT)
+    return summary
@@ -0,0 +1,149 @@
+import ast
+from collections import Counter
+
+from django.db import connection, transaction
+from django.db.models import Count
+
+from surveys.models import Answer, QuestionTally
+
+TALLIED_QUESTION_TYPES = ("multiple_choice", "rating", "checkbox", "yes_no")
+# Tally rows per upsert statement, well under SQLite's bound parameter limit
+UPSERT_CHUNK_SIZE = 500
+
+
+def selected_options(question_type, value):
+    """Return the options picked in a cleaned form value as strings."""
+    if question_type not in TALLIED_QUESTION_TYPES or not value:
+        return []
+    if isinstance(value, (list, tuple)):
+        return [str(option) for option in value]
+    return [str(value)]
+
+
+def parse_answer_options(question_type, answer_text):
+    """Return the options stored in an Answer's answer_text as strings."""
+    if question_type != "checkbox":
+        return selected_options(question_type, answer_text)
+
+    # Checkbox selections are saved as the repr of the cleaned list
+    try:
+        value = ast.literal_eval(answer_text)
+    except (ValueError, SyntaxError):
+        value = [option.strip() for option in answer_text.split(",")]
+    if not isinstance(value, (list, tuple)):
+        value = [value]
+    return [str(option) for option in value if option != ""]
+
+
+def increment_tallies(counts):
+    """Add a Counter of (question_id, option) -> n onto the stored tallies.
+
+    One INSERT ... ON CONFLICT DO UPDATE statement creates missing rows and
+    adds to existing ones, however many options were picked. Rows go in key
+    order, so concurrent submissions lock them in the same order and can't
+    deadlock each other.
+    """
+    rows = sorted(counts.items())
+    quote = connection.ops.quote_name
+    table = quote(QuestionTally._meta.db_table)
+    question, option, count = (
+        quote(QuestionTally._meta.get_field(name).column)
+        for name in ("question", "option", "count")
+    )
+    with connection.cursor() as cursor:
+        for start in range(0, len(rows), UPSERT_CHUNK_SIZE):
+            chunk = rows[start : start + UPSERT_CHUNK_SIZE]
+            cursor.execute(
+                f"INSERT INTO {table} ({question}, {option}, {count}) "
+                f"VALUES {', '.join(['(%s, %s, %s)'] * len(chunk))} "
+                f"ON CONFLICT ({question}, {option}) "
+                f"DO UPDATE SET {count} = {table}.{count} + excluded.{count}",
+                [value for key, amount in chunk for value in (*key, amount)],
+            )
+
+
+def count_answers(questions):
+    """Recount tallies for the given choice questions from their Answer rows."""
+    question_types = {
+        question.id: question.question_type
+        for question in questions
+        if question.question_type in TALLIED_QUESTION_TYPES
+    }
+    counts = Counter()
+    # Let the database collapse identical answers before parsing them
+    rows = (
+        Answer.objects.filter(question_id__in=question_types)
+        .values_list("question_id", "answer_text")
+        .annotate(n=Count("id"))
+        .order_by()
+    )
+    for question_id, answer_text, n in rows:
+        for option in parse_answer_options(question_types[question_id], answer_text):
+            counts[question_id, option] += n
+    return counts
+
+
+def stored_tallies(questions):
+    """Return the stored tallies for questions as a Counter like count_answers."""
+    rows = QuestionTally.objects.filter(question__in=questions).values_list(
+        "question_id", "option", "count"
+    )
+    return Counter({(question_id, option): n for question_id, option, n in rows if n})
+
+
+@transaction.atomic
+def rebuild_tallies(questions):
+    """Replace the stored tallies for questions with a fresh recount."""
+    counts = count_answers(questions)
+    QuestionTally.objects.filter(question__in=questions).delete()
+    QuestionTally.objects.bulk_create(
+        QuestionTally(question_id=question_id, option=option, count=n)
+        for (question_id, option), n in counts.items()
+    )
+    return counts
+
+
+def tallies_for_questions(questions):
+    """Return {question_id: [(option, count), ...]} for the choice questions.
+
+    Options keep the order the question lists them in, including ones nobody
+    picked yet.
+    """
+    questions = _tallied(questions)
+    rows = _tally_rows(questions)
+    return _order_tallies(questions, rows)
+
+
+async def atallies_for_questions(questions):
+    questions = _tallied(questions)
+    rows = [row async for row in _tally_rows(questions)]
+    return _order_tallies(questions, rows)
+
+
+def _tallied(questions):
+    return [
+        question
+        for question in questions
+        if question.question_type in TALLIED_QUESTION_TYPES
+    ]
+
+
+def _tally_rows(questions):
+    return QuestionTally.objects.filter(question__in=questions).values_list(
+        "question_id", "option", "count"
+    )
+
+
+def _order_tallies(questions, rows):
+    stored = {}
+    for question_id, option, n in rows:
+        stored.setdefault(question_id, {})[option] = n
+
+    tallies = {}
+    for question in questions:
+        counts = stored.get(question.id, {})
+        options = [str(option) for option in question.options or []]
+        # Keep anything recorded against options that have since been removed
+        options += [option for option in counts if option not in options]
+        tallies[question.id] = [(option, counts.get(option, 0)) for option in options]
+    return tallies
@@ -0,0 +1,146 @@
+from asgiref.sync import async_to_sync
+
+from surveys.aggregation import (
+    afirst_answer_pages,
+    decode_answer_cursor,
+    question_answer_page,
+)
+from surveys.models import Answer, Question, Submission
+from tests.base import AuthenticatedTestCase
+
+
+class FirstAnswerPagesTest(AuthenticatedTestCase):
+    def setUp(self):
+        super().setUp()
+        self.survey = self.create_survey()
+
+    def first_answer_pages(self, **kwargs):
+        return async_to_sync(afirst_answer_pages)(self.survey, **kwargs)
+
+    def test_groups_answers_under_their_question_in_question_order(self):
+        q1 = Question.objects.create(survey=self.survey, text="Question 1")
+        q2 = Question.objects.create(survey=self.survey, text="Question 2")
+
+        submission1 = Submission.objects.create(survey=self.survey)
+        submission2 = Submission.objects.create(survey=self.survey)
+        a2 = Answer.objects.create(
+            question=q2, answer_text="2A", submission=submission1
+        )
+        a1b = Answer.objects.create(
+            question=q1, answer_text="1B", submission=submission2
+        )
+        a1a = Answer.objects.create(
+            question=q1, answer_text="1A", submission=submission1
+        )
+
+        pages = self.first_answer_pages()
+
+        self.assertEqual([page["question"] for page in pages], [q1, q2])
+        self.assertEqual(pages[0]["answers"], [a1a, a1b])
+        self.assertEqual(pages[1]["answers"], [a2])
+
+    def test_questions_without_answers_have_empty_pages(self):
+        question = Question.objects.create(survey=self.survey, text="Unanswered")
+
+        pages = self.first_answer_pages()
+
+        self.assertEqual(
+            pages, [{"question": question, "answers": [], "next_cursor": None}]
+        )
+
+    def test_ignores_answers_from_other_surveys(self):
+        question = Question.objects.create(survey=self.survey, text="Question 1")
+        other_survey = self.create_survey(name="Other Survey")
+        other_question = Question.objects.create(survey=other_survey, text="Other")
+        Answer.objects.create(
+            question=other_question,
+            answer_text="Elsewhere",
+            submission=Submission.objects.create(survey=other_survey),
+        )
+
+        pages = self.first_answer_pages()
+
+        self.assertEqual(
+            pages, [{"question": question, "answers": [], "next_cursor": None}]
+        )
+
+    def test_only_the_first_page_is_loaded(self):
+        question = Question.objects.create(survey=self.survey, text="Question 1")
+        for i in range(3):
+            Answer.objects.create(
+                question=question,
+                answer_text=f"A{i}",
+                submission=Submission.objects.create(survey=self.survey),
+            )
+
+        (page,) = self.first_answer_pages(page_size=2)
+
+        self.assertEqual([a.answer_text for a in page["answers"]], ["A0", "A1"])
+        self.assertIsNotNone(page["next_cursor"])
+
+    def test_query_count_does_not_depend_on_submissions(self):
+        q1 = Question.objects.create(survey=self.survey, text="Question 1")
+        q2 = Question.objects.create(survey=self.survey, text="Question 2")
+        for _ in range(5):
+            submission = Submission.objects.create(survey=self.survey)
+            Answer.objects.create(question=q1, answer_text="A", submission=submission)
+            Answer.objects.create(question=q2, answer_text="B", submission=submission)
+
+        # The questions, then one page query per question
+        with self.assertNumQueries(3):
+            self.first_answer_pages(page_size=2)
+
+
+class QuestionAnswerPageTest(AuthenticatedTestCase):
+    def setUp(self):
+        super().setUp()
+        self.survey = self.create_survey()
+        self.question = Question.objects.create(survey=self.survey, text="Q1")
+        self.submissions = [
+            Submission.objects.create(survey=self.survey) for _ in range(5)
+        ]
+        # Insert out of submission order so id order and page order differ
+        for submission in reversed(self.submissions):
+            Answer.objects.create(
+                question=self.question,
+                answer_text=f"S{submission.id}",
+                submission=submission,
+            )
+
+    def walk(self, page_size):
+        seen, after = [], None
+        while True:
+            answers, cursor = question_answer_page(
+                self.question, after=after, page_size=page_size
+            )
+            seen.append([answer.submission_id for answer in answers])
+            if cursor is None:
+                return seen
+            after = decode_answer_cursor(cursor)
+
+    def test_pages_walk_every_answer_once_in_submission_order(self):
+        ids = [submission.id for submission in self.submissions]
+
+        self.assertEqual(self.walk(page_size=2), [ids[0:2], ids[2:4], ids[4:]])
+
+    def test_last_full_page_has_no_cursor(self):
+        answers, cursor = question_answer_page(self.question, page_size=5)
+
+        self.assertEqual(len(answers), 5)
+        self.assertIsNone(cursor)
+
+    def test_duplicate_answers_in_one_submission_are_not_skipped(self):
+        Answer.objects.create(
+            question=self.question,
+            answer_text="Again",
+            submission=self.submissions[0],
+        )
+
+        pages = self.walk(page_size=1)
+
+        self.assertEqual(sum(len(page) for page in pages), 6)
+
+    def test_malformed_cursor_is_rejected(self):
+        for cursor in ["", "12", "a-b", "1-2-3"]:
+            with self.assertRaises(ValueError):
+                decode_answer_cursor(cursor)
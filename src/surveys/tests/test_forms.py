@@ -1,5 +1,9 @@
+from unittest import mock
+
 from django import forms
+from django.db import DatabaseError, connection
 from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
 
 from tests.base import AuthenticatedTestCase
 from accounts.models import User
@@ -233,6 +237,21 @@ class SurveyAnswerFormTest(AuthenticatedTestCase):
         self.assertIn("Django", answer.answer_text)
         self.assertIn("Testing", answer.answer_text)
 
+    def test_form_skips_checkbox_question_with_nothing_selected(self):
+        survey = self.create_survey()
+        question = Question.objects.create(
+            survey=survey,
+            text="Which topics interested you?",
+            question_type="checkbox",
+            options=["Python", "Django"],
+        )
+
+        form = SurveyAnswerForm(survey=survey, data={f"response_{question.id}": []})
+
+        self.assertTrue(form.is_valid())
+        form.save()
+        self.assertEqual(Answer.objects.count(), 0)
+
     def test_form_with_empty_survey(self):
         survey = self.create_survey()
 
@@ -336,6 +355,59 @@ class SurveyAnswerFormTest(AuthenticatedTestCase):
         answer = Answer.objects.first()
         self.assertEqual(answer.answer_text, special_text)
 
+    def test_save_query_count_does_not_depend_on_question_count(self):
+        # Choice questions, so every answer also adds to a tally
+        kinds = [
+            ("multiple_choice", ["Red", "Blue"], "Red"),
+            ("rating", [1, 2, 3, 4, 5], "4"),
+            ("checkbox", ["Python", "Django"], ["Python", "Django"]),
+            ("yes_no", ["Yes", "No"], "Yes"),
+        ]
+
+        def save_query_counts(question_count):
+            survey = self.create_survey(name=f"Survey {question_count}")
+            data = {}
+            for i in range(question_count):
+                question_type, options, answer = kinds[i % len(kinds)]
+                question = Question.objects.create(
+                    survey=survey,
+                    text=f"Question {i}",
+                    question_type=question_type,
+                    options=options,
+                )
+                data[f"response_{question.id}"] = answer
+
+            counts = []
+            # No tally rows yet, then rows to add to
+            for _ in ("cold", "warm"):
+                form = SurveyAnswerForm(survey=survey, data=data)
+                self.assertTrue(form.is_valid())
+                with CaptureQueriesContext(connection) as queries:
+                    form.save()
+                counts.append(len(queries))
+            return counts
+
+        # Savepoint, submission, answers, tallies, release
+        self.assertEqual(save_query_counts(1), [5, 5])
+        self.assertEqual(save_query_counts(40), [5, 5])
+        self.assertEqual(Answer.objects.count(), 82)
+
+    def test_save_is_atomic(self):
+        survey = self.create_survey()
+        question = Question.objects.create(survey=survey, text="Question 1")
+        form = SurveyAnswerForm(
+            survey=survey, data={f"response_{question.id}": "Answer"}
+        )
+        self.assertTrue(form.is_valid())
+
+        with mock.patch.object(
+            Answer.objects, "bulk_create", side_effect=DatabaseError
+        ):
+            with self.assertRaises(DatabaseError):
+                form.save()
+
+        self.assertEqual(Submission.objects.count(), 0)
+
 
 class SurveyEditFormTest(TestCase):
     def test_form_saves_with_valid_name(self):
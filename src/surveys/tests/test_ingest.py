@@ -0,0 +1,184 @@
+import os
+import tempfile
+from datetime import timedelta
+from io import StringIO
+
+from django.core.management import call_command
+from django.test import override_settings
+from django.urls import reverse
+from django.utils import timezone
+
+from surveys.forms import SurveyAnswerForm
+from surveys.ingest import SubmissionQueue, drain
+from surveys.models import Answer, Question, QuestionTally, Submission
+from tests.base import AuthenticatedTestCase
+
+
+class QueueTestCase(AuthenticatedTestCase):
+    def setUp(self):
+        super().setUp()
+        queue_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(queue_dir.cleanup)
+        self.queue_dir = queue_dir.name
+        self.queue = SubmissionQueue(self.queue_dir)
+
+        self.survey = self.create_survey()
+        self.question = Question.objects.create(
+            survey=self.survey,
+            text="Would you recommend?",
+            question_type="yes_no",
+            options=["Yes", "No"],
+        )
+
+    def payload(self, answer="Yes", comment=""):
+        form = SurveyAnswerForm(
+            survey=self.survey,
+            data={
+                f"response_{self.question.id}": answer,
+                f"comment_{self.question.id}": comment,
+            },
+        )
+        self.assertTrue(form.is_valid())
+        return form.submission_payload()
+
+
+class SubmissionQueueTest(QueueTestCase):
+    def test_claim_returns_payloads_in_arrival_order(self):
+        self.queue.put(self.payload("Yes"))
+        self.queue.put(self.payload("No"))
+
+        claimed = self.queue.claim(10)
+
+        self.assertEqual(
+            [payload["answers"][0]["answer_text"] for _, payload in claimed],
+            ["Yes", "No"],
+        )
+        self.assertEqual(self.queue.pending(), 0)
+
+    def test_claim_respects_the_limit(self):
+        for _ in range(3):
+            self.queue.put(self.payload())
+
+        self.assertEqual(len(self.queue.claim(2)), 2)
+        self.assertEqual(self.queue.pending(), 1)
+
+    def test_recover_requeues_claimed_but_unacknowledged_items(self):
+        self.queue.put(self.payload())
+        self.queue.claim(10)
+
+        self.queue.recover()
+
+        self.assertEqual(self.queue.pending(), 1)
+
+    def test_acknowledged_items_are_gone(self):
+        self.queue.put(self.payload())
+        claimed = self.queue.claim(10)
+
+        self.queue.ack([path for path, _ in claimed])
+        self.queue.recover()
+
+        self.assertEqual(self.queue.pending(), 0)
+
+
+class DrainTest(QueueTestCase):
+    def test_drain_writes_submissions_answers_and_tallies(self):
+        self.queue.put(self.payload("Yes", "Loved it"))
+        self.queue.put(self.payload("Yes"))
+        self.queue.put(self.payload("No"))
+
+        self.assertEqual(drain(self.queue, batch_size=2), 3)
+
+        self.assertEqual(Submission.objects.filter(survey=self.survey).count(), 3)
+        self.assertEqual(
+            list(Answer.objects.order_by("id").values_list("answer_text", flat=True)),
+            ["Yes", "Yes", "No"],
+        )
+        self.assertEqual(Answer.objects.get(comment_text="Loved it").answer_text, "Yes")
+        self.assertEqual(
+            set(Answer.objects.values_list("survey_id", flat=True)), {self.survey.id}
+        )
+        self.assertEqual(
+            QuestionTally.objects.get(question=self.question, option="Yes").count, 2
+        )
+        self.assertEqual(self.queue.pending(), 0)
+
+    def test_drain_keeps_the_time_the_submission_was_sent(self):
+        payload = self.payload()
+        sent_at = timezone.now() - timedelta(minutes=5)
+        payload["submitted_at"] = sent_at.isoformat()
+        self.queue.put(payload)
+
+        drain(self.queue)
+
+        self.assertEqual(Submission.objects.get().created_at, sent_at)
+
+    def test_drain_skips_submissions_for_deleted_surveys(self):
+        self.queue.put(self.payload())
+        self.survey.delete()
+
+        self.assertEqual(drain(self.queue), 0)
+        self.assertEqual(Submission.objects.count(), 0)
+        self.assertEqual(self.queue.pending(), 0)
+
+    def test_drain_skips_answers_to_deleted_questions(self):
+        self.queue.put(self.payload())
+        self.question.delete()
+
+        self.assertEqual(drain(self.queue), 1)
+        self.assertEqual(Submission.objects.count(), 1)
+        self.assertEqual(Answer.objects.count(), 0)
+
+    def test_bad_payload_is_set_aside_and_the_rest_are_written(self):
+        self.queue.put(self.payload("Yes"))
+        bad = self.payload("No")
+        bad["submitted_at"] = "not a time"
+        self.queue.put(bad)
+        self.queue.put(self.payload("Yes"))
+
+        with self.assertLogs("evalhub.ingest", "ERROR"):
+            self.assertEqual(drain(self.queue), 2)
+
+        self.assertEqual(
+            list(Answer.objects.values_list("answer_text", flat=True)), ["Yes", "Yes"]
+        )
+        self.assertEqual(
+            QuestionTally.objects.get(question=self.question, option="Yes").count, 2
+        )
+        self.assertEqual(len(os.listdir(self.queue.failed_dir)), 1)
+        self.assertEqual(os.listdir(self.queue.cur_dir), [])
+        self.assertEqual(self.queue.pending(), 0)
+
+    def test_unreadable_file_is_set_aside(self):
+        (self.queue.new_dir / "0-garbled.json").write_text("{")
+        self.queue.put(self.payload())
+
+        with self.assertLogs("evalhub.ingest", "ERROR"):
+            self.assertEqual(drain(self.queue), 1)
+
+        self.assertEqual(os.listdir(self.queue.failed_dir), ["0-garbled.json"])
+
+    def test_command_drains_the_queue_and_exits_with_once(self):
+        self.queue.put(self.payload())
+        out = StringIO()
+
+        with override_settings(SUBMISSION_QUEUE_DIR=self.queue_dir):
+            call_command("drain_submissions", once=True, stdout=out)
+
+        self.assertIn("Wrote 1 submissions", out.getvalue())
+        self.assertEqual(Answer.objects.get().answer_text, "Yes")
+
+
+class QueuedTakeSurveyTest(QueueTestCase):
+    def test_queued_mode_acknowledges_without_writing_to_the_database(self):
+        with override_settings(SUBMISSION_QUEUE_DIR=self.queue_dir):
+            response = self.client.post(
+                reverse("students:take_survey", args=[self.survey.id]),
+                {f"response_{self.question.id}": "Yes"},
+            )
+
+        self.assertContains(response, "Thank you")
+        self.assertEqual(Submission.objects.count(), 0)
+        self.assertEqual(self.queue.pending(), 1)
+
+        drain(self.queue)
+        self.assertEqual(Answer.objects.get().answer_text, "Yes")
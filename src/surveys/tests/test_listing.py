@@ -0,0 +1,75 @@
+from datetime import timedelta
+
+from asgiref.sync import async_to_sync
+from django.utils import timezone
+
+from surveys.listing import asurvey_page, decode_survey_cursor
+from surveys.models import Submission, Survey
+from tests.base import AuthenticatedTestCase
+
+
+class SurveyPageTest(AuthenticatedTestCase):
+    def survey_page(self, *args, **kwargs):
+        return async_to_sync(asurvey_page)(*args, **kwargs)
+
+    def create_surveys(self, *names):
+        # Distinct, increasing timestamps, plus one tie to exercise the id key
+        now = timezone.now()
+        surveys = [self.create_survey(name=name) for name in names]
+        for offset, survey in enumerate(surveys):
+            survey.created_at = now + timedelta(seconds=min(offset, 2))
+        Survey.objects.bulk_update(surveys, ["created_at"])
+        return surveys
+
+    def walk(self, page_size, **kwargs):
+        pages, after = [], None
+        while True:
+            surveys, cursor = self.survey_page(
+                self.user, after=after, page_size=page_size, **kwargs
+            )
+            pages.append([survey.name for survey in surveys])
+            if cursor is None:
+                return pages
+            after = decode_survey_cursor(cursor)
+
+    def test_pages_walk_surveys_newest_first(self):
+        self.create_surveys("A", "B", "C", "D", "E")
+
+        self.assertEqual(self.walk(page_size=2), [["E", "D"], ["C", "B"], ["A"]])
+
+    def test_only_the_owners_surveys_are_listed(self):
+        self.create_survey(owner=self.create_user("other@example.com"), name="Theirs")
+        self.create_surveys("Mine")
+
+        self.assertEqual(self.walk(page_size=10), [["Mine"]])
+
+    def test_prefix_filters_by_name(self):
+        self.create_surveys("Week 1", "Retro", "Week 2", "Weekly wrap-up", "week 3")
+
+        self.assertEqual(self.walk(page_size=2, prefix="Week "), [["Week 2", "Week 1"]])
+
+    def test_surveys_carry_their_submission_counts(self):
+        empty, busy = self.create_surveys("Empty", "Busy")
+        Submission.objects.bulk_create(Submission(survey=busy) for _ in range(3))
+        Submission.objects.create(
+            survey=self.create_survey(owner=self.create_user("x@example.com"))
+        )
+
+        surveys, _ = self.survey_page(self.user)
+
+        self.assertEqual(
+            {survey.name: survey.submission_count for survey in surveys},
+            {"Empty": 0, "Busy": 3},
+        )
+
+    def test_one_query_per_page(self):
+        surveys = self.create_surveys("A", "B", "C")
+        Submission.objects.create(survey=surveys[0])
+
+        with self.assertNumQueries(1):
+            self.survey_page(self.user, page_size=2)
+
+    def test_malformed_cursor_is_rejected(self):
+        for cursor in ["", "12", "a-b", "1-2-3"]:
+            with self.assertRaises(ValueError):
+                decode_survey_cursor(cursor)
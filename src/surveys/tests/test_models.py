@@ -62,6 +62,20 @@ class AnswerModelTest(AuthenticatedTestCase):
         self.assertIn(answer1, submission.answers.all())
         self.assertIn(answer2, submission.answers.all())
 
+    def test_answer_takes_its_survey_from_the_submission(self):
+        survey = self.create_survey()
+        question = Question.objects.create(survey=survey, text="Q1")
+        submission = Submission.objects.create(survey=survey)
+
+        # Copied from the submission instance, without looking it up
+        with self.assertNumQueries(1):
+            answer = Answer.objects.create(
+                question=question, answer_text="Answer", submission=submission
+            )
+
+        self.assertEqual(answer.survey, survey)
+        self.assertEqual(list(survey.answers.all()), [answer])
+
 
 class QuestionModelsTest(AuthenticatedTestCase):
     # setUp inherited from AuthenticatedTestCase
@@ -280,3 +294,20 @@ class SurveyModelTest(AuthenticatedTestCase):
         survey.delete()
 
         self.assertEqual(Submission.objects.count(), 0)
+
+    def test_cascade_delete_survey_deletes_only_its_answers(self):
+        survey = self.create_survey()
+        other_survey = self.create_survey(name="Other")
+        for each in [survey, other_survey]:
+            Answer.objects.create(
+                question=Question.objects.create(survey=each, text="Q1"),
+                answer_text="Answer",
+                submission=Submission.objects.create(survey=each),
+            )
+
+        survey.delete()
+
+        self.assertEqual(
+            list(Answer.objects.values_list("survey_id", flat=True)),
+            [other_survey.id],
+        )
@@ -0,0 +1,115 @@
+from asgiref.sync import async_to_sync
+
+from surveys.forms import SurveyAnswerForm
+from surveys.models import Question, Survey
+from surveys.schema import (
+    aget_survey_schema,
+    compile_survey_schema,
+    get_survey_schema,
+)
+from tests.base import AuthenticatedTestCase
+
+
+class CompileSurveySchemaTest(AuthenticatedTestCase):
+    def test_describes_questions_in_order(self):
+        survey = self.create_survey()
+        text_q = Question.objects.create(survey=survey, text="Name")
+        rating_q = Question.objects.create(
+            survey=survey, text="Rate", question_type="rating", options=[1, 2, 3]
+        )
+
+        schema = compile_survey_schema(survey)
+
+        self.assertEqual(schema["survey_id"], survey.id)
+        self.assertEqual(schema["version"], str(survey.schema_version))
+        self.assertEqual(schema["name"], "Test Survey")
+        self.assertEqual(
+            schema["questions"],
+            [
+                {
+                    "id": text_q.id,
+                    "text": "Name",
+                    "question_type": "text",
+                    "options": [],
+                    "field_name": f"response_{text_q.id}",
+                    "comment_field_name": None,
+                },
+                {
+                    "id": rating_q.id,
+                    "text": "Rate",
+                    "question_type": "rating",
+                    "options": [1, 2, 3],
+                    "field_name": f"response_{rating_q.id}",
+                    "comment_field_name": f"comment_{rating_q.id}",
+                },
+            ],
+        )
+
+
+class SurveySchemaCacheTest(AuthenticatedTestCase):
+    def setUp(self):
+        super().setUp()
+        self.survey = self.create_survey()
+        self.question = Question.objects.create(survey=self.survey, text="First")
+
+    def fresh_survey(self):
+        return Survey.objects.get(id=self.survey.id)
+
+    def test_form_construction_uses_cached_schema(self):
+        SurveyAnswerForm(survey=self.survey)
+
+        with self.assertNumQueries(0):
+            form = SurveyAnswerForm(survey=self.survey)
+
+        self.assertIn(f"response_{self.question.id}", form.fields)
+
+    def test_adding_a_question_invalidates_the_schema(self):
+        get_survey_schema(self.survey)
+
+        new_question = Question.objects.create(survey=self.survey, text="Second")
+
+        form = SurveyAnswerForm(survey=self.fresh_survey())
+        self.assertIn(f"response_{new_question.id}", form.fields)
+
+    def test_changing_options_invalidates_the_schema(self):
+        get_survey_schema(self.survey)
+
+        self.question.question_type = "yes_no"
+        self.question.options = ["Yes", "No"]
+        self.question.save()
+
+        schema = get_survey_schema(self.fresh_survey())
+        self.assertEqual(schema["questions"][0]["options"], ["Yes", "No"])
+
+    def test_deleting_a_question_invalidates_the_schema(self):
+        get_survey_schema(self.survey)
+
+        self.question.delete()
+
+        self.assertEqual(get_survey_schema(self.fresh_survey())["questions"], [])
+
+    def test_renaming_the_survey_invalidates_the_schema(self):
+        get_survey_schema(self.survey)
+
+        survey = self.fresh_survey()
+        survey.name = "Renamed"
+        survey.save()
+
+        self.assertEqual(get_survey_schema(self.fresh_survey())["name"], "Renamed")
+
+    def test_loaded_survey_follows_question_changes(self):
+        get_survey_schema(self.survey)
+
+        Question.objects.create(survey=self.survey, text="Second")
+
+        self.assertEqual(len(get_survey_schema(self.survey)["questions"]), 2)
+
+    def test_async_lookup_shares_the_cache(self):
+        schema = async_to_sync(aget_survey_schema)(self.survey)
+
+        self.assertEqual(schema, compile_survey_schema(self.survey))
+        with self.assertNumQueries(0):
+            self.assertEqual(get_survey_schema(self.survey), schema)
+        Question.objects.create(survey=self.survey, text="Second")
+        schema = async_to_sync(aget_survey_schema)(self.fresh_survey())
+        self.assertEqual(len(schema["questions"]), 2)
@@ -0,0 +1,78 @@
+from io import StringIO
+
+from django.core.management import CommandError, call_command
+from django.db.models import F
+from django.test import TestCase
+
+from accounts.models import User
+from surveys.models import Answer, Question, Submission, Survey
+
+
+class SeedLoadDataCommandTest(TestCase):
+    def seed(self, **options):
+        options = {
+            "instructors": 3,
+            "surveys_per_instructor": "2:2",
+            "questions": "5:8",
+            "submissions_median": 10,
+            **options,
+        }
+        # Passed as command-line arguments so argparse parses the ranges
+        args = []
+        for name, value in options.items():
+            args += [f"--{name.replace('_', '-')}", str(value)]
+        call_command("seed_load_data", *args, stdout=StringIO())
+
+    def test_builds_instructors_surveys_and_answers(self):
+        self.seed()
+
+        self.assertEqual(User.objects.filter(email__startswith="load-").count(), 3)
+        self.assertEqual(Survey.objects.count(), 6)
+        for survey in Survey.objects.all():
+            self.assertTrue(5 <= survey.question_set.count() <= 8)
+        self.assertTrue(Submission.objects.exists())
+        self.assertTrue(Answer.objects.exists())
+        self.assertTrue(
+            User.objects.get(email="load-0@example.com").check_password("password")
+        )
+
+    def test_answers_are_consistent_with_the_rest_of_the_schema(self):
+        self.seed()
+
+        self.assertFalse(
+            Answer.objects.exclude(survey=F("submission__survey")).exists()
+        )
+        self.assertFalse(Answer.objects.exclude(survey=F("question__survey")).exists())
+        # Stored tallies match the answers they summarise
+        call_command("rebuild_tallies", check=True, stdout=StringIO())
+
+    def test_same_seed_gives_the_same_data(self):
+        self.seed(email_prefix="first")
+        first = list(
+            Answer.objects.order_by("id").values_list("answer_text", "comment_text")
+        )
+        Survey.objects.all().delete()
+
+        self.seed(email_prefix="second")
+        second = list(
+            Answer.objects.order_by("id").values_list("answer_text", "comment_text")
+        )
+
+        self.assertEqual(first, second)
+
+    def test_type_weights(self):
+        self.seed(type_weights="rating=1")
+
+        self.assertEqual(
+            set(Question.objects.values_list("question_type", flat=True)), {"rating"}
+        )
+
+    def test_existing_instructors_are_not_reused(self):
+        self.seed(instructors=1)
+
+        with self.assertRaises(CommandError):
+            self.seed(instructors=1)
+
+    def test_bad_range_is_rejected(self):
+        with self.assertRaises(CommandError):
+            self.seed(questions="9:3")
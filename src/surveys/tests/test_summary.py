@@ -0,0 +1,106 @@
+import statistics
+
+from django.core.cache import cache
+
+from surveys.forms import SurveyAnswerForm
+from surveys.models import Question
+from surveys.summary import get_survey_summary, histogram_stats
+from tests.base import AuthenticatedTestCase
+
+
+class HistogramStatsTest(AuthenticatedTestCase):
+    def test_matches_statistics_on_the_expanded_values(self):
+        histogram = [(1.0, 3), (2.0, 0), (3.0, 5), (4.0, 1), (5.0, 7)]
+        values = [value for value, count in histogram for _ in range(count)]
+
+        stats = histogram_stats(histogram)
+
+        self.assertEqual(stats["count"], len(values))
+        self.assertAlmostEqual(stats["mean"], statistics.mean(values))
+        self.assertAlmostEqual(stats["median"], statistics.median(values))
+        self.assertAlmostEqual(stats["std"], statistics.stdev(values))
+        quartiles = statistics.quantiles(values, n=4, method="inclusive")
+        self.assertAlmostEqual(stats["percentiles"]["25"], quartiles[0])
+        self.assertAlmostEqual(stats["percentiles"]["75"], quartiles[2])
+
+    def test_percentiles_interpolate_between_values(self):
+        stats = histogram_stats([(1.0, 1), (2.0, 1)])
+
+        self.assertEqual(stats["median"], 1.5)
+        self.assertAlmostEqual(stats["percentiles"]["10"], 1.1)
+
+    def test_single_value_has_no_spread(self):
+        stats = histogram_stats([(4.0, 1)])
+
+        self.assertEqual(stats["median"], 4.0)
+        self.assertIsNone(stats["std"])
+
+    def test_empty_histogram(self):
+        stats = histogram_stats([(1.0, 0)])
+
+        self.assertEqual(stats["count"], 0)
+        self.assertIsNone(stats["mean"])
+        self.assertIsNone(stats["percentiles"]["50"])
+
+
+class SurveySummaryTest(AuthenticatedTestCase):
+    def setUp(self):
+        super().setUp()
+        cache.clear()
+        self.survey = self.create_survey()
+        self.rating = Question.objects.create(
+            survey=self.survey,
+            text="Rate it",
+            question_type="rating",
+            options=[1, 2, 3, 4, 5],
+        )
+        self.topics = Question.objects.create(
+            survey=self.survey,
+            text="Topics",
+            question_type="checkbox",
+            options=["Python", "Django"],
+        )
+        Question.objects.create(survey=self.survey, text="Anything else?")
+
+    def submit(self, rating=None, topics=()):
+        data = {f"response_{self.topics.id}": list(topics)}
+        if rating is not None:
+            data[f"response_{self.rating.id}"] = str(rating)
+        form = SurveyAnswerForm(survey=self.survey, data=data)
+        self.assertTrue(form.is_valid(), form.errors)
+        form.save()
+
+    def test_summarises_rating_and_choice_questions(self):
+        self.submit(5, ["Python", "Django"])
+        self.submit(3, ["Django"])
+        self.submit(4)
+
+        summary = get_survey_summary(self.survey)
+
+        rating, topics = summary["questions"]
+        self.assertEqual(rating["question_id"], self.rating.id)
+        self.assertEqual(rating["responses"], 3)
+        self.assertEqual(rating["mean"], 4.0)
+        self.assertEqual(rating["median"], 4.0)
+        self.assertEqual(
+            [(item["option"], item["count"]) for item in rating["distribution"]],
+            [("1", 0), ("2", 0), ("3", 1), ("4", 1), ("5", 1)],
+        )
+        self.assertEqual(topics["responses"], 2)
+        self.assertNotIn("mean", topics)
+        self.assertEqual(
+            [(item["option"], item["share"]) for item in topics["distribution"]],
+            [("Python", 0.5), ("Django", 1.0)],
+        )
+
+    def test_summary_is_cached_until_the_next_submission(self):
+        self.submit(5)
+        get_survey_summary(self.survey)
+
+        # Only the last-submission lookup runs on a cache hit
+        with self.assertNumQueries(1):
+            get_survey_summary(self.survey)
+
+        self.submit(1)
+        rating = get_survey_summary(self.survey)["questions"][0]
+        self.assertEqual(rating["mean"], 3.0)
@@ -0,0 +1,213 @@
+from io import StringIO
+
+from collections import Counter
+
+from asgiref.sync import async_to_sync
+from django.core.management import CommandError, call_command
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from surveys.forms import SurveyAnswerForm
+from surveys.models import Answer, Question, QuestionTally, Submission
+from surveys.tallies import (
+    atallies_for_questions,
+    increment_tallies,
+    parse_answer_options,
+    tallies_for_questions,
+)
+from tests.base import AuthenticatedTestCase
+
+
+class ParseAnswerOptionsTest(AuthenticatedTestCase):
+    def test_single_choice_answer_is_one_option(self):
+        self.assertEqual(parse_answer_options("rating", "4"), ["4"])
+
+    def test_text_answers_are_not_tallied(self):
+        self.assertEqual(parse_answer_options("text", "Anything"), [])
+
+    def test_checkbox_answer_saved_as_list_repr(self):
+        self.assertEqual(
+            parse_answer_options("checkbox", str(["Python", "Django"])),
+            ["Python", "Django"],
+        )
+
+    def test_checkbox_answer_saved_comma_separated(self):
+        self.assertEqual(
+            parse_answer_options("checkbox", "Python, Django"), ["Python", "Django"]
+        )
+
+    def test_empty_checkbox_selection_has_no_options(self):
+        self.assertEqual(parse_answer_options("checkbox", "[]"), [])
+
+
+class SubmissionTallyTest(AuthenticatedTestCase):
+    def setUp(self):
+        super().setUp()
+        self.survey = self.create_survey()
+        self.rating = Question.objects.create(
+            survey=self.survey,
+            text="Rate it",
+            question_type="rating",
+            options=[1, 2, 3],
+        )
+        self.topics = Question.objects.create(
+            survey=self.survey,
+            text="Topics",
+            question_type="checkbox",
+            options=["Python", "Django"],
+        )
+        self.name = Question.objects.create(survey=self.survey, text="Name")
+
+    def submit(self, data):
+        form = SurveyAnswerForm(survey=self.survey, data=data)
+        self.assertTrue(form.is_valid())
+        form.save()
+
+    def stored(self):
+        return {
+            (tally.question_id, tally.option): tally.count
+            for tally in QuestionTally.objects.all()
+        }
+
+    def test_save_increments_tallies_for_choice_questions(self):
+        self.submit(
+            {
+                f"response_{self.rating.id}": "3",
+                f"response_{self.topics.id}": ["Python", "Django"],
+                f"response_{self.name.id}": "Ada",
+            }
+        )
+        self.submit(
+            {
+                f"response_{self.rating.id}": "3",
+                f"response_{self.topics.id}": ["Django"],
+            }
+        )
+
+        self.assertEqual(
+            self.stored(),
+            {
+                (self.rating.id, "3"): 2,
+                (self.topics.id, "Python"): 1,
+                (self.topics.id, "Django"): 2,
+            },
+        )
+
+    def test_rows_are_updated_in_the_same_order_whatever_the_input_order(self):
+        keys = [
+            (self.topics.id, "Python"),
+            (self.rating.id, "3"),
+            (self.topics.id, "Django"),
+        ]
+
+        def updates(keys):
+            with CaptureQueriesContext(connection) as queries:
+                increment_tallies(Counter(keys))
+            return [query["sql"] for query in queries if "UPDATE" in query["sql"]]
+
+        self.assertEqual(updates(keys), updates(reversed(keys)))
+
+    def test_one_statement_creates_and_adds_to_tallies(self):
+        with self.assertNumQueries(1):
+            increment_tallies(
+                Counter({(self.rating.id, "3"): 2, (self.topics.id, "Python"): 1})
+            )
+        with self.assertNumQueries(1):
+            increment_tallies(
+                Counter({(self.rating.id, "3"): 1, (self.topics.id, "Django"): 1})
+            )
+
+        self.assertEqual(
+            self.stored(),
+            {
+                (self.rating.id, "3"): 3,
+                (self.topics.id, "Python"): 1,
+                (self.topics.id, "Django"): 1,
+            },
+        )
+
+    def test_nothing_picked_runs_no_queries(self):
+        with self.assertNumQueries(0):
+            increment_tallies(Counter())
+
+    def test_comment_only_answers_are_not_tallied(self):
+        self.submit({f"comment_{self.rating.id}": "No opinion"})
+
+        self.assertEqual(self.stored(), {})
+
+    def test_tallies_for_questions_lists_every_option_in_order(self):
+        self.submit({f"response_{self.rating.id}": "2"})
+
+        tallies = tallies_for_questions([self.rating, self.topics, self.name])
+
+        self.assertEqual(
+            tallies,
+            {
+                self.rating.id: [("1", 0), ("2", 1), ("3", 0)],
+                self.topics.id: [("Python", 0), ("Django", 0)],
+            },
+        )
+
+    def test_async_tallies_match(self):
+        self.submit({f"response_{self.topics.id}": ["Django"]})
+        questions = [self.rating, self.topics, self.name]
+
+        self.assertEqual(
+            async_to_sync(atallies_for_questions)(questions),
+            tallies_for_questions(questions),
+        )
+
+
+class RebuildTalliesCommandTest(AuthenticatedTestCase):
+    def setUp(self):
+        super().setUp()
+        self.survey = self.create_survey()
+        self.question = Question.objects.create(
+            survey=self.survey,
+            text="Would you recommend?",
+            question_type="yes_no",
+            options=["Yes", "No"],
+        )
+        for answer_text in ["Yes", "Yes", "No"]:
+            Answer.objects.create(
+                question=self.question,
+                answer_text=answer_text,
+                submission=Submission.objects.create(survey=self.survey),
+            )
+
+    def test_backfills_tallies_from_answers(self):
+        call_command("rebuild_tallies", stdout=StringIO())
+
+        self.assertEqual(
+            tallies_for_questions([self.question]),
+            {self.question.id: [("Yes", 2), ("No", 1)]},
+        )
+
+    def test_rebuild_replaces_drifted_tallies(self):
+        QuestionTally.objects.create(question=self.question, option="Yes", count=9)
+        QuestionTally.objects.create(question=self.question, option="Maybe", count=1)
+
+        call_command("rebuild_tallies", survey_ids=[self.survey.id], stdout=StringIO())
+
+        self.assertEqual(
+            tallies_for_questions([self.question]),
+            {self.question.id: [("Yes", 2), ("No", 1)]},
+        )
+
+    def test_check_reports_mismatches_without_fixing_them(self):
+        QuestionTally.objects.create(question=self.question, option="Yes", count=9)
+        out = StringIO()
+
+        with self.assertRaises(CommandError):
+            call_command("rebuild_tallies", check=True, stdout=out)
+
+        self.assertIn("option 'Yes': stored 9, answers 2", out.getvalue())
+        self.assertEqual(QuestionTally.objects.get(option="Yes").count, 9)
+
+    def test_check_passes_when_tallies_are_consistent(self):
+        call_command("rebuild_tallies", stdout=StringIO())
+        out = StringIO()
+
+        call_command("rebuild_tallies", check=True, stdout=out)
+
+        self.assertIn("OK", out.getvalue())